@@ -138,6 +138,22 @@ class PredictionResponse(BaseModel):
         }
 
 
+class FeedbackRequest(BaseModel):
+    """Request para registrar la etiqueta correcta de un texto"""
+    text: str = Field(..., description="Texto etiquetado", min_length=1, max_length=5000)
+    is_toxic: bool = Field(..., description="Etiqueta correcta")
+    prediction_id: Optional[int] = Field(None, description="ID de la predicción que se corrige")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "text": "You are stupid and should die",
+                "is_toxic": True,
+                "prediction_id": 42
+            }
+        }
+
+
 class HealthResponse(BaseModel):
     """Response de health check"""
     status: str
@@ -463,6 +479,33 @@ async def get_predictions(
         raise HTTPException(status_code=500, detail=f"Error al obtener predicciones: {str(e)}")
 
 
+@app.post("/feedback", tags=["Database"])
+async def save_feedback(request: FeedbackRequest):
+    """
+    Registrar la etiqueta correcta de un texto para el entrenamiento online.
+    
+    - **text**: Texto etiquetado
+    - **is_toxic**: Etiqueta correcta
+    - **prediction_id**: ID de la predicción que se corrige (opcional)
+    
+    Returns:
+    - ID del feedback guardado
+    """
+    if not db_manager:
+        raise HTTPException(status_code=503, detail="Base de datos no disponible")
+    
+    try:
+        feedback_id = db_manager.save_feedback(
+            text=request.text,
+            is_toxic=request.is_toxic,
+            prediction_id=request.prediction_id,
+            source='api'
+        )
+        return {"id": feedback_id}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al guardar feedback: {str(e)}")
+
+
 @app.get("/predictions/stats", tags=["Database"])
 async def get_prediction_stats():
     """
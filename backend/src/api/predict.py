@@ -16,6 +16,7 @@ import math
 try:
     from ..data.preprocessing import TextPreprocessor
     from ..features.vectorization import TextVectorizer
+    from ..models.artifacts import load_artifact, LEGACY_CALIBRATION, DEFAULT_PREPROCESSING, MANIFEST_FILENAME
 except ImportError:
     import sys
     from pathlib import Path
@@ -24,6 +25,7 @@ except ImportError:
         sys.path.insert(0, str(src_path))
     from data.preprocessing import TextPreprocessor
     from features.vectorization import TextVectorizer
+    from models.artifacts import load_artifact, LEGACY_CALIBRATION, DEFAULT_PREPROCESSING, MANIFEST_FILENAME
 
 
 class HateSpeechPredictor:
@@ -32,72 +34,121 @@ class HateSpeechPredictor:
     Carga modelo y vectorizador, preprocesa texto y predice.
     """
     
-    def __init__(self, model_path: Path, vectorizer_path: Path):
+    def __init__(
+        self,
+        model_path: Path,
+        vectorizer_path: Path,
+        threshold: float = None,
+        calibration: Dict[str, Any] = None,
+        preprocessing: Dict[str, Any] = None,
+        multilabel_head: Any = None,
+        sparse_input: bool = False,
+        _loaded: Dict[str, Any] = None
+    ):
         """
         Inicializar predictor.
         
         Args:
             model_path: Ruta al modelo entrenado (.pkl)
             vectorizer_path: Ruta al vectorizador (.pkl)
+            threshold: Umbral de decisión (default: heurística por nombre de archivo)
+            calibration: Transformación de probabilidades para mostrar
+                        (default: estiramiento histórico [0.45, 0.50])
+            preprocessing: Configuración de TextPreprocessor ('enabled': False
+                          sirve los textos tal cual, para modelos entrenados
+                          sin preprocesar)
+            multilabel_head: MultiLabelLinearHead opcional para devolver
+                            todas las etiquetas de YouToxic
+            sparse_input: Si True, el modelo recibe la matriz sparse sin
+                         densificar (solo para modelos entrenados en sparse;
+                         un SVC entrenado en denso la rechaza)
         """
         self.model_path = Path(model_path)
         self.vectorizer_path = Path(vectorizer_path)
         
-        # Cargar modelo
-        with open(self.model_path, 'rb') as f:
-            self.model = pickle.load(f)
-        
-        # Cargar vectorizador
-        # El vectorizador puede ser un TextVectorizer completo o solo el vectorizador de sklearn
-        with open(self.vectorizer_path, 'rb') as f:
-            loaded = pickle.load(f)
-        
-        # Si es un TextVectorizer completo, usarlo directamente
-        if isinstance(loaded, TextVectorizer):
-            self.vectorizer = loaded
-        # Si es solo el vectorizador de sklearn, crear un TextVectorizer wrapper
+        if _loaded is not None:
+            # Objetos ya cargados desde un artefacto (ver from_artifact)
+            self.model = _loaded['model']
+            self.vectorizer = _loaded['vectorizer']
+            multilabel_head = _loaded.get('multilabel_head', multilabel_head)
         else:
-            self.vectorizer = TextVectorizer.load(self.vectorizer_path)
+            # Cargar modelo
+            with open(self.model_path, 'rb') as f:
+                self.model = pickle.load(f)
+            
+            # Cargar vectorizador
+            # El vectorizador puede ser un TextVectorizer completo o solo el vectorizador de sklearn
+            with open(self.vectorizer_path, 'rb') as f:
+                loaded = pickle.load(f)
+            
+            # Si es un TextVectorizer completo, usarlo directamente
+            if isinstance(loaded, TextVectorizer):
+                self.vectorizer = loaded
+            # Si es solo el vectorizador de sklearn, crear un TextVectorizer wrapper
+            else:
+                self.vectorizer = TextVectorizer.load(self.vectorizer_path)
+        
+        # Parámetros de servicio
+        if threshold is None:
+            threshold = self._legacy_threshold()
+        self.threshold = float(threshold)
+        self.calibration = calibration if calibration is not None else dict(LEGACY_CALIBRATION)
+        self.preprocessing = {**DEFAULT_PREPROCESSING, **(preprocessing or {})}
+        self.multilabel_head = multilabel_head
+        self.sparse_input = bool(sparse_input)
         
-        # Inicializar preprocesador
-        self.preprocessor = TextPreprocessor(use_spacy=True)
+        # Inicializar preprocesador (no se carga spaCy si no se usa)
+        self.preprocessor = None
+        if self.preprocessing.get('enabled', True):
+            self.preprocessor = TextPreprocessor(use_spacy=self.preprocessing['use_spacy'])
         
         print(f"✅ Modelo cargado desde: {self.model_path}")
         print(f"✅ Vectorizador cargado desde: {self.vectorizer_path}")
     
-    def predict(self, text: str) -> Dict[str, Any]:
+    @classmethod
+    def from_artifact(
+        cls,
+        artifact_dir: Path,
+        mmap_mode: str = None,
+        verify: bool = True,
+        full_hash: bool = False
+    ) -> 'HateSpeechPredictor':
         """
-        Predecir si un texto es hate speech.
+        Crear predictor desde un artefacto con manifest (ver models/artifacts.py).
+        
+        El umbral, la calibración y el preprocesamiento se leen del manifest.
         
         Args:
-            text: Texto a analizar
+            artifact_dir: Directorio del artefacto
+            mmap_mode: Modo de memory-mapping de los arrays (default: None,
+                       en memoria; 'r' no sirve para SVC)
+            verify: Si True, comprueba los archivos contra el manifest
+            full_hash: Si True, recalcula los hashes (default: solo tamaños)
             
         Returns:
-            Diccionario con predicción y probabilidades
+            Instancia de HateSpeechPredictor
         """
-        # Preprocesar texto
-        processed_text = self.preprocessor.preprocess_text(text, remove_stopwords=True)
-        
-        # Vectorizar
-        text_vectorized = self.vectorizer.transform(pd.Series([processed_text]))
-        
-        # Asegurar que es un array numpy denso con forma correcta
-        # El método transform ya devuelve un array denso, pero verificar
-        if hasattr(text_vectorized, 'toarray'):
-            # Si es sparse, convertir a denso
-            text_vectorized = text_vectorized.toarray()
-        elif not isinstance(text_vectorized, np.ndarray):
-            # Si no es array, convertir
-            text_vectorized = np.array(text_vectorized)
-        
-        # Asegurar que es 2D (1 fila, N features) para el modelo
-        if text_vectorized.ndim == 1:
-            text_vectorized = text_vectorized.reshape(1, -1)
-        
-        # Obtener probabilidades del modelo
-        probabilities = self.model.predict_proba(text_vectorized)[0]
-        prob_toxic_raw = float(probabilities[1])
+        artifact_dir = Path(artifact_dir)
+        loaded = load_artifact(
+            artifact_dir, mmap_mode=mmap_mode, verify=verify, full_hash=full_hash
+        )
+        manifest = loaded['manifest']
         
+        predictor = cls(
+            artifact_dir / manifest['files']['model']['path'],
+            artifact_dir / manifest['files']['vectorizer']['path'],
+            threshold=manifest['threshold'],
+            calibration=manifest.get('calibration'),
+            preprocessing=manifest.get('preprocessing'),
+            _loaded=loaded
+        )
+        predictor.manifest = manifest
+        return predictor
+    
+    def _legacy_threshold(self) -> float:
+        """
+        Umbral para modelos .pkl sin manifest, según el nombre del archivo.
+        """
         # Umbral óptimo basado en análisis de balance precision-recall
         # Detectar si es modelo aumentado o original para usar umbral apropiado
         model_path_str = str(self.model_path).lower()
@@ -105,19 +156,28 @@ class HateSpeechPredictor:
             # Modelo aumentado: umbral 0.50 (balance entre detección y precisión)
             # El umbral de 0.65 era demasiado alto y causaba que todo se clasificara como no tóxico
             # Con 0.50 detectamos más casos tóxicos manteniendo buena precisión
-            decision_threshold = 0.50
-        else:
-            # Modelo original optimizado: umbral 0.47 (muy conservador)
-            # El modelo original tiene probabilidades muy cercanas, necesita umbral bajo
-            decision_threshold = 0.47
+            return 0.50
+        # Modelo original optimizado: umbral 0.47 (muy conservador)
+        # El modelo original tiene probabilidades muy cercanas, necesita umbral bajo
+        return 0.47
+    
+    def _calibrate_probability(self, prob_toxic_raw: float) -> float:
+        """
+        Transformar la probabilidad cruda en la probabilidad mostrada.
         
-        # Decisión basada en probabilidad cruda (más conservadora)
-        is_toxic_raw = prob_toxic_raw >= decision_threshold
+        Args:
+            prob_toxic_raw: Probabilidad tóxica del modelo
+            
+        Returns:
+            Probabilidad tóxica para mostrar
+        """
+        if self.calibration.get('type', 'identity') != 'stretch':
+            return prob_toxic_raw
         
         # AMPLIFICAR DIFERENCIAS EN PROBABILIDADES para visualización
-        # Transformación: estirar el rango observado [0.45, 0.50] a [0.20, 0.80]
-        min_observed = 0.45  # Valor mínimo observado
-        max_observed = 0.50  # Valor máximo observado
+        # Transformación: estirar el rango observado [min, max] a [0.20, 0.80]
+        min_observed = self.calibration['min_observed']  # Valor mínimo observado
+        max_observed = self.calibration['max_observed']  # Valor máximo observado
         
         # Normalizar el valor al rango observado
         if prob_toxic_raw < min_observed:
@@ -134,6 +194,101 @@ class HateSpeechPredictor:
             normalized = (prob_toxic_raw - min_observed) / (max_observed - min_observed)
             prob_toxic = 0.20 + normalized * 0.60
         
+        return prob_toxic
+    
+    def predict(self, text: str) -> Dict[str, Any]:
+        """
+        Predecir si un texto es hate speech.
+        
+        Args:
+            text: Texto a analizar
+            
+        Returns:
+            Diccionario con predicción y probabilidades
+            (y 'labels' con todas las etiquetas si hay cabeza multi-etiqueta)
+        """
+        return self.predict_batch([text])[0]
+    
+    def predict_batch(self, texts: list) -> list:
+        """
+        Predecir múltiples textos.
+        
+        Vectoriza el lote una sola vez y llama una sola vez a `predict_proba`
+        (y a la cabeza multi-etiqueta, si existe) para todos los textos.
+        
+        Args:
+            texts: Lista de textos a analizar
+            
+        Returns:
+            Lista de diccionarios con predicciones
+        """
+        if not texts:
+            return []
+        
+        # Preprocesar textos
+        if self.preprocessor is None:
+            processed_texts = list(texts)
+        else:
+            processed_texts = [
+                self.preprocessor.preprocess_text(
+                    text, remove_stopwords=self.preprocessing['remove_stopwords']
+                )
+                for text in texts
+            ]
+        
+        # Vectorizar (sparse: densificar solo si el modelo lo necesita)
+        texts_vectorized = self.vectorizer.transform(pd.Series(processed_texts), sparse=True)
+        
+        if not self.sparse_input:
+            # Asegurar que es un array numpy denso con forma correcta
+            if hasattr(texts_vectorized, 'toarray'):
+                texts_vectorized = texts_vectorized.toarray()
+            elif not isinstance(texts_vectorized, np.ndarray):
+                texts_vectorized = np.array(texts_vectorized)
+            
+            # Asegurar que es 2D (N filas, M features) para el modelo
+            if texts_vectorized.ndim == 1:
+                texts_vectorized = texts_vectorized.reshape(1, -1)
+        
+        # Obtener probabilidades del modelo
+        probabilities_toxic = self.model.predict_proba(texts_vectorized)[:, 1]
+        
+        # Todas las etiquetas con una sola multiplicación matricial
+        label_probabilities = None
+        if self.multilabel_head is not None:
+            label_probabilities = self.multilabel_head.predict_proba(texts_vectorized)
+        
+        results = []
+        for i, text in enumerate(texts):
+            result = self._build_result(text, float(probabilities_toxic[i]))
+            if label_probabilities is not None:
+                result['labels'] = {
+                    label: {
+                        'probability': float(label_probabilities[i, j]),
+                        'is_positive': bool(label_probabilities[i, j] >= self.multilabel_head.thresholds[label])
+                    }
+                    for j, label in enumerate(self.multilabel_head.labels)
+                }
+            results.append(result)
+        return results
+    
+    def _build_result(self, text: str, prob_toxic_raw: float) -> Dict[str, Any]:
+        """
+        Construir el resultado de un texto a partir de su probabilidad cruda.
+        
+        Args:
+            text: Texto original
+            prob_toxic_raw: Probabilidad tóxica del modelo
+            
+        Returns:
+            Diccionario con predicción y probabilidades
+        """
+        # Decisión basada en probabilidad cruda (más conservadora)
+        is_toxic_raw = prob_toxic_raw >= self.threshold
+        
+        # Probabilidad mostrada según la calibración del modelo
+        prob_toxic = self._calibrate_probability(prob_toxic_raw)
+        
         # Asegurar que sumen 1.0
         prob_not_toxic = 1.0 - prob_toxic
         
@@ -151,38 +306,34 @@ class HateSpeechPredictor:
         }
         
         return result
-    
-    def predict_batch(self, texts: list) -> list:
-        """
-        Predecir múltiples textos.
-        
-        Args:
-            texts: Lista de textos a analizar
-            
-        Returns:
-            Lista de diccionarios con predicciones
-        """
-        results = []
-        for text in texts:
-            results.append(self.predict(text))
-        return results
 
 
 def load_predictor(model_dir: Path = None) -> HateSpeechPredictor:
     """
     Cargar predictor con rutas por defecto.
     
-    Usa el modelo aumentado si está disponible (mejor rendimiento),
-    sino usa el modelo optimizado original.
+    Usa el artefacto de `models/serving` si existe (ver models/artifacts.py);
+    si no, el modelo aumentado si está disponible (mejor rendimiento),
+    y si no el modelo optimizado original.
     
     Args:
-        model_dir: Directorio donde están los modelos (opcional)
+        model_dir: Directorio donde están los modelos, o de un artefacto
+                  con manifest.json (opcional)
         
     Returns:
         Instancia de HateSpeechPredictor
     """
+    if model_dir is not None and (Path(model_dir) / MANIFEST_FILENAME).exists():
+        # Artefacto autodescriptivo: umbral y calibración vienen del manifest
+        return HateSpeechPredictor.from_artifact(model_dir)
+    
     if model_dir is None:
         backend_root = Path(__file__).parent.parent.parent
+        serving_dir = backend_root / 'models' / 'serving'
+        if (serving_dir / MANIFEST_FILENAME).exists():
+            print("✅ Usando artefacto de servicio (models/serving)")
+            return HateSpeechPredictor.from_artifact(serving_dir)
+        
         optimized_dir = backend_root / 'models' / 'optimized'
         augmented_dir = backend_root / 'models' / 'augmented'
         
@@ -216,3 +367,29 @@ def load_predictor(model_dir: Path = None) -> HateSpeechPredictor:
     
     return HateSpeechPredictor(model_path, vectorizer_path)
 
+
+
+def load_online_predictor(model_dir: Path = None, version: int = None) -> HateSpeechPredictor:
+    """
+    Cargar predictor desde un snapshot del modelo online.
+    
+    Args:
+        model_dir: Directorio de snapshots (default: models/online)
+        version: Versión del snapshot (default: la más reciente)
+        
+    Returns:
+        Instancia de HateSpeechPredictor
+    """
+    try:
+        from ..models.online import get_snapshot_paths, get_snapshot_preprocessing
+    except ImportError:
+        from models.online import get_snapshot_paths, get_snapshot_preprocessing
+    
+    model_path, vectorizer_path = get_snapshot_paths(model_dir, version)
+    # SGD con pérdida logística: probabilidades ya calibradas, umbral neutro.
+    # El HashingVectorizer tiene 2^18 columnas: servir siempre en sparse.
+    # Los textos se preprocesan (o no) como al entrenar el snapshot
+    return HateSpeechPredictor(
+        model_path, vectorizer_path, threshold=0.5, calibration={'type': 'identity'},
+        preprocessing=get_snapshot_preprocessing(model_path.parent), sparse_input=True
+    )
@@ -0,0 +1,231 @@
+"""
+Módulo de caché de matrices de características.
+
+Durante una búsqueda conjunta de vectorizador + modelo muchos trials
+comparten la misma configuración de vectorizador. La caché guarda la
+matriz (sparse) de cada configuración única en memoria y en disco, de
+modo que un texto preprocesado solo se vectoriza una vez por
+configuración, incluso entre ejecuciones distintas de la búsqueda.
+
+Ambos niveles están acotados y descartan la entrada usada hace más
+tiempo: en memoria por número de entradas y en disco por tamaño total
+y número de archivos (la última lectura se marca con el mtime).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import joblib
+import pandas as pd
+
+# Imports relativos o absolutos
+try:
+    from .vectorization import TextVectorizer
+    from ..utils.fingerprint import data_fingerprint
+except ImportError:
+    import sys
+    src_path = Path(__file__).parent.parent
+    if str(src_path) not in sys.path:
+        sys.path.insert(0, str(src_path))
+    from features.vectorization import TextVectorizer
+    from utils.fingerprint import data_fingerprint
+
+
+# Configuraciones de vectorizador que se mantienen en memoria
+DEFAULT_MEMORY_CONFIGS = 8
+# Tamaño máximo por defecto de la caché en disco
+DEFAULT_MAX_DISK_MB = 2048
+
+
+def default_cache_dir() -> Path:
+    """Directorio por defecto de la caché (backend/data/feature_cache)."""
+    return Path(__file__).parent.parent.parent / 'data' / 'feature_cache'
+
+
+def vectorizer_config_key(method: str, params: Dict[str, Any]) -> str:
+    """
+    Clave estable de una configuración de vectorizador.
+
+    Args:
+        method: Método de vectorización ('tfidf', 'count' o 'hashing')
+        params: Parámetros del vectorizador
+
+    Returns:
+        Hash en hexadecimal (16 primeros caracteres)
+    """
+    config = json.dumps({'method': method.lower(), 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+
+
+class FeatureCache:
+    """
+    Caché de dos niveles (memoria LRU + disco) de matrices vectorizadas.
+
+    Cada entrada se identifica por la configuración del vectorizador y la
+    huella de los textos, así que cambiar los datos nunca devuelve
+    features obsoletas.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_memory_items: Optional[int] = None,
+        use_disk: bool = True,
+        folds: int = 1,
+        max_disk_mb: Optional[float] = DEFAULT_MAX_DISK_MB,
+        max_disk_items: Optional[int] = None
+    ):
+        """
+        Inicializar caché.
+
+        Con validación cruzada cada configuración ocupa una entrada por
+        fold, así que la memoria se dimensiona como configuraciones × folds
+        para no descartar los folds de una configuración antes de volver
+        a usarlos.
+
+        Args:
+            cache_dir: Directorio de la caché en disco (default: data/feature_cache)
+            max_memory_items: Entradas que se mantienen en memoria
+                              (default: DEFAULT_MEMORY_CONFIGS × folds)
+            use_disk: Si False, solo se usa la caché en memoria
+            folds: Entradas por configuración (folds de CV; 1 sin CV)
+            max_disk_mb: Tamaño máximo de la caché en disco (None = sin límite)
+            max_disk_items: Número máximo de archivos en disco (None = sin límite)
+        """
+        if folds < 1:
+            raise ValueError(f"folds debe ser >= 1, recibido {folds}")
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.max_memory_items = (
+            max_memory_items if max_memory_items is not None else DEFAULT_MEMORY_CONFIGS * folds
+        )
+        self.use_disk = use_disk
+        self.max_disk_mb = max_disk_mb
+        self.max_disk_items = max_disk_items
+        self._memory: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        """Guardar una entrada en memoria descartando la menos usada."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _disk_entries(self):
+        """Entradas en disco (sin temporales a medio escribir), de la menos a la más usada."""
+        entries = []
+        for path in self.cache_dir.glob('*.joblib'):
+            if path.name.startswith('.tmp_'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Borrada por otra sesión
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries, key=lambda entry: entry[0])
+
+    def _evict_from_disk(self, keep: Path):
+        """Borrar las entradas menos usadas hasta respetar los límites de disco."""
+        if self.max_disk_mb is None and self.max_disk_items is None:
+            return
+        entries = self._disk_entries()
+        total_bytes = sum(size for _, size, _ in entries)
+        n_entries = len(entries)
+        max_bytes = self.max_disk_mb * 1024 ** 2 if self.max_disk_mb is not None else None
+        for _, size, path in entries:
+            over_size = max_bytes is not None and total_bytes > max_bytes
+            over_count = self.max_disk_items is not None and n_entries > self.max_disk_items
+            if not (over_size or over_count):
+                break
+            if path == keep:
+                continue  # La entrada recién escrita se conserva aunque no quepa
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue  # En uso (Windows con memory-mapping)
+            total_bytes -= size
+            n_entries -= 1
+
+    def _write_to_disk(self, path: Path, entry: Dict[str, Any]):
+        """Escribir una entrada de forma atómica (temporal + rename)."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmp_', suffix='.joblib', dir=self.cache_dir)
+        os.close(fd)
+        try:
+            joblib.dump(entry, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def get_or_compute(
+        self,
+        texts_train: pd.Series,
+        texts_test: pd.Series,
+        method: str = 'tfidf',
+        data_hash: Optional[str] = None,
+        **vectorizer_params
+    ) -> Tuple[Any, Any, TextVectorizer]:
+        """
+        Obtener las matrices de una configuración, vectorizando solo si es nueva.
+
+        El vectorizador se ajusta solo con `texts_train`; para validación
+        cruzada sin fugas, llamar una vez por fold con sus textos.
+
+        Args:
+            texts_train: Textos preprocesados de entrenamiento
+            texts_test: Textos preprocesados de prueba
+            method: Método de vectorización
+            data_hash: Huella de los textos ya calculada (opcional, evita
+                       recorrerlos en cada llamada)
+            **vectorizer_params: Parámetros del vectorizador
+
+        Returns:
+            Tupla (X_train, X_test, vectorizer) con matrices sparse
+        """
+        data_hash = data_hash or data_fingerprint(texts_train, texts_test)
+        key = f"{vectorizer_config_key(method, vectorizer_params)}_{data_hash}"
+
+        if key in self._memory:
+            self.stats['memory_hits'] += 1
+            self._memory.move_to_end(key)
+            entry = self._memory[key]
+            return entry['X_train'], entry['X_test'], entry['vectorizer']
+
+        path = self.cache_dir / f'{key}.joblib'
+        if self.use_disk and path.exists():
+            self.stats['disk_hits'] += 1
+            entry = joblib.load(path, mmap_mode='r')
+            path.touch()  # Marcar como usada para el LRU de disco
+        else:
+            self.stats['misses'] += 1
+            vectorizer = TextVectorizer(method=method, **vectorizer_params)
+            entry = {
+                'X_train': vectorizer.fit_transform(texts_train, sparse=True).tocsr(),
+                'X_test': vectorizer.transform(texts_test, sparse=True).tocsr(),
+                'vectorizer': vectorizer
+            }
+            if self.use_disk:
+                self._write_to_disk(path, entry)
+                self._evict_from_disk(keep=path)
+
+        self._remember(key, entry)
+        return entry['X_train'], entry['X_test'], entry['vectorizer']
+
+    def clear(self, disk: bool = False):
+        """
+        Vaciar la caché.
+
+        Args:
+            disk: Si True, borra también las entradas en disco
+        """
+        self._memory.clear()
+        if disk and self.cache_dir.exists():
+            for path in self.cache_dir.glob('*.joblib'):
+                path.unlink()
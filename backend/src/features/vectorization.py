@@ -10,13 +10,16 @@ from pathlib import Path
 from typing import Tuple, Optional
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer, HashingVectorizer
 from sklearn.model_selection import train_test_split
 
 
 class TextVectorizer:
     """
-    Clase para vectorización de texto con TF-IDF y Count Vectorizer.
+    Clase para vectorización de texto con TF-IDF, Count Vectorizer y Hashing.
+    
+    El método 'hashing' no tiene vocabulario que ajustar (es stateless),
+    por lo que sirve para aprendizaje online e incremental.
     """
     
     def __init__(self, method: str = 'tfidf', **kwargs):
@@ -24,11 +27,25 @@ class TextVectorizer:
         Inicializar vectorizador.
         
         Args:
-            method: Método de vectorización ('tfidf' o 'count')
+            method: Método de vectorización ('tfidf', 'count' o 'hashing')
             **kwargs: Parámetros adicionales para el vectorizador
         """
         self.method = method.lower()
         
+        if self.method == 'hashing':
+            # Sin vocabulario: max_features/min_df/max_df no aplican
+            hashing_params = {
+                'n_features': 2 ** 18,
+                'ngram_range': (1, 2),
+                'stop_words': 'english',
+                'lowercase': True,
+                'alternate_sign': False,  # Valores no negativos (compatible con Naive Bayes)
+                'norm': 'l2'
+            }
+            hashing_params.update(kwargs)
+            self.vectorizer = HashingVectorizer(**hashing_params)
+            return
+        
         # Parámetros por defecto
         default_params = {
             'max_features': 1000,
@@ -48,14 +65,15 @@ class TextVectorizer:
         elif self.method == 'count':
             self.vectorizer = CountVectorizer(**default_params)
         else:
-            raise ValueError(f"Método '{method}' no soportado. Usa 'tfidf' o 'count'")
+            raise ValueError(f"Método '{method}' no soportado. Usa 'tfidf', 'count' o 'hashing'")
     
-    def fit_transform(self, texts: pd.Series) -> np.ndarray:
+    def fit_transform(self, texts: pd.Series, sparse: bool = False) -> np.ndarray:
         """
         Ajustar vectorizador y transformar textos.
         
         Args:
             texts: Serie de pandas con textos preprocesados
+            sparse: Si True, devuelve la matriz sparse sin densificar
             
         Returns:
             Matriz de características
@@ -64,14 +82,16 @@ class TextVectorizer:
         texts_clean = texts.fillna('').astype(str)
         # Reemplazar strings vacíos con un placeholder
         texts_clean = texts_clean.replace('', 'empty_text')
-        return self.vectorizer.fit_transform(texts_clean).toarray()
+        X = self.vectorizer.fit_transform(texts_clean)
+        return X if sparse else X.toarray()
     
-    def transform(self, texts: pd.Series) -> np.ndarray:
+    def transform(self, texts: pd.Series, sparse: bool = False) -> np.ndarray:
         """
         Transformar textos usando vectorizador ya ajustado.
         
         Args:
             texts: Serie de pandas con textos preprocesados
+            sparse: Si True, devuelve la matriz sparse sin densificar
             
         Returns:
             Matriz de características
@@ -80,7 +100,8 @@ class TextVectorizer:
         texts_clean = texts.fillna('').astype(str)
         # Reemplazar strings vacíos con un placeholder
         texts_clean = texts_clean.replace('', 'empty_text')
-        return self.vectorizer.transform(texts_clean).toarray()
+        X = self.vectorizer.transform(texts_clean)
+        return X if sparse else X.toarray()
     
     def get_feature_names(self) -> list:
         """
@@ -123,7 +144,12 @@ class TextVectorizer:
             vectorizer = pickle.load(f)
         
         # Determinar método
-        method = 'tfidf' if isinstance(vectorizer, TfidfVectorizer) else 'count'
+        if isinstance(vectorizer, TfidfVectorizer):
+            method = 'tfidf'
+        elif isinstance(vectorizer, HashingVectorizer):
+            method = 'hashing'
+        else:
+            method = 'count'
         
         instance = cls(method=method)
         instance.vectorizer = vectorizer
@@ -0,0 +1,319 @@
+"""
+Módulo para guardar y cargar modelos como artefactos autodescriptivos.
+
+Un artefacto es un directorio con:
+- `manifest.json`: archivos, hashes SHA-256, umbral de decisión,
+  calibración de probabilidades, configuración de preprocesamiento
+  y métricas de entrenamiento.
+- `model.joblib` y `vectorizer.joblib`: objetos guardados con joblib
+  sin compresión, de modo que sus arrays se pueden cargar con
+  `mmap_mode` (carga rápida y memoria compartida entre procesos) en
+  modelos que admiten buffers de solo lectura. libsvm (SVC) no los
+  admite, así que por defecto se cargan en memoria.
+
+Así los parámetros de servicio viajan con el modelo en lugar de
+estar fijados en el código del predictor.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+import joblib
+import numpy as np
+
+# Imports relativos o absolutos
+try:
+    from ..features.vectorization import TextVectorizer
+except ImportError:
+    import sys
+    src_path = Path(__file__).parent.parent
+    if str(src_path) not in sys.path:
+        sys.path.insert(0, str(src_path))
+    from features.vectorization import TextVectorizer
+
+
+MANIFEST_FILENAME = 'manifest.json'
+MODEL_FILENAME = 'model.joblib'
+VECTORIZER_FILENAME = 'vectorizer.joblib'
+MULTILABEL_FILENAME = 'multilabel.joblib'
+ARTIFACT_FORMAT_VERSION = 1
+
+# Calibración usada históricamente por el predictor (estira [0.45, 0.50] a [0.20, 0.80])
+LEGACY_CALIBRATION = {'type': 'stretch', 'min_observed': 0.45, 'max_observed': 0.50}
+DEFAULT_PREPROCESSING = {'use_spacy': True, 'remove_stopwords': True}
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calcular el hash SHA-256 de un archivo por bloques.
+
+    Args:
+        path: Ruta del archivo
+        chunk_size: Tamaño de bloque de lectura
+
+    Returns:
+        Hash en hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _to_jsonable(value: Any) -> Any:
+    """Convertir arrays y escalares de numpy a tipos serializables en JSON."""
+    if isinstance(value, dict):
+        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _file_entry(artifact_dir: Path, filename: str) -> Dict[str, Any]:
+    """Entrada del manifest para un archivo del artefacto."""
+    path = artifact_dir / filename
+    return {
+        'path': filename,
+        'sha256': file_sha256(path),
+        'size_bytes': path.stat().st_size
+    }
+
+
+def save_artifact(
+    artifact_dir: Path,
+    model: Any,
+    vectorizer: TextVectorizer,
+    threshold: float = 0.5,
+    calibration: Optional[Dict[str, Any]] = None,
+    preprocessing: Optional[Dict[str, Any]] = None,
+    metrics: Optional[Dict[str, Any]] = None,
+    extra: Optional[Dict[str, Any]] = None,
+    multilabel_head: Any = None
+) -> Path:
+    """
+    Guardar modelo y vectorizador como artefacto con manifest.
+
+    Args:
+        artifact_dir: Directorio del artefacto
+        model: Modelo entrenado con `predict_proba`
+        vectorizer: TextVectorizer ajustado
+        threshold: Umbral de decisión sobre la probabilidad tóxica
+        calibration: Transformación de probabilidades para mostrar
+                     (None = identidad, o p.ej. LEGACY_CALIBRATION)
+        preprocessing: Configuración de TextPreprocessor usada en entrenamiento
+        metrics: Métricas de entrenamiento/evaluación
+        extra: Campos adicionales para el manifest
+        multilabel_head: MultiLabelLinearHead opcional (todas las etiquetas)
+
+    Returns:
+        Ruta del manifest
+    """
+    artifact_dir = Path(artifact_dir)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+
+    # Sin compresión para permitir mmap_mode al cargar
+    joblib.dump(model, artifact_dir / MODEL_FILENAME)
+    joblib.dump(vectorizer.vectorizer, artifact_dir / VECTORIZER_FILENAME)
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'created_at': datetime.utcnow().isoformat(),
+        'model_class': type(model).__name__,
+        'vectorizer_method': vectorizer.method,
+        'files': {
+            'model': _file_entry(artifact_dir, MODEL_FILENAME),
+            'vectorizer': _file_entry(artifact_dir, VECTORIZER_FILENAME)
+        },
+        'threshold': float(threshold),
+        'calibration': calibration or {'type': 'identity'},
+        'preprocessing': preprocessing or dict(DEFAULT_PREPROCESSING),
+        'metrics': _to_jsonable(metrics or {})
+    }
+    if multilabel_head is not None:
+        joblib.dump(multilabel_head, artifact_dir / MULTILABEL_FILENAME)
+        manifest['files']['multilabel'] = _file_entry(artifact_dir, MULTILABEL_FILENAME)
+        manifest['multilabel'] = {
+            'labels': multilabel_head.labels,
+            'thresholds': multilabel_head.thresholds
+        }
+    if extra:
+        manifest.update(_to_jsonable(extra))
+
+    manifest_path = artifact_dir / MANIFEST_FILENAME
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    print(f"✅ Artefacto guardado en: {artifact_dir}")
+    return manifest_path
+
+
+def load_manifest(artifact_dir: Path) -> Dict[str, Any]:
+    """
+    Leer el manifest de un artefacto.
+
+    Args:
+        artifact_dir: Directorio del artefacto
+
+    Returns:
+        Diccionario con el manifest
+    """
+    manifest_path = Path(artifact_dir) / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"Manifest no encontrado en {manifest_path}")
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def update_manifest(artifact_dir: Path, **fields) -> Dict[str, Any]:
+    """
+    Actualizar campos de servicio del manifest (umbral, calibración...).
+
+    Args:
+        artifact_dir: Directorio del artefacto
+        **fields: Campos a sobrescribir
+
+    Returns:
+        Manifest actualizado
+    """
+    manifest = load_manifest(artifact_dir)
+    manifest.update(_to_jsonable(fields))
+    manifest['updated_at'] = datetime.utcnow().isoformat()
+
+    with open(Path(artifact_dir) / MANIFEST_FILENAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def verify_artifact(
+    artifact_dir: Path,
+    manifest: Optional[Dict[str, Any]] = None,
+    full_hash: bool = True
+):
+    """
+    Comprobar que los archivos coinciden con el manifest.
+
+    El tamaño se compara siempre (detecta copias truncadas sin leer los
+    archivos); el hash SHA-256 completo solo con `full_hash`.
+
+    Args:
+        artifact_dir: Directorio del artefacto
+        manifest: Manifest ya leído (opcional)
+        full_hash: Si True, recalcula y compara los hashes
+    """
+    artifact_dir = Path(artifact_dir)
+    manifest = manifest or load_manifest(artifact_dir)
+
+    for name, entry in manifest['files'].items():
+        path = artifact_dir / entry['path']
+        size = path.stat().st_size
+        if 'size_bytes' in entry and size != entry['size_bytes']:
+            raise ValueError(f"Tamaño incorrecto para '{name}' ({entry['path']}): "
+                             f"esperado {entry['size_bytes']} bytes, obtenido {size}")
+        if not full_hash:
+            continue
+        actual = file_sha256(path)
+        if actual != entry['sha256']:
+            raise ValueError(f"Hash incorrecto para '{name}' ({entry['path']}): "
+                             f"esperado {entry['sha256'][:12]}…, obtenido {actual[:12]}…")
+
+
+def load_artifact(
+    artifact_dir: Path,
+    mmap_mode: Optional[str] = None,
+    verify: bool = True,
+    full_hash: bool = False
+) -> Dict[str, Any]:
+    """
+    Cargar un artefacto.
+
+    Por defecto solo se comprueban los tamaños del manifest, para que
+    arrancar la API no lea el artefacto entero antes de mapearlo; el
+    hash completo se pide con `full_hash` (p.ej. tras descargarlo).
+
+    Args:
+        artifact_dir: Directorio del artefacto
+        mmap_mode: Modo de memory-mapping para los arrays (None por defecto,
+                   en memoria; 'r' solo para modelos que predicen sobre
+                   buffers de solo lectura, no SVC)
+        verify: Si True, comprueba los archivos contra el manifest
+        full_hash: Si True, la comprobación recalcula los hashes SHA-256
+
+    Returns:
+        Diccionario {'model', 'vectorizer' (TextVectorizer), 'manifest',
+        'multilabel_head' (None si el artefacto no la tiene)}
+    """
+    artifact_dir = Path(artifact_dir)
+    manifest = load_manifest(artifact_dir)
+
+    if manifest.get('format_version', 0) > ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Formato de artefacto v{manifest['format_version']} no soportado "
+                         f"(máximo v{ARTIFACT_FORMAT_VERSION})")
+    if verify:
+        verify_artifact(artifact_dir, manifest, full_hash=full_hash)
+
+    files = manifest['files']
+    model = joblib.load(artifact_dir / files['model']['path'], mmap_mode=mmap_mode)
+    sk_vectorizer = joblib.load(artifact_dir / files['vectorizer']['path'], mmap_mode=mmap_mode)
+
+    vectorizer = TextVectorizer(method=manifest.get('vectorizer_method', 'tfidf'))
+    vectorizer.vectorizer = sk_vectorizer
+
+    multilabel_head = None
+    if 'multilabel' in files:
+        multilabel_head = joblib.load(artifact_dir / files['multilabel']['path'], mmap_mode=mmap_mode)
+
+    return {
+        'model': model,
+        'vectorizer': vectorizer,
+        'manifest': manifest,
+        'multilabel_head': multilabel_head
+    }
+
+
+def convert_legacy_model(
+    model_path: Path,
+    vectorizer_path: Path,
+    artifact_dir: Path,
+    threshold: float,
+    calibration: Optional[Dict[str, Any]] = None,
+    metrics: Optional[Dict[str, Any]] = None
+) -> Path:
+    """
+    Convertir un modelo .pkl + vectorizador .pkl al formato de artefacto.
+
+    Args:
+        model_path: Ruta del modelo .pkl
+        vectorizer_path: Ruta del vectorizador .pkl
+        artifact_dir: Directorio destino
+        threshold: Umbral de decisión con el que se servía el modelo
+        calibration: Calibración de probabilidades (default: LEGACY_CALIBRATION)
+        metrics: Métricas conocidas del modelo (opcional)
+
+    Returns:
+        Ruta del manifest
+    """
+    try:
+        from .train import load_model
+    except ImportError:
+        from models.train import load_model
+
+    model = load_model(model_path)
+    vectorizer = TextVectorizer.load(vectorizer_path)
+
+    return save_artifact(
+        artifact_dir,
+        model,
+        vectorizer,
+        threshold=threshold,
+        calibration=calibration or dict(LEGACY_CALIBRATION),
+        metrics=metrics,
+        extra={'converted_from': {'model': str(model_path), 'vectorizer': str(vectorizer_path)}}
+    )
@@ -0,0 +1,229 @@
+"""
+Módulo para medir el coste de servir modelos.
+
+Cada candidato se mide por el mismo camino que usa la API
+(`TextVectorizer.transform` + `predict_proba`): latencia texto a texto
+(p50/p99), throughput por tamaño de lote, tiempo de carga desde disco,
+RSS pico de carga + predicción y tamaño del artefacto. Así la elección de modelo puede
+tener en cuenta el coste en producción y no solo el F1.
+"""
+
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+import joblib
+import numpy as np
+import pandas as pd
+
+# Imports relativos o absolutos
+try:
+    from ..features.vectorization import TextVectorizer
+except ImportError:
+    import sys
+    src_path = Path(__file__).parent.parent
+    if str(src_path) not in sys.path:
+        sys.path.insert(0, str(src_path))
+    from features.vectorization import TextVectorizer
+
+# `resource` solo existe en Unix; sin él no se mide el RSS
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+DEFAULT_BATCH_SIZES = (1, 32, 256)
+
+
+def _serve(model: Any, vectorizer: TextVectorizer, texts: pd.Series, sparse: bool) -> np.ndarray:
+    """Camino de servicio de la API: vectorizar y obtener la probabilidad tóxica."""
+    X = vectorizer.transform(texts, sparse=sparse)
+    return model.predict_proba(X)[:, 1]
+
+
+def _max_rss_mb() -> Optional[float]:
+    """RSS máximo del proceso actual en MB (None si no se puede medir)."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB y macOS en bytes
+    return max_rss / 1024 ** 2 if sys.platform == 'darwin' else max_rss / 1024
+
+
+def _load_and_serve(path: Path, method: str, batch: pd.Series, sparse: bool) -> Dict[str, float]:
+    """Cargar el artefacto de servicio y predecir un lote, midiendo tiempo y RSS."""
+    baseline = _max_rss_mb()
+    start = time.perf_counter()
+    loaded = joblib.load(path)
+    load_time_ms = (time.perf_counter() - start) * 1000
+
+    loaded_vectorizer = TextVectorizer(method=method)
+    loaded_vectorizer.vectorizer = loaded['vectorizer']
+    _serve(loaded['model'], loaded_vectorizer, batch, sparse)
+
+    peak_rss_mb = float('nan') if baseline is None else _max_rss_mb() - baseline
+    return {'load_time_ms': load_time_ms, 'peak_rss_mb': peak_rss_mb}
+
+
+def _load_and_serve_in_subprocess(conn, path: Path, method: str, batch: pd.Series, sparse: bool):
+    """Ejecutar `_load_and_serve` en un proceso hijo y enviar el resultado por el pipe."""
+    conn.send(_load_and_serve(path, method, batch, sparse))
+    conn.close()
+
+
+def _measure_load(path: Path, method: str, batch: pd.Series, sparse: bool) -> Dict[str, float]:
+    """
+    Medir la carga del artefacto y el RSS pico de carga + predicción.
+
+    El RSS máximo (`ru_maxrss`) solo crece durante la vida del proceso,
+    así que la medición se hace en un proceso hijo (fork): parte del RSS
+    del padre y lo que sube es lo que cuestan la carga y el lote. Sin
+    fork (Windows) se mide en el propio proceso y el RSS queda en NaN.
+    """
+    if resource is None or 'fork' not in multiprocessing.get_all_start_methods():
+        results = _load_and_serve(path, method, batch, sparse)
+        results['peak_rss_mb'] = float('nan')
+        return results
+
+    context = multiprocessing.get_context('fork')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_load_and_serve_in_subprocess, args=(child_conn, path, method, batch, sparse),
+        daemon=True
+    )
+    process.start()
+    child_conn.close()
+    try:
+        return parent_conn.recv()
+    except EOFError:
+        raise RuntimeError("El proceso de medición de carga terminó sin resultado")
+    finally:
+        process.join()
+        parent_conn.close()
+
+
+def benchmark_serving(
+    model: Any,
+    vectorizer: TextVectorizer,
+    texts: pd.Series,
+    batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+    n_single: int = 100,
+    min_batch_time: float = 0.2,
+    sparse: bool = False
+) -> Dict[str, float]:
+    """
+    Medir latencia, throughput, carga, memoria y tamaño de un modelo.
+
+    Args:
+        model: Modelo entrenado con `predict_proba`
+        vectorizer: TextVectorizer ajustado
+        texts: Textos preprocesados de ejemplo (p.ej. los de test)
+        batch_sizes: Tamaños de lote para el throughput
+        n_single: Textos a cronometrar uno a uno (latencia)
+        min_batch_time: Segundos mínimos de medición por tamaño de lote
+        sparse: Si True, no densifica la matriz (como la API con
+                `HateSpeechPredictor(sparse_input=True)`)
+
+    Returns:
+        Diccionario con latency_p50_ms, latency_p99_ms,
+        throughput_b<N> (textos/s), load_time_ms, peak_rss_mb (MB de
+        RSS que suben la carga del artefacto y la predicción del mayor
+        lote; NaN donde no hay `resource` o fork) y artifact_size_kb
+    """
+    texts = pd.Series(texts).reset_index(drop=True)
+    if texts.empty:
+        raise ValueError("Se necesita al menos un texto para medir el servicio")
+
+    # Calentamiento (cachés, imports perezosos de sklearn)
+    _serve(model, vectorizer, texts.iloc[:1], sparse)
+
+    # Latencia texto a texto, como una petición a /predict
+    timings = []
+    for i in range(n_single):
+        text = texts.iloc[[i % len(texts)]]
+        start = time.perf_counter()
+        _serve(model, vectorizer, text, sparse)
+        timings.append(time.perf_counter() - start)
+
+    results = {
+        'latency_p50_ms': float(np.percentile(timings, 50) * 1000),
+        'latency_p99_ms': float(np.percentile(timings, 99) * 1000)
+    }
+
+    # Throughput por tamaño de lote (repitiendo textos si hacen falta más)
+    for batch_size in batch_sizes:
+        batch = texts.iloc[np.arange(batch_size) % len(texts)].reset_index(drop=True)
+        n_batches = 0
+        start = time.perf_counter()
+        while True:
+            _serve(model, vectorizer, batch, sparse)
+            n_batches += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_batch_time:
+                break
+        results[f'throughput_b{batch_size}'] = float(n_batches * batch_size / elapsed)
+
+    # Carga desde disco y RSS pico (carga + mayor lote)
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as tmp_dir:
+        path = Path(tmp_dir) / 'serving.joblib'
+        joblib.dump({'model': model, 'vectorizer': vectorizer.vectorizer}, path)
+        results['artifact_size_kb'] = path.stat().st_size / 1024
+
+        batch = texts.iloc[np.arange(max(batch_sizes)) % len(texts)].reset_index(drop=True)
+        results.update(_measure_load(path, vectorizer.method, batch, sparse))
+
+    return results
+
+
+def benchmark_models(
+    models: Dict[str, Any],
+    vectorizer: TextVectorizer,
+    texts: pd.Series,
+    batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+    n_single: int = 100,
+    vectorizers: Optional[Dict[str, TextVectorizer]] = None,
+    sparse: Optional[Dict[str, bool]] = None,
+    verbose: bool = True
+) -> pd.DataFrame:
+    """
+    Medir el coste de servicio de varios modelos.
+
+    Args:
+        models: Diccionario {nombre: modelo}
+        vectorizer: TextVectorizer compartido por los modelos
+        texts: Textos preprocesados de ejemplo
+        batch_sizes: Tamaños de lote para el throughput
+        n_single: Textos a cronometrar uno a uno
+        vectorizers: Vectorizador propio por modelo (opcional)
+        sparse: Entrada sparse por modelo {nombre: bool}, como se sirve
+                cada uno (por defecto densa)
+        verbose: Si True, imprime el progreso
+
+    Returns:
+        DataFrame con una fila por modelo, unible con `compare_models`
+        por la columna 'Modelo'
+    """
+    rows = []
+    for name, model in models.items():
+        model_vectorizer = (vectorizers or {}).get(name, vectorizer)
+        if verbose:
+            print(f"⏱️  Midiendo servicio de {name}...")
+        model_sparse = (sparse or {}).get(name, False)
+        cost = benchmark_serving(model, model_vectorizer, texts, batch_sizes, n_single,
+                                 sparse=model_sparse)
+        row = {
+            'Modelo': name,
+            'Latencia p50 (ms)': cost['latency_p50_ms'],
+            'Latencia p99 (ms)': cost['latency_p99_ms']
+        }
+        for batch_size in batch_sizes:
+            row[f'Throughput b={batch_size} (textos/s)'] = cost[f'throughput_b{batch_size}']
+        row['Carga (ms)'] = cost['load_time_ms']
+        row['RSS pico (MB)'] = cost['peak_rss_mb']
+        row['Tamaño (KB)'] = cost['artifact_size_kb']
+        rows.append(row)
+
+    return pd.DataFrame(rows)
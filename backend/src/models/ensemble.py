@@ -3,26 +3,211 @@ Módulo para ensemble de modelos.
 
 Este módulo contiene funciones para combinar múltiples modelos
 usando técnicas de ensemble (Voting, Stacking).
+
+Con `prefit=True` los ensembles se montan con modelos ya entrenados:
+los modelos base se entrenan una sola vez (en paralelo) y solo se
+ajusta el combinador; en stacking, sobre predicciones out-of-fold.
+Un soft voting de modelos lineales se puede exportar como un único
+modelo lineal (`collapse_linear_ensemble`).
 """
 
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Tuple, Union
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.calibration import CalibratedClassifierCV
 from sklearn.ensemble import VotingClassifier, StackingClassifier
 from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.svm import SVC
 
 # Imports relativos o absolutos
 try:
-    from .train import train_model
-    from .evaluate import evaluate_model
+    from .train import train_model, train_many
+    from .evaluate import (
+        evaluate_model, cross_validate_model, cv_fold_indices, positive_scores,
+        binary_confusion_matrix, metrics_from_confusion_matrix
+    )
+    from .benchmark import benchmark_models
+    from .oof_store import OOFStore
+    from ..utils.fingerprint import data_fingerprint
 except ImportError:
     import sys
     from pathlib import Path
     src_path = Path(__file__).parent.parent
     if str(src_path) not in sys.path:
         sys.path.insert(0, str(src_path))
-    from models.train import train_model
-    from models.evaluate import evaluate_model
+    from models.train import train_model, train_many
+    from models.evaluate import (
+        evaluate_model, cross_validate_model, cv_fold_indices, positive_scores,
+        binary_confusion_matrix, metrics_from_confusion_matrix
+    )
+    from models.benchmark import benchmark_models
+    from models.oof_store import OOFStore
+    from utils.fingerprint import data_fingerprint
+
+
+# Parámetros optimizados para reducir overfitting
+OPTIMIZED_PARAMS = {
+    'svm': {'C': 0.056, 'kernel': 'linear', 'class_weight': 'balanced'},
+    'logistic': {'C': 0.1, 'penalty': 'l2', 'class_weight': 'balanced', 'max_iter': 1000},
+    'naive_bayes': {'alpha': 10.0},  # Mayor regularización
+    'random_forest': {'n_estimators': 50, 'max_depth': 5, 'min_samples_split': 10, 
+                     'min_samples_leaf': 5, 'class_weight': 'balanced'}
+}
+
+
+def _resolve_configs(
+    models_config: List[Dict[str, Any]],
+    use_optimized_params: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Normalizar configuraciones: nombre por defecto y parámetros finales.
+    
+    Args:
+        models_config: Lista de configuraciones de modelos
+        use_optimized_params: Si True, parte de OPTIMIZED_PARAMS
+        
+    Returns:
+        Lista de configuraciones {'name', 'type', 'params'}
+    """
+    configs = []
+    for config in models_config:
+        model_type = config['type']
+        model_params = config.get('params', {})
+        
+        # Usar parámetros optimizados si está habilitado
+        if use_optimized_params and model_type in OPTIMIZED_PARAMS:
+            # Combinar parámetros: los del config tienen prioridad
+            final_params = {**OPTIMIZED_PARAMS[model_type], **model_params}
+        else:
+            final_params = model_params
+        configs.append({'name': config.get('name', model_type), 'type': model_type, 'params': final_params})
+    return configs
+
+
+def train_base_models(
+    configs: List[Dict[str, Any]],
+    X_train: np.ndarray,
+    y_train: pd.Series,
+    fitted_models: Optional[Dict[str, Any]] = None,
+    n_jobs: int = -1
+) -> List[Tuple[str, Any]]:
+    """
+    Entrenar (en paralelo) los modelos base que no estén ya entrenados.
+    
+    Args:
+        configs: Configuraciones resueltas (ver `_resolve_configs`)
+        X_train: Matriz de características de entrenamiento
+        y_train: Etiquetas de entrenamiento
+        fitted_models: Modelos ya entrenados {nombre: modelo} a reutilizar
+        n_jobs: Procesos para entrenar los que falten
+        
+    Returns:
+        Lista de tuplas (nombre, modelo) en el orden de `configs`
+    """
+    fitted_models = dict(fitted_models or {})
+    missing = [config for config in configs if config['name'] not in fitted_models]
+    if missing:
+        trained = train_many(missing, X_train, y_train, n_jobs=n_jobs, verbose=False)
+        fitted_models.update({name: result['model'] for name, result in trained.items()})
+    return [(config['name'], fitted_models[config['name']]) for config in configs]
+
+
+class PrefitVotingClassifier:
+    """
+    Voting con modelos base ya entrenados (no se vuelven a ajustar).
+    
+    Equivale a `VotingClassifier` sobre los mismos modelos: 'soft' promedia
+    (con pesos) las probabilidades y 'hard' hace votación ponderada de las
+    predicciones.
+    """
+    
+    def __init__(
+        self,
+        estimators: List[Tuple[str, Any]],
+        voting: str = 'soft',
+        weights: Optional[List[float]] = None
+    ):
+        """
+        Inicializar ensemble.
+        
+        Args:
+            estimators: Lista de tuplas (nombre, modelo entrenado)
+            voting: 'soft' o 'hard'
+            weights: Pesos de cada modelo (default: iguales)
+        """
+        if voting not in ('soft', 'hard'):
+            raise ValueError(f"Votación '{voting}' no soportada. Usa: 'soft', 'hard'")
+        if weights is not None and len(weights) != len(estimators):
+            raise ValueError(f"Se esperaban {len(estimators)} pesos, recibidos {len(weights)}")
+        self.estimators = list(estimators)
+        self.named_estimators_ = dict(self.estimators)
+        self.voting = voting
+        self.weights = weights
+        self.classes_ = self.estimators[0][1].classes_
+        for name, model in self.estimators:
+            if not np.array_equal(model.classes_, self.classes_):
+                raise ValueError(f"El modelo '{name}' tiene clases distintas: {model.classes_}")
+    
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Media (ponderada) de las probabilidades de los modelos base."""
+        if self.voting == 'hard':
+            raise AttributeError("predict_proba no está disponible con voting='hard'")
+        probabilities = [model.predict_proba(X) for _, model in self.estimators]
+        return np.average(probabilities, axis=0, weights=self.weights)
+    
+    def predict(self, X: Any) -> np.ndarray:
+        """Clase con mayor probabilidad media (soft) o más votos (hard)."""
+        if self.voting == 'soft':
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+        votes = np.column_stack([
+            np.searchsorted(self.classes_, model.predict(X)) for _, model in self.estimators
+        ])
+        weights = np.ones(len(self.estimators)) if self.weights is None else np.asarray(self.weights)
+        counts = np.zeros((votes.shape[0], len(self.classes_)))
+        for j in range(votes.shape[1]):
+            counts[np.arange(votes.shape[0]), votes[:, j]] += weights[j]
+        return self.classes_[np.argmax(counts, axis=1)]
+
+
+class PrefitStackingClassifier:
+    """
+    Stacking con modelos base ya entrenados y meta-modelo ajustado aparte.
+    
+    Como `StackingClassifier` en binario, cada modelo base aporta una
+    columna: su probabilidad positiva (o `decision_function` si no tiene
+    `predict_proba`).
+    """
+    
+    def __init__(self, estimators: List[Tuple[str, Any]], final_estimator: Any):
+        """
+        Inicializar ensemble.
+        
+        Args:
+            estimators: Lista de tuplas (nombre, modelo entrenado)
+            final_estimator: Meta-modelo entrenado sobre las columnas base
+        """
+        self.estimators = list(estimators)
+        self.named_estimators_ = dict(self.estimators)
+        self.final_estimator_ = final_estimator
+        self.classes_ = final_estimator.classes_
+    
+    def transform(self, X: Any) -> np.ndarray:
+        """Columnas de entrada del meta-modelo (n_muestras, n_modelos)."""
+        return np.column_stack([positive_scores(model, X) for _, model in self.estimators])
+    
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Probabilidades del meta-modelo."""
+        return self.final_estimator_.predict_proba(self.transform(X))
+    
+    def predict(self, X: Any) -> np.ndarray:
+        """Predicción del meta-modelo."""
+        return self.final_estimator_.predict(self.transform(X))
 
 
 def create_voting_classifier(
@@ -31,11 +216,19 @@ def create_voting_classifier(
     y_train: pd.Series,
     voting: str = 'soft',
     weights: Optional[List[float]] = None,
-    use_optimized_params: bool = True
+    use_optimized_params: bool = True,
+    prefit: bool = False,
+    fitted_models: Optional[Dict[str, Any]] = None,
+    n_jobs: int = -1
 ) -> VotingClassifier:
     """
     Crear ensemble con Voting Classifier.
     
+    `VotingClassifier.fit` clona y vuelve a entrenar cada modelo base. Con
+    `prefit=True` los modelos base se entrenan una sola vez, en paralelo
+    (o se reutilizan de `fitted_models`), y se combinan en un
+    PrefitVotingClassifier sin reentrenar nada.
+    
     Args:
         models_config: Lista de diccionarios con configuración de modelos
                       [{'name': 'svm', 'type': 'svm', 'params': {...}}, ...]
@@ -44,36 +237,27 @@ def create_voting_classifier(
         voting: Tipo de votación ('hard' o 'soft', default: 'soft')
         weights: Pesos para cada modelo (opcional)
         use_optimized_params: Si True, usa parámetros optimizados para reducir overfitting
+        prefit: Si True, monta el ensemble con modelos ya entrenados
+        fitted_models: Modelos ya entrenados {nombre: modelo} (solo con prefit)
+        n_jobs: Procesos para entrenar los modelos base (solo con prefit)
         
     Returns:
-        VotingClassifier entrenado
+        VotingClassifier entrenado (PrefitVotingClassifier con prefit)
     """
-    estimators = []
+    configs = _resolve_configs(models_config, use_optimized_params)
     
-    # Parámetros optimizados para reducir overfitting
-    optimized_params = {
-        'svm': {'C': 0.056, 'kernel': 'linear', 'class_weight': 'balanced'},
-        'logistic': {'C': 0.1, 'penalty': 'l2', 'class_weight': 'balanced', 'max_iter': 1000},
-        'naive_bayes': {'alpha': 10.0},  # Mayor regularización
-        'random_forest': {'n_estimators': 50, 'max_depth': 5, 'min_samples_split': 10, 
-                         'min_samples_leaf': 5, 'class_weight': 'balanced'}
-    }
+    if prefit:
+        estimators = train_base_models(configs, X_train, y_train, fitted_models, n_jobs)
+        voting_clf = PrefitVotingClassifier(estimators, voting=voting, weights=weights)
+        print(f"✅ Voting Classifier (pre-entrenado) creado con {len(estimators)} modelos")
+        print(f"   Tipo de votación: {voting}")
+        return voting_clf
     
-    for config in models_config:
-        model_type = config['type']
-        model_params = config.get('params', {})
-        model_name = config.get('name', model_type)
-        
-        # Usar parámetros optimizados si está habilitado
-        if use_optimized_params and model_type in optimized_params:
-            # Combinar parámetros: los del config tienen prioridad
-            final_params = {**optimized_params[model_type], **model_params}
-        else:
-            final_params = model_params
-        
+    estimators = []
+    for config in configs:
         # Entrenar modelo individual
-        model = train_model(model_type, X_train, y_train, **final_params)
-        estimators.append((model_name, model))
+        model = train_model(config['type'], X_train, y_train, **config['params'])
+        estimators.append((config['name'], model))
     
     # Crear Voting Classifier
     voting_clf = VotingClassifier(
@@ -99,11 +283,24 @@ def create_stacking_classifier(
     y_train: pd.Series,
     final_estimator: Any = None,
     cv: int = 5,
-    use_optimized_params: bool = True
+    use_optimized_params: bool = True,
+    prefit: bool = False,
+    fitted_models: Optional[Dict[str, Any]] = None,
+    oof_scores: Optional[Dict[str, np.ndarray]] = None,
+    oof_store: Optional[OOFStore] = None,
+    n_jobs: int = -1
 ) -> StackingClassifier:
     """
     Crear ensemble con Stacking Classifier.
     
+    `StackingClassifier.fit` entrena cada modelo base sobre todo train y
+    otra vez en cada fold. Con `prefit=True` cada modelo base se entrena
+    una sola vez sobre todo train (o se reutiliza de `fitted_models`) y el
+    meta-modelo se ajusta sobre sus scores out-of-fold: los de
+    `oof_scores` si ya están calculados (p.ej. `cross_validate_model`),
+    los de `oof_store` (que los guarda en disco para siguientes
+    llamadas) o, si no, con `cross_validate_model` en paralelo.
+    
     Args:
         models_config: Lista de diccionarios con configuración de modelos
         X_train: Matriz de características de entrenamiento
@@ -111,36 +308,17 @@ def create_stacking_classifier(
         final_estimator: Estimador final (default: LogisticRegression)
         cv: Número de folds para cross-validation (default: 5)
         use_optimized_params: Si True, usa parámetros optimizados para reducir overfitting
+        prefit: Si True, monta el ensemble con modelos ya entrenados
+        fitted_models: Modelos ya entrenados {nombre: modelo} (solo con prefit)
+        oof_scores: Scores out-of-fold ya calculados {nombre: array}
+                    (solo con prefit)
+        oof_store: Almacén de scores out-of-fold (solo con prefit)
+        n_jobs: Procesos para entrenar modelos base y folds (solo con prefit)
         
     Returns:
-        StackingClassifier entrenado
+        StackingClassifier entrenado (PrefitStackingClassifier con prefit)
     """
-    estimators = []
-    
-    # Parámetros optimizados para reducir overfitting
-    optimized_params = {
-        'svm': {'C': 0.056, 'kernel': 'linear', 'class_weight': 'balanced'},
-        'logistic': {'C': 0.1, 'penalty': 'l2', 'class_weight': 'balanced', 'max_iter': 1000},
-        'naive_bayes': {'alpha': 10.0},  # Mayor regularización
-        'random_forest': {'n_estimators': 50, 'max_depth': 5, 'min_samples_split': 10, 
-                         'min_samples_leaf': 5, 'class_weight': 'balanced'}
-    }
-    
-    for config in models_config:
-        model_type = config['type']
-        model_params = config.get('params', {})
-        model_name = config.get('name', model_type)
-        
-        # Usar parámetros optimizados si está habilitado
-        if use_optimized_params and model_type in optimized_params:
-            # Combinar parámetros: los del config tienen prioridad
-            final_params = {**optimized_params[model_type], **model_params}
-        else:
-            final_params = model_params
-        
-        # Entrenar modelo individual
-        model = train_model(model_type, X_train, y_train, **final_params)
-        estimators.append((model_name, model))
+    configs = _resolve_configs(models_config, use_optimized_params)
     
     # Estimador final por defecto (con regularización)
     if final_estimator is None:
@@ -151,6 +329,42 @@ def create_stacking_classifier(
             random_state=42
         )
     
+    if prefit:
+        estimators = train_base_models(configs, X_train, y_train, fitted_models, n_jobs)
+        
+        # Columnas del meta-modelo: scores out-of-fold de cada modelo base
+        oof_scores = dict(oof_scores) if oof_scores is not None else {}
+        folds = cv_fold_indices(y_train, cv)
+        # Huella de los datos una sola vez para todas las consultas al almacén
+        data_hash = data_fingerprint(X_train, y_train) if oof_store is not None else None
+        for config in configs:
+            if config['name'] in oof_scores:
+                continue
+            if oof_store is not None:
+                oof_scores[config['name']] = oof_store.get_or_compute(
+                    config['type'], config['params'], X_train, y_train, cv=cv, n_jobs=n_jobs,
+                    data_hash=data_hash
+                )
+            else:
+                oof_scores[config['name']] = cross_validate_model(
+                    config['type'], X_train, y_train, folds=folds, n_jobs=n_jobs,
+                    verbose=False, **config['params']
+                )['oof_scores']
+        meta_features = np.column_stack([oof_scores[config['name']] for config in configs])
+        
+        final_estimator = clone(final_estimator).fit(meta_features, np.asarray(y_train))
+        stacking_clf = PrefitStackingClassifier(estimators, final_estimator)
+        print(f"✅ Stacking Classifier (pre-entrenado) creado con {len(estimators)} modelos")
+        print(f"   Meta-modelo ajustado sobre predicciones out-of-fold")
+        print(f"   Estimador final: {type(final_estimator).__name__}")
+        return stacking_clf
+    
+    estimators = []
+    for config in configs:
+        # Entrenar modelo individual
+        model = train_model(config['type'], X_train, y_train, **config['params'])
+        estimators.append((config['name'], model))
+    
     # Crear Stacking Classifier
     stacking_clf = StackingClassifier(
         estimators=estimators,
@@ -169,17 +383,100 @@ def create_stacking_classifier(
     return stacking_clf
 
 
+def evaluate_combiners(
+    oof_scores: pd.DataFrame,
+    y_train: pd.Series,
+    combiners: Dict[str, Union[Any, List[float]]],
+    model_subsets: Optional[Dict[str, List[str]]] = None,
+    cv: int = 5,
+    random_state: int = 42
+) -> pd.DataFrame:
+    """
+    Comparar combinadores de stacking sobre scores out-of-fold ya calculados.
+    
+    No se entrena ningún modelo base: cada combinador trabaja sobre la
+    matriz (n_muestras, n_modelos) de un OOFStore, así que probar otro
+    meta-modelo, otro subconjunto de modelos u otros pesos tarda
+    milisegundos. Los meta-modelos se evalúan a su vez con validación
+    cruzada sobre esa matriz; una lista de pesos se evalúa como soft
+    voting (media ponderada y umbral 0.5), así que solo se admite si todas
+    las columnas son probabilidades: los modelos sin `predict_proba`
+    (p.ej. LinearSVC) guardan `decision_function`, que no está en [0, 1]
+    y no se puede promediar con ellas. Solo la combinación elegida
+    se materializa después con `create_stacking_classifier(prefit=True,
+    oof_store=...)` o `create_voting_classifier(prefit=True, weights=...)`.
+    
+    Args:
+        oof_scores: Scores out-of-fold por modelo (ver `OOFStore.oof_matrix`)
+        y_train: Etiquetas de entrenamiento
+        combiners: Diccionario {nombre: meta-modelo sin entrenar o lista de pesos}
+        model_subsets: Subconjuntos de modelos {nombre: [columnas]}
+                       (default: todos los modelos)
+        cv: Folds para evaluar los meta-modelos
+        random_state: Semilla de los folds
+        
+    Returns:
+        DataFrame con métricas y tiempo por combinador y subconjunto,
+        ordenado por F1
+    """
+    y = np.asarray(y_train)
+    model_subsets = model_subsets or {'todos': list(oof_scores.columns)}
+    folds = cv_fold_indices(y, cv, random_state)
+    
+    rows = []
+    for subset_name, columns in model_subsets.items():
+        Z = oof_scores[columns].to_numpy()
+        for combiner_name, combiner in combiners.items():
+            start = time.perf_counter()
+            if isinstance(combiner, (list, tuple, np.ndarray)):
+                if len(combiner) != len(columns):
+                    raise ValueError(f"'{combiner_name}' tiene {len(combiner)} pesos para "
+                                     f"{len(columns)} modelos ({subset_name})")
+                not_probabilities = [column for column, values in zip(columns, Z.T)
+                                     if values.min() < 0 or values.max() > 1]
+                if not_probabilities:
+                    raise ValueError(f"'{combiner_name}' promedia probabilidades, pero "
+                                     f"{not_probabilities} tienen scores de decision_function; "
+                                     f"usa un meta-modelo para combinarlos")
+                y_pred = (np.average(Z, axis=1, weights=combiner) > 0.5).astype(int)
+            else:
+                y_pred = np.zeros(len(y), dtype=int)
+                for train_idx, val_idx in folds:
+                    meta_model = clone(combiner).fit(Z[train_idx], y[train_idx])
+                    y_pred[val_idx] = meta_model.predict(Z[val_idx])
+            elapsed = time.perf_counter() - start
+            
+            metrics = metrics_from_confusion_matrix(binary_confusion_matrix(y, y_pred))
+            rows.append({
+                'Combinador': combiner_name,
+                'Modelos': subset_name,
+                'F1': metrics['f1'],
+                'Accuracy': metrics['accuracy'],
+                'Precision': metrics['precision'],
+                'Recall': metrics['recall'],
+                'Tiempo (ms)': elapsed * 1000
+            })
+    
+    return pd.DataFrame(rows).sort_values(by='F1', ascending=False).reset_index(drop=True)
+
+
 def compare_ensemble_vs_individual(
     ensemble_model: Any,
     individual_models: Dict[str, Any],
     X_train: np.ndarray,
     X_test: np.ndarray,
     y_train: pd.Series,
-    y_test: pd.Series
+    y_test: pd.Series,
+    vectorizer: Any = None,
+    serving_texts: Optional[pd.Series] = None
 ) -> pd.DataFrame:
     """
     Comparar ensemble con modelos individuales.
     
+    Con `vectorizer` y `serving_texts` se mide además el coste de servir
+    cada modelo (latencia, throughput, carga, memoria y tamaño), ya que un
+    ensemble suele ser más lento que cualquiera de sus miembros.
+    
     Args:
         ensemble_model: Modelo ensemble entrenado
         individual_models: Diccionario con modelos individuales {name: model}
@@ -187,6 +484,8 @@ def compare_ensemble_vs_individual(
         X_test: Matriz de características de prueba
         y_train: Etiquetas de entrenamiento
         y_test: Etiquetas de prueba
+        vectorizer: TextVectorizer ajustado (opcional)
+        serving_texts: Textos preprocesados para medir el servicio (opcional)
         
     Returns:
         DataFrame con comparación
@@ -222,5 +521,212 @@ def compare_ensemble_vs_individual(
     df = pd.DataFrame(comparison_data)
     df = df.sort_values(by='F1 (test)', ascending=False)
     
+    if vectorizer is not None and serving_texts is not None:
+        serving = benchmark_models(
+            {'Ensemble': ensemble_model, **individual_models}, vectorizer, serving_texts
+        )
+        df = df.merge(serving, on='Modelo', how='left')
+    
     return df
 
+
+def _linear_decision(model: Any) -> Optional[Tuple[np.ndarray, float]]:
+    """
+    Pesos y sesgo de la función de decisión lineal de un modelo binario.
+    
+    Soporta modelos con `coef_`/`intercept_` (LogisticRegression,
+    LinearSVC, SGDClassifier, SVC con kernel lineal), MultinomialNB (sus
+    log-odds son lineales en X) y CalibratedClassifierCV sobre cualquiera
+    de ellos (media de los modelos calibrados).
+    
+    Args:
+        model: Modelo entrenado
+        
+    Returns:
+        Tupla (pesos (n_features,), sesgo), o None si no es lineal
+    """
+    if isinstance(model, CalibratedClassifierCV):
+        decisions = [_linear_decision(c.estimator) for c in model.calibrated_classifiers_]
+        if any(d is None for d in decisions):
+            return None
+        return (np.mean([d[0] for d in decisions], axis=0),
+                float(np.mean([d[1] for d in decisions])))
+    if isinstance(model, MultinomialNB):
+        coef = model.feature_log_prob_[1] - model.feature_log_prob_[0]
+        return coef, float(model.class_log_prior_[1] - model.class_log_prior_[0])
+    if isinstance(model, SVC) and model.kernel != 'linear':
+        return None
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_') and len(getattr(model, 'classes_', [])) == 2:
+        coef = model.coef_.toarray() if sparse.issparse(model.coef_) else np.asarray(model.coef_)
+        return coef.ravel().astype(np.float64), float(np.ravel(model.intercept_)[0])
+    return None
+
+
+def _voting_members(ensemble: Any) -> Tuple[List[Tuple[str, Any]], np.ndarray]:
+    """Miembros (nombre, modelo) y pesos de un soft voting ya entrenado."""
+    if isinstance(ensemble, PrefitVotingClassifier):
+        members = ensemble.estimators
+    elif isinstance(ensemble, VotingClassifier):
+        members = list(ensemble.named_estimators_.items())
+    else:
+        raise ValueError(f"Solo se pueden colapsar ensembles de votación, recibido {type(ensemble).__name__}")
+    if ensemble.voting != 'soft':
+        raise ValueError("Solo se pueden colapsar ensembles con voting='soft'")
+    weights = np.ones(len(members)) if ensemble.weights is None else np.asarray(ensemble.weights, dtype=float)
+    return members, weights
+
+
+class CollapsedLinearEnsemble:
+    """
+    Soft voting servido como un solo modelo lineal (+ miembros no lineales).
+    
+    Los miembros lineales se funden en un vector de pesos y un sesgo: la
+    probabilidad de esa parte es `sigmoid(X @ coef_ + intercept_)`, una
+    sola multiplicación matriz-vector en lugar de un `predict_proba` por
+    miembro. Los miembros no lineales se evalúan aparte (en paralelo con
+    `n_jobs`) y se mezclan con sus pesos de votación.
+    """
+    
+    def __init__(
+        self,
+        coef: np.ndarray,
+        intercept: float,
+        classes: np.ndarray,
+        linear_weight: float = 1.0,
+        nonlinear_members: Optional[List[Tuple[str, Any, float]]] = None,
+        n_jobs: int = 1
+    ):
+        """
+        Inicializar modelo colapsado.
+        
+        Args:
+            coef: Pesos fundidos de los miembros lineales (n_features,)
+            intercept: Sesgo fundido
+            classes: Clases del ensemble original
+            linear_weight: Peso de votación total de la parte lineal
+            nonlinear_members: Lista de tuplas (nombre, modelo, peso)
+            n_jobs: Hilos para evaluar los miembros no lineales
+        """
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = float(intercept)
+        self.classes_ = np.asarray(classes)
+        self.linear_weight = float(linear_weight)
+        self.nonlinear_members = list(nonlinear_members or [])
+        self.n_jobs = n_jobs
+    
+    def decision_function(self, X: Any) -> np.ndarray:
+        """Log-odds de la parte lineal."""
+        return np.asarray(X @ self.coef_).ravel() + self.intercept_
+    
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Probabilidades del ensemble (parte lineal + miembros no lineales)."""
+        positive = self.linear_weight / (1.0 + np.exp(-self.decision_function(X)))
+        if self.nonlinear_members:
+            member_probabilities = Parallel(n_jobs=self.n_jobs, prefer='threads')(
+                delayed(model.predict_proba)(X) for _, model, _ in self.nonlinear_members
+            )
+            for (_, _, weight), probabilities in zip(self.nonlinear_members, member_probabilities):
+                positive = positive + weight * probabilities[:, 1]
+        positive = positive / (self.linear_weight + sum(w for _, _, w in self.nonlinear_members))
+        return np.column_stack([1.0 - positive, positive])
+    
+    def predict(self, X: Any) -> np.ndarray:
+        """Clase con mayor probabilidad (como el soft voting)."""
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
+
+
+def collapse_linear_ensemble(
+    ensemble: Any,
+    X_fit: Any,
+    X_eval: Any = None,
+    y_eval: Optional[pd.Series] = None,
+    n_jobs: int = 1,
+    verbose: bool = True
+) -> Tuple[CollapsedLinearEnsemble, Dict[str, Any]]:
+    """
+    Exportar un soft voting como un único modelo lineal para servir.
+    
+    La media de probabilidades de los miembros lineales no es exactamente
+    lineal, así que se aproxima: con las decisiones lineales de cada
+    miembro sobre `X_fit` se ajusta una regresión logística que reproduce
+    esa media (objetivo suave), y sus coeficientes combinan los pesos de
+    los miembros en un solo vector y sesgo (calibración incluida). Los
+    miembros no lineales (p.ej. Random Forest) se mantienen aparte.
+    
+    Args:
+        ensemble: VotingClassifier o PrefitVotingClassifier soft entrenado
+        X_fit: Matriz sobre la que ajustar la combinación (p.ej. train)
+        X_eval: Matriz para el informe de fidelidad (default: X_fit)
+        y_eval: Etiquetas de X_eval para comparar F1 (opcional)
+        n_jobs: Hilos para evaluar miembros no lineales al servir
+        verbose: Si True, imprime el informe
+        
+    Returns:
+        Tupla (modelo colapsado, informe de fidelidad)
+    """
+    members, weights = _voting_members(ensemble)
+    
+    linear, nonlinear = [], []
+    for (name, model), weight in zip(members, weights):
+        decision = _linear_decision(model)
+        if decision is None:
+            nonlinear.append((name, model, float(weight)))
+        else:
+            linear.append((name, model, float(weight), decision))
+    
+    if not linear:
+        raise ValueError("El ensemble no tiene miembros lineales que colapsar")
+    
+    # Objetivo: media ponderada de las probabilidades de los miembros lineales
+    linear_weight = sum(weight for _, _, weight, _ in linear)
+    target = sum(weight * model.predict_proba(X_fit)[:, 1] for _, model, weight, _ in linear) / linear_weight
+    decisions = np.column_stack([
+        np.asarray(X_fit @ coef).ravel() + intercept for _, _, _, (coef, intercept) in linear
+    ])
+    
+    # Regresión logística con etiquetas suaves (cada fila como positivo y
+    # negativo, con pesos p y 1 - p)
+    combiner = LogisticRegression(C=1e4, max_iter=1000)
+    combiner.fit(
+        np.vstack([decisions, decisions]),
+        np.r_[np.ones(len(target)), np.zeros(len(target))],
+        sample_weight=np.r_[target, 1.0 - target]
+    )
+    member_scales = combiner.coef_[0]
+    coef = sum(scale * coef for scale, (_, _, _, (coef, _)) in zip(member_scales, linear))
+    intercept = combiner.intercept_[0] + sum(
+        scale * intercept for scale, (_, _, _, (_, intercept)) in zip(member_scales, linear)
+    )
+    
+    collapsed = CollapsedLinearEnsemble(
+        coef, intercept, ensemble.classes_, linear_weight=linear_weight,
+        nonlinear_members=nonlinear, n_jobs=n_jobs
+    )
+    
+    # Informe de fidelidad frente al ensemble original
+    X_eval = X_fit if X_eval is None else X_eval
+    original = ensemble.predict_proba(X_eval)[:, 1]
+    approximated = collapsed.predict_proba(X_eval)[:, 1]
+    report = {
+        'linear_members': [name for name, _, _, _ in linear],
+        'nonlinear_members': [name for name, _, _ in nonlinear],
+        'member_scales': {name: float(scale) for (name, _, _, _), scale in zip(linear, member_scales)},
+        'agreement': float(np.mean((original > 0.5) == (approximated > 0.5))),
+        'max_abs_diff': float(np.max(np.abs(original - approximated))),
+        'mean_abs_diff': float(np.mean(np.abs(original - approximated)))
+    }
+    if y_eval is not None:
+        report['f1_ensemble'] = float(f1_score(y_eval, ensemble.predict(X_eval), zero_division=0))
+        report['f1_collapsed'] = float(f1_score(y_eval, collapsed.predict(X_eval), zero_division=0))
+    
+    if verbose:
+        print(f"✅ Ensemble colapsado: {len(linear)} miembros lineales fundidos, "
+              f"{len(nonlinear)} no lineales aparte")
+        print(f"   Acuerdo de predicciones: {report['agreement']:.2%}")
+        print(f"   Diferencia de probabilidad: media {report['mean_abs_diff']:.4f}, "
+              f"máxima {report['max_abs_diff']:.4f}")
+        if y_eval is not None:
+            print(f"   F1 ensemble: {report['f1_ensemble']:.4f}  F1 colapsado: {report['f1_collapsed']:.4f}")
+    
+    return collapsed, report
+
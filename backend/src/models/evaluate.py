@@ -5,9 +5,12 @@ Este módulo contiene funciones para evaluar el rendimiento
 de modelos de clasificación de texto.
 """
 
-from typing import Dict, Tuple, Any
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple, Any, Optional
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
 from sklearn.metrics import (
     accuracy_score,
     precision_score,
@@ -16,6 +19,106 @@ from sklearn.metrics import (
     confusion_matrix,
     classification_report
 )
+from sklearn.model_selection import StratifiedKFold
+
+# Imports relativos o absolutos
+try:
+    from .train import train_model
+    from ..features.cache import FeatureCache
+    from ..utils.memmap import dump_shared_arrays, load_shared_array, cleanup_shared_arrays
+except ImportError:
+    import sys
+    src_path = Path(__file__).parent.parent
+    if str(src_path) not in sys.path:
+        sys.path.insert(0, str(src_path))
+    from models.train import train_model
+    from features.cache import FeatureCache
+    from utils.memmap import dump_shared_arrays, load_shared_array, cleanup_shared_arrays
+
+
+def metrics_from_confusion_matrix(cm: np.ndarray) -> Dict[str, float]:
+    """
+    Calcular métricas binarias a partir de una matriz de confusión 2x2.
+    
+    Equivalente a las funciones de sklearn con `zero_division=0`, pero
+    sin volver a recorrer las etiquetas: sirve para acumular conteos por
+    lotes (evaluación en streaming) y calcular las métricas al final.
+    
+    Args:
+        cm: Matriz [[tn, fp], [fn, tp]]
+        
+    Returns:
+        Diccionario con accuracy, precision, recall y f1
+    """
+    tn, fp, fn, tp = (int(v) for v in np.asarray(cm).ravel())
+    total = tn + fp + fn + tp
+    
+    accuracy = (tp + tn) / total if total > 0 else 0.0
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+    f1 = 2 * tp / (2 * tp + fp + fn) if (2 * tp + fp + fn) > 0 else 0.0
+    
+    return {
+        'accuracy': float(accuracy),
+        'precision': float(precision),
+        'recall': float(recall),
+        'f1': float(f1)
+    }
+
+
+def binary_confusion_matrix(y_true: Any, y_pred: Any) -> Optional[np.ndarray]:
+    """
+    Matriz de confusión 2x2 de etiquetas 0/1 con un solo `np.bincount`.
+    
+    Args:
+        y_true: Etiquetas reales
+        y_pred: Etiquetas predichas
+        
+    Returns:
+        Matriz [[tn, fp], [fn, tp]] (int64), o None si las etiquetas no
+        son enteros 0/1 (en ese caso hay que usar sklearn)
+    """
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    for labels in (y_true, y_pred):
+        if labels.dtype.kind not in 'biu':
+            return None
+        if labels.size and (labels.min() < 0 or labels.max() > 1):
+            return None
+    codes = 2 * y_true.astype(np.int64) + y_pred.astype(np.int64)
+    return np.bincount(codes, minlength=4).reshape(2, 2)
+
+
+def _split_metrics(y_true: Any, y_pred: Any) -> Tuple[Dict[str, float], np.ndarray]:
+    """
+    Métricas y matriz de confusión de un split en una sola pasada.
+    
+    Devuelve lo mismo que las funciones de sklearn con `zero_division=0`:
+    la matriz solo incluye las etiquetas presentes, como `confusion_matrix`.
+    
+    Args:
+        y_true: Etiquetas reales
+        y_pred: Etiquetas predichas
+        
+    Returns:
+        Tupla (métricas, matriz de confusión)
+    """
+    cm = binary_confusion_matrix(y_true, y_pred)
+    if cm is None:
+        # Etiquetas no binarias 0/1: mismo cálculo que antes con sklearn
+        metrics = {
+            'accuracy': accuracy_score(y_true, y_pred),
+            'precision': precision_score(y_true, y_pred, zero_division=0),
+            'recall': recall_score(y_true, y_pred, zero_division=0),
+            'f1': f1_score(y_true, y_pred, zero_division=0)
+        }
+        return metrics, confusion_matrix(y_true, y_pred)
+    
+    metrics = metrics_from_confusion_matrix(cm)
+    present = (cm.sum(axis=0) + cm.sum(axis=1)) > 0
+    if not present.all():
+        cm = cm[np.ix_(present, present)]
+    return metrics, cm
 
 
 def evaluate_model(
@@ -24,11 +127,16 @@ def evaluate_model(
     X_test: np.ndarray,
     y_train: pd.Series,
     y_test: pd.Series,
-    verbose: bool = True
+    verbose: bool = True,
+    y_train_pred: Optional[np.ndarray] = None
 ) -> Dict[str, float]:
     """
     Evaluar modelo en train y test.
     
+    Las métricas de cada split salen de su matriz de confusión, construida
+    con un solo `np.bincount` (ver `binary_confusion_matrix`), en lugar de
+    recorrer las etiquetas una vez por métrica.
+    
     Args:
         model: Modelo entrenado
         X_train: Matriz de características de entrenamiento
@@ -36,34 +144,36 @@ def evaluate_model(
         y_train: Etiquetas de entrenamiento
         y_test: Etiquetas de prueba
         verbose: Si True, imprime resultados (default: True)
+        y_train_pred: Predicciones ya calculadas sobre train (opcional,
+                      evita volver a predecir)
         
     Returns:
         Diccionario con métricas
     """
-    # Predicciones en train
-    y_train_pred = model.predict(X_train)
+    # Predicciones en train (reutilizar si ya se tienen)
+    if y_train_pred is None:
+        y_train_pred = model.predict(X_train)
     
     # Predicciones en test
     y_test_pred = model.predict(X_test)
     
     # Calcular métricas en train
-    train_accuracy = accuracy_score(y_train, y_train_pred)
-    train_precision = precision_score(y_train, y_train_pred, zero_division=0)
-    train_recall = recall_score(y_train, y_train_pred, zero_division=0)
-    train_f1 = f1_score(y_train, y_train_pred, zero_division=0)
+    train_metrics, _ = _split_metrics(y_train, y_train_pred)
+    train_accuracy = train_metrics['accuracy']
+    train_precision = train_metrics['precision']
+    train_recall = train_metrics['recall']
+    train_f1 = train_metrics['f1']
     
-    # Calcular métricas en test
-    test_accuracy = accuracy_score(y_test, y_test_pred)
-    test_precision = precision_score(y_test, y_test_pred, zero_division=0)
-    test_recall = recall_score(y_test, y_test_pred, zero_division=0)
-    test_f1 = f1_score(y_test, y_test_pred, zero_division=0)
+    # Calcular métricas en test (y su matriz de confusión)
+    test_metrics, cm_test = _split_metrics(y_test, y_test_pred)
+    test_accuracy = test_metrics['accuracy']
+    test_precision = test_metrics['precision']
+    test_recall = test_metrics['recall']
+    test_f1 = test_metrics['f1']
     
     # Calcular overfitting (diferencia F1)
     diff_f1 = abs(train_f1 - test_f1) * 100
     
-    # Matriz de confusión
-    cm_test = confusion_matrix(y_test, y_test_pred)
-    
     results = {
         'train_accuracy': train_accuracy,
         'train_precision': train_precision,
@@ -108,17 +218,197 @@ def evaluate_model(
     return results
 
 
+BOOTSTRAP_METRICS = ('accuracy', 'precision', 'recall', 'f1')
+
+
+def _metrics_from_counts(counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Versión vectorizada de `metrics_from_confusion_matrix`.
+    
+    Args:
+        counts: Array (n, 4) con [tn, fp, fn, tp] por fila
+        
+    Returns:
+        Diccionario {métrica: array (n,)} con `zero_division=0`
+    """
+    tn, fp, fn, tp = (counts[:, i].astype(float) for i in range(4))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'accuracy': np.nan_to_num((tp + tn) / (tn + fp + fn + tp)),
+            'precision': np.nan_to_num(tp / (tp + fp)),
+            'recall': np.nan_to_num(tp / (tp + fn)),
+            'f1': np.nan_to_num(2 * tp / (2 * tp + fp + fn))
+        }
+
+
+def _bootstrap_counts(
+    codes: List[np.ndarray],
+    n_bootstrap: int,
+    rng: np.random.Generator,
+    max_cells: int = 4_000_000
+) -> List[np.ndarray]:
+    """
+    Matrices de confusión de `n_bootstrap` remuestreos sin bucle por remuestreo.
+    
+    Cada bloque de remuestreos es una matriz de índices; desplazando el
+    código de cada fila (`4 * fila`) un solo `np.bincount` cuenta todas las
+    matrices del bloque. Todos los arrays de `codes` usan los mismos
+    índices (bootstrap pareado). Los bloques limitan la memoria a
+    `max_cells` índices.
+    
+    Args:
+        codes: Códigos 2 * y_true + y_pred (0-3) de uno o varios modelos
+        n_bootstrap: Número de remuestreos
+        rng: Generador aleatorio
+        max_cells: Índices máximos por bloque
+        
+    Returns:
+        Lista con un array (n_bootstrap, 4) de [tn, fp, fn, tp] por modelo
+    """
+    n = len(codes[0])
+    batch = max(1, max_cells // n)
+    counts = [[] for _ in codes]
+    for start in range(0, n_bootstrap, batch):
+        rows = min(batch, n_bootstrap - start)
+        indices = rng.integers(0, n, size=(rows, n))
+        offsets = 4 * np.arange(rows)[:, None]
+        for model_codes, model_counts in zip(codes, counts):
+            sample = (model_codes[indices] + offsets).ravel()
+            model_counts.append(np.bincount(sample, minlength=4 * rows).reshape(rows, 4))
+    return [np.vstack(model_counts) for model_counts in counts]
+
+
+def _binary_codes(y_true: Any, y_pred: Any) -> np.ndarray:
+    """Códigos 2 * y_true + y_pred (0-3) de etiquetas binarias 0/1."""
+    y_true = np.asarray(y_true).astype(np.int64)
+    y_pred = np.asarray(y_pred).astype(np.int64)
+    if y_true.shape != y_pred.shape:
+        raise ValueError(f"Etiquetas y predicciones con tamaños distintos: {y_true.shape} vs {y_pred.shape}")
+    if y_true.size == 0:
+        raise ValueError("No hay ejemplos para el bootstrap")
+    return 2 * y_true + y_pred
+
+
+def bootstrap_metrics(
+    y_true: Any,
+    y_pred: Any,
+    n_bootstrap: int = 2000,
+    confidence: float = 0.95,
+    random_state: int = 42
+) -> pd.DataFrame:
+    """
+    Intervalos de confianza bootstrap (percentil) de las métricas de test.
+    
+    Args:
+        y_true: Etiquetas reales (0/1)
+        y_pred: Etiquetas predichas (0/1)
+        n_bootstrap: Número de remuestreos
+        confidence: Nivel de confianza del intervalo
+        random_state: Semilla
+        
+    Returns:
+        DataFrame con Métrica, Valor, IC inferior e IC superior
+    """
+    codes = _binary_codes(y_true, y_pred)
+    point = metrics_from_confusion_matrix(np.bincount(codes, minlength=4))
+    counts = _bootstrap_counts([codes], n_bootstrap, np.random.default_rng(random_state))[0]
+    samples = _metrics_from_counts(counts)
+    
+    alpha = (1 - confidence) / 2
+    rows = []
+    for metric in BOOTSTRAP_METRICS:
+        lower, upper = np.quantile(samples[metric], [alpha, 1 - alpha])
+        rows.append({
+            'Métrica': metric,
+            'Valor': point[metric],
+            'IC inferior': float(lower),
+            'IC superior': float(upper)
+        })
+    return pd.DataFrame(rows)
+
+
+def paired_bootstrap_comparison(
+    y_true: Any,
+    y_pred_a: Any,
+    y_pred_b: Any,
+    metric: str = 'f1',
+    n_bootstrap: int = 2000,
+    confidence: float = 0.95,
+    random_state: int = 42
+) -> Dict[str, float]:
+    """
+    Comparar dos modelos con bootstrap pareado sobre el mismo test.
+    
+    Ambos modelos se evalúan en los mismos remuestreos, de modo que la
+    variabilidad del conjunto de test se cancela en la diferencia.
+    
+    Args:
+        y_true: Etiquetas reales (0/1)
+        y_pred_a: Predicciones del modelo A
+        y_pred_b: Predicciones del modelo B
+        metric: 'accuracy', 'precision', 'recall' o 'f1'
+        n_bootstrap: Número de remuestreos
+        confidence: Nivel de confianza del intervalo
+        random_state: Semilla
+        
+    Returns:
+        Diccionario con la diferencia A - B, su intervalo y la
+        proporción de remuestreos en los que A es mejor
+    """
+    if metric not in BOOTSTRAP_METRICS:
+        raise ValueError(f"Métrica '{metric}' no soportada. Usa: {', '.join(BOOTSTRAP_METRICS)}")
+    codes_a = _binary_codes(y_true, y_pred_a)
+    codes_b = _binary_codes(y_true, y_pred_b)
+    
+    counts_a, counts_b = _bootstrap_counts([codes_a, codes_b], n_bootstrap, np.random.default_rng(random_state))
+    differences = _metrics_from_counts(counts_a)[metric] - _metrics_from_counts(counts_b)[metric]
+    
+    point = (metrics_from_confusion_matrix(np.bincount(codes_a, minlength=4))[metric]
+             - metrics_from_confusion_matrix(np.bincount(codes_b, minlength=4))[metric])
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(differences, [alpha, 1 - alpha])
+    return {
+        'metric': metric,
+        'difference': float(point),
+        'ci_lower': float(lower),
+        'ci_upper': float(upper),
+        'prob_a_better': float(np.mean(differences > 0))
+    }
+
+
 def compare_models(
     results_dict: Dict[str, Dict[str, float]],
-    metric: str = 'F1 (test)'
+    metric: str = 'F1 (test)',
+    y_test: Optional[Any] = None,
+    predictions: Optional[Dict[str, Any]] = None,
+    n_bootstrap: int = 1000,
+    confidence: float = 0.95,
+    serving: Optional[pd.DataFrame] = None,
+    max_latency_ms: Optional[float] = None
 ) -> pd.DataFrame:
     """
     Comparar resultados de múltiples modelos.
     
+    Con `y_test` y las predicciones de test de cada modelo se añade el
+    intervalo bootstrap del F1 y una comparación pareada del F1 con el
+    modelo de mayor F1 (test), sea cual sea `metric`: 'Empate con el
+    mejor' indica que el intervalo de la diferencia incluye el 0 (la
+    diferencia puede ser ruido).
+    
+    Con `serving` (resultado de `models.benchmark.benchmark_models`) se
+    añaden las columnas de coste de servicio; con `max_latency_ms` los
+    modelos cuya latencia p99 supera el presupuesto pasan al final.
+    
     Args:
         results_dict: Diccionario con resultados de modelos
                      {model_name: {metrics_dict}}
         metric: Métrica principal para comparar (default: 'F1 (test)')
+        y_test: Etiquetas de test (opcional)
+        predictions: Predicciones de test {model_name: y_pred} (opcional)
+        n_bootstrap: Número de remuestreos bootstrap
+        confidence: Nivel de confianza de los intervalos
+        serving: DataFrame de coste de servicio por modelo (opcional)
+        max_latency_ms: Latencia p99 máxima aceptable (opcional)
         
     Returns:
         DataFrame con comparación
@@ -149,6 +439,33 @@ def compare_models(
     sort_metric = metric_map.get(metric, metric)
     df = df.sort_values(by=sort_metric, ascending=False)
     
+    if y_test is not None and predictions:
+        # Referencia fija y en la misma métrica que el bootstrap (F1)
+        best_model = df.loc[df['F1 (test)'].idxmax(), 'Modelo']
+        lower, upper, tied = [], [], []
+        for model_name in df['Modelo']:
+            ci = bootstrap_metrics(y_test, predictions[model_name], n_bootstrap, confidence)
+            f1_row = ci[ci['Métrica'] == 'f1'].iloc[0]
+            lower.append(f1_row['IC inferior'])
+            upper.append(f1_row['IC superior'])
+            if model_name == best_model:
+                tied.append(True)
+                continue
+            paired = paired_bootstrap_comparison(
+                y_test, predictions[best_model], predictions[model_name],
+                n_bootstrap=n_bootstrap, confidence=confidence
+            )
+            tied.append(paired['ci_lower'] <= 0.0 <= paired['ci_upper'])
+        df['F1 IC inferior'] = lower
+        df['F1 IC superior'] = upper
+        df['Empate con el mejor'] = tied
+    
+    if serving is not None:
+        df = df.merge(serving, on='Modelo', how='left')
+        if max_latency_ms is not None:
+            df['Cumple latencia'] = df['Latencia p99 (ms)'] <= max_latency_ms
+            df = df.sort_values(by=['Cumple latencia', sort_metric], ascending=[False, False])
+    
     return df
 
 
@@ -172,3 +489,353 @@ def print_classification_report(
     print("="*80)
     print(report)
 
+
+
+def threshold_sweep(
+    y_true: Any,
+    scores: np.ndarray,
+    cost_fp: float = 1.0,
+    cost_fn: float = 1.0
+) -> pd.DataFrame:
+    """
+    Métricas en cada umbral distinto con un solo orden + sumas acumuladas.
+    
+    Un ejemplo se predice positivo si su score es >= umbral (igual que en
+    `HateSpeechPredictor`). El coste de cada umbral es
+    `cost_fp * FP + cost_fn * FN`.
+    
+    Args:
+        y_true: Etiquetas reales (0/1)
+        scores: Probabilidad de la clase positiva de cada ejemplo
+        cost_fp: Coste de un falso positivo
+        cost_fn: Coste de un falso negativo
+        
+    Returns:
+        DataFrame con umbral, conteos, precision, recall, F1 y coste,
+        ordenado de mayor a menor umbral
+    """
+    y_true = np.asarray(y_true).astype(np.int64)
+    scores = np.asarray(scores, dtype=float)
+    if y_true.shape != scores.shape:
+        raise ValueError(f"Etiquetas y scores con tamaños distintos: {y_true.shape} vs {scores.shape}")
+    
+    order = np.argsort(-scores, kind='mergesort')
+    sorted_scores = scores[order]
+    tp = np.cumsum(y_true[order])
+    fp = np.cumsum(1 - y_true[order])
+    
+    # Quedarse con el último ejemplo de cada grupo de scores iguales
+    last_of_group = np.r_[sorted_scores[1:] != sorted_scores[:-1], True]
+    thresholds = sorted_scores[last_of_group]
+    tp = tp[last_of_group]
+    fp = fp[last_of_group]
+    positives = int(y_true.sum())
+    fn = positives - tp
+    tn = len(y_true) - positives - fp
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(positives > 0, tp / max(positives, 1), 0.0)
+        f1 = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+    
+    return pd.DataFrame({
+        'Umbral': thresholds,
+        'TP': tp,
+        'FP': fp,
+        'FN': fn,
+        'TN': tn,
+        'Precision': precision,
+        'Recall': recall,
+        'F1': f1,
+        'Coste': cost_fp * fp + cost_fn * fn
+    })
+
+
+def select_threshold(
+    model: Any,
+    X_val: np.ndarray,
+    y_val: pd.Series,
+    objective: str = 'f1',
+    cost_fp: float = 1.0,
+    cost_fn: float = 1.0,
+    artifact_dir: Optional[Any] = None,
+    verbose: bool = True
+) -> Dict[str, Any]:
+    """
+    Elegir el umbral de decisión de un modelo sobre un conjunto de validación.
+    
+    Cada ejemplo se puntúa una sola vez con `predict_proba`; el barrido
+    de umbrales (`threshold_sweep`) es O(n log n). Si se indica
+    `artifact_dir`, el umbral elegido se guarda en el manifest del
+    artefacto, que es de donde lo lee `HateSpeechPredictor.from_artifact`.
+    
+    Args:
+        model: Modelo entrenado con `predict_proba`
+        X_val: Matriz de características de validación
+        y_val: Etiquetas de validación
+        objective: 'f1' (maximizar F1) o 'cost' (minimizar el coste)
+        cost_fp: Coste de un falso positivo
+        cost_fn: Coste de un falso negativo
+        artifact_dir: Directorio del artefacto a actualizar (opcional)
+        verbose: Si True, imprime el umbral elegido
+        
+    Returns:
+        Diccionario con el umbral y sus métricas
+    """
+    if objective not in ('f1', 'cost'):
+        raise ValueError(f"Objetivo '{objective}' no soportado. Usa: 'f1', 'cost'")
+    
+    scores = model.predict_proba(X_val)[:, 1]
+    sweep = threshold_sweep(y_val, scores, cost_fp=cost_fp, cost_fn=cost_fn)
+    # Con empates gana el umbral más alto (primera fila)
+    best = sweep['F1'].idxmax() if objective == 'f1' else sweep['Coste'].idxmin()
+    row = sweep.loc[best]
+    
+    selection = {
+        'threshold': float(row['Umbral']),
+        'objective': objective,
+        'cost_fp': float(cost_fp),
+        'cost_fn': float(cost_fn),
+        'precision': float(row['Precision']),
+        'recall': float(row['Recall']),
+        'f1': float(row['F1']),
+        'cost': float(row['Coste']),
+        'n_val': int(len(scores))
+    }
+    
+    if artifact_dir is not None:
+        try:
+            from .artifacts import update_manifest
+        except ImportError:
+            from models.artifacts import update_manifest
+        update_manifest(artifact_dir, threshold=selection['threshold'], threshold_selection=selection)
+    
+    if verbose:
+        print(f"✅ Umbral elegido ({objective}): {selection['threshold']:.4f}")
+        print(f"   Precision: {selection['precision']:.4f}  Recall: {selection['recall']:.4f}  "
+              f"F1: {selection['f1']:.4f}  Coste: {selection['cost']:.1f}")
+        if artifact_dir is not None:
+            print(f"   Guardado en el manifest de {artifact_dir}")
+    
+    return selection
+
+
+def cv_fold_indices(
+    y: Any,
+    cv: int = 5,
+    random_state: int = 42
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Índices (train, validación) de un StratifiedKFold.
+    
+    Calcularlos una vez y pasarlos a `cross_validate_model` garantiza que
+    todos los modelos comparados (tuning, ensembles, umbrales) usan
+    exactamente los mismos folds.
+    
+    Args:
+        y: Etiquetas
+        cv: Número de folds
+        random_state: Semilla
+        
+    Returns:
+        Lista de tuplas (índices de train, índices de validación)
+    """
+    if cv < 2:
+        raise ValueError(f"cv debe ser >= 2, recibido {cv}")
+    y = np.asarray(y)
+    splitter = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    return list(splitter.split(np.zeros(len(y)), y))
+
+
+def positive_scores(model: Any, X: Any) -> np.ndarray:
+    """
+    Score de la clase positiva: probabilidad si el modelo la tiene,
+    si no el valor de `decision_function`.
+    
+    Args:
+        model: Modelo entrenado
+        X: Matriz de características
+        
+    Returns:
+        Array con un score por ejemplo
+    """
+    if hasattr(model, 'predict_proba'):
+        return model.predict_proba(X)[:, 1]
+    return model.decision_function(X)
+
+
+def _fit_fold(
+    model_type: str,
+    params: Dict[str, Any],
+    X_fit: Any,
+    y_fit: Any,
+    X_val: Any,
+    y_val: Any,
+    fold_indices: Optional[Tuple[np.ndarray, np.ndarray]] = None
+) -> Dict[str, Any]:
+    """
+    Entrenar y evaluar un fold.
+    
+    Con `fold_indices`, `X_fit`/`y_fit` son la matriz completa (o la ruta
+    a su copia memory-mapped) y el fold se extrae dentro del worker.
+    
+    Args:
+        model_type: Tipo de modelo
+        params: Parámetros del modelo
+        X_fit: Matriz de entrenamiento del fold (o completa)
+        y_fit: Etiquetas de entrenamiento del fold (o completas)
+        X_val: Matriz de validación del fold (None si se usa `fold_indices`)
+        y_val: Etiquetas de validación del fold (None si se usa `fold_indices`)
+        fold_indices: Índices (train, validación) del fold (opcional)
+        
+    Returns:
+        Diccionario con modelo, predicciones, scores, métricas y tiempos
+    """
+    if fold_indices is not None:
+        X_all = load_shared_array(X_fit) if isinstance(X_fit, Path) else X_fit
+        y_all = load_shared_array(y_fit) if isinstance(y_fit, Path) else y_fit
+        train_idx, val_idx = fold_indices
+        X_fit, X_val = X_all[train_idx], X_all[val_idx]
+        y_fit, y_val = y_all[train_idx], y_all[val_idx]
+    
+    start = time.perf_counter()
+    model = train_model(model_type, X_fit, y_fit, **params)
+    fit_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    y_pred = model.predict(X_val)
+    scores = positive_scores(model, X_val)
+    predict_time = time.perf_counter() - start
+    
+    metrics, cm = _split_metrics(y_val, y_pred)
+    return {
+        'model': model,
+        'y_pred': np.asarray(y_pred),
+        'scores': np.asarray(scores, dtype=float),
+        'metrics': metrics,
+        'confusion_matrix': cm,
+        'fit_time': fit_time,
+        'predict_time': predict_time
+    }
+
+
+def cross_validate_model(
+    model_type: str,
+    X: Any,
+    y: pd.Series,
+    cv: int = 5,
+    folds: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None,
+    vectorizer_method: Optional[str] = None,
+    vectorizer_params: Optional[Dict[str, Any]] = None,
+    feature_cache: Optional[FeatureCache] = None,
+    n_jobs: int = 1,
+    random_state: int = 42,
+    verbose: bool = True,
+    **model_params
+) -> Dict[str, Any]:
+    """
+    Validación cruzada con folds en paralelo y predicciones out-of-fold.
+    
+    Los índices de los folds se calculan una vez (o se reciben en `folds`).
+    Si `X` son textos (con `vectorizer_method`), el vectorizador se ajusta
+    solo con el train de cada fold y sus matrices se guardan en una
+    FeatureCache, de modo que evaluar otro modelo sobre los mismos folds
+    no vuelve a vectorizar. Con una matriz ya calculada, se guarda una vez
+    en disco y cada worker lee su fold con memory-mapping.
+    
+    Las predicciones out-of-fold sirven después para elegir umbral
+    (`threshold_sweep`), comparar modelos (`paired_bootstrap_comparison`)
+    o entrenar el meta-modelo de un stacking sin volver a ajustar nada.
+    
+    Args:
+        model_type: Tipo de modelo (ver `train_model`)
+        X: Matriz de características, o textos preprocesados si se indica
+           `vectorizer_method`
+        y: Etiquetas
+        cv: Número de folds (si no se pasan `folds`)
+        folds: Índices precalculados (ver `cv_fold_indices`)
+        vectorizer_method: Método de vectorización por fold (opcional)
+        vectorizer_params: Parámetros del vectorizador
+        feature_cache: Caché de features por fold (default: FeatureCache
+                       en data/feature_cache)
+        n_jobs: Folds en paralelo (1 = secuencial, -1 = todos los núcleos)
+        random_state: Semilla de los folds
+        verbose: Si True, imprime el resumen
+        **model_params: Parámetros del modelo
+        
+    Returns:
+        Diccionario con 'folds' (DataFrame de métricas por fold),
+        'oof_scores', 'oof_pred', 'fold_indices', 'models',
+        'oof_metrics' (métricas de todas las predicciones out-of-fold),
+        'cv_f1_mean' y 'cv_f1_std'
+    """
+    y_array = np.asarray(y)
+    folds = folds if folds is not None else cv_fold_indices(y_array, cv, random_state)
+    
+    if vectorizer_method is not None:
+        # Vectorizador ajustado por fold, con matrices cacheadas
+        texts = pd.Series(X).reset_index(drop=True)
+        feature_cache = feature_cache or FeatureCache(folds=len(folds))
+        tasks = []
+        for train_idx, val_idx in folds:
+            X_fit, X_val, _ = feature_cache.get_or_compute(
+                texts.iloc[train_idx], texts.iloc[val_idx],
+                method=vectorizer_method, **(vectorizer_params or {})
+            )
+            tasks.append((X_fit, y_array[train_idx], X_val, y_array[val_idx], None))
+        shared_paths = None
+    elif n_jobs == 1:
+        tasks = [(X, y_array, None, None, fold) for fold in folds]
+        shared_paths = None
+    else:
+        shared_paths = dump_shared_arrays({'X': X, 'y': y_array})
+        tasks = [(shared_paths['X'], shared_paths['y'], None, None, fold) for fold in folds]
+    
+    try:
+        if n_jobs == 1:
+            outputs = [_fit_fold(model_type, model_params, *task) for task in tasks]
+        else:
+            outputs = Parallel(n_jobs=n_jobs)(
+                delayed(_fit_fold)(model_type, model_params, *task) for task in tasks
+            )
+    finally:
+        if shared_paths is not None:
+            cleanup_shared_arrays(shared_paths)
+    
+    oof_scores = np.zeros(len(y_array), dtype=float)
+    oof_pred = np.zeros(len(y_array), dtype=y_array.dtype)
+    rows = []
+    for fold_number, ((_, val_idx), output) in enumerate(zip(folds, outputs)):
+        oof_scores[val_idx] = output['scores']
+        oof_pred[val_idx] = output['y_pred']
+        rows.append({
+            'Fold': fold_number,
+            'Ejemplos': len(val_idx),
+            'Accuracy': output['metrics']['accuracy'],
+            'Precision': output['metrics']['precision'],
+            'Recall': output['metrics']['recall'],
+            'F1': output['metrics']['f1'],
+            'Ajuste (s)': output['fit_time'],
+            'Predicción (s)': output['predict_time']
+        })
+    
+    fold_metrics = pd.DataFrame(rows)
+    oof_metrics, _ = _split_metrics(y_array, oof_pred)
+    results = {
+        'folds': fold_metrics,
+        'oof_scores': oof_scores,
+        'oof_pred': oof_pred,
+        'fold_indices': folds,
+        'models': [output['model'] for output in outputs],
+        'oof_metrics': oof_metrics,
+        'cv_f1_mean': float(fold_metrics['F1'].mean()),
+        'cv_f1_std': float(fold_metrics['F1'].std(ddof=0))
+    }
+    
+    if verbose:
+        print(f"✅ Validación cruzada de {model_type} ({len(folds)} folds)")
+        print(f"   F1: {results['cv_f1_mean']:.4f} ± {results['cv_f1_std']:.4f}  "
+              f"(out-of-fold: {oof_metrics['f1']:.4f})")
+    
+    return results
+
@@ -0,0 +1,226 @@
+"""
+Módulo de clasificación multi-etiqueta para todas las etiquetas de YouToxic.
+
+Con una única vectorización se entrena una cabeza logística por etiqueta
+(en paralelo) y se apilan sus coeficientes en una sola matriz, de modo
+que al servir todas las probabilidades salen de una multiplicación
+matricial: sigmoid(X · Wᵀ + b).
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+# Imports relativos o absolutos
+try:
+    from .train import train_logistic_regression
+    from .online import to_binary_labels
+    from .evaluate import metrics_from_confusion_matrix
+except ImportError:
+    import sys
+    src_path = Path(__file__).parent.parent
+    if str(src_path) not in sys.path:
+        sys.path.insert(0, str(src_path))
+    from models.train import train_logistic_regression
+    from models.online import to_binary_labels
+    from models.evaluate import metrics_from_confusion_matrix
+
+
+LABEL_COLUMNS = [
+    'IsToxic', 'IsAbusive', 'IsThreat', 'IsProvocative', 'IsObscene', 'IsHatespeech',
+    'IsRacist', 'IsNationalist', 'IsSexist', 'IsHomophobic', 'IsReligiousHate', 'IsRadicalism'
+]
+
+
+def prepare_multilabel_targets(
+    df: pd.DataFrame,
+    label_columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Extraer las columnas de etiquetas como enteros 0/1.
+
+    Args:
+        df: DataFrame con las columnas de etiquetas ('TRUE'/'FALSE' o bool)
+        label_columns: Columnas a usar (default: LABEL_COLUMNS)
+
+    Returns:
+        DataFrame (n_muestras, n_etiquetas) de enteros
+    """
+    label_columns = label_columns or LABEL_COLUMNS
+    missing = [c for c in label_columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"Columnas de etiquetas no encontradas: {missing}")
+
+    return pd.DataFrame(
+        {column: to_binary_labels(df[column]) for column in label_columns},
+        index=df.index
+    )
+
+
+class MultiLabelLinearHead:
+    """
+    Cabeza lineal multi-etiqueta con umbral por etiqueta.
+
+    Guarda los coeficientes de todas las etiquetas en una matriz
+    (n_etiquetas, n_features) para puntuarlas en una sola operación.
+    """
+
+    def __init__(
+        self,
+        labels: List[str],
+        coef: np.ndarray,
+        intercept: np.ndarray,
+        thresholds: Optional[Dict[str, float]] = None
+    ):
+        """
+        Inicializar cabeza.
+
+        Args:
+            labels: Nombres de las etiquetas
+            coef: Matriz de coeficientes (n_etiquetas, n_features)
+            intercept: Vector de sesgos (n_etiquetas,)
+            thresholds: Umbral de decisión por etiqueta (default: 0.5)
+        """
+        self.labels = list(labels)
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = np.asarray(intercept, dtype=np.float64)
+        self.thresholds = {label: 0.5 for label in self.labels}
+        if thresholds:
+            self.thresholds.update(thresholds)
+
+    def decision_function(self, X: Any) -> np.ndarray:
+        """Log-odds de cada etiqueta (n_muestras, n_etiquetas)."""
+        return np.asarray(X @ self.coef_.T) + self.intercept_
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Probabilidad positiva de cada etiqueta (n_muestras, n_etiquetas)."""
+        return 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+
+    def predict(self, X: Any) -> np.ndarray:
+        """Etiquetas binarias aplicando el umbral de cada etiqueta."""
+        threshold_vector = np.array([self.thresholds[label] for label in self.labels])
+        return (self.predict_proba(X) >= threshold_vector).astype(int)
+
+
+def _fit_label_head(X: Any, y: np.ndarray, C: float, class_weight: Optional[str]) -> Dict[str, np.ndarray]:
+    """
+    Ajustar la cabeza logística de una etiqueta.
+
+    Si la etiqueta tiene una sola clase en train, se usa un sesgo constante
+    con la prevalencia suavizada (no hay nada que aprender de las features).
+    """
+    if len(np.unique(y)) < 2:
+        prevalence = (y.sum() + 0.5) / (len(y) + 1.0)
+        return {
+            'coef': np.zeros(X.shape[1]),
+            'intercept': float(np.log(prevalence / (1 - prevalence)))
+        }
+
+    model = train_logistic_regression(X, y, C=C, class_weight=class_weight)
+    return {'coef': model.coef_[0], 'intercept': float(model.intercept_[0])}
+
+
+def train_multilabel(
+    X_train: Any,
+    Y_train: pd.DataFrame,
+    C: float = 1.0,
+    class_weight: Optional[str] = 'balanced',
+    n_jobs: int = -1
+) -> MultiLabelLinearHead:
+    """
+    Entrenar una cabeza logística por etiqueta sobre la misma matriz.
+
+    Args:
+        X_train: Matriz de características (vectorizada una sola vez)
+        Y_train: DataFrame de etiquetas 0/1 (ver prepare_multilabel_targets)
+        C: Regularización inversa de cada cabeza
+        class_weight: Peso de clases ('balanced' o None)
+        n_jobs: Procesos para ajustar las cabezas en paralelo
+
+    Returns:
+        MultiLabelLinearHead con los coeficientes apilados
+    """
+    labels = list(Y_train.columns)
+    heads = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_label_head)(X_train, Y_train[label].to_numpy(), C, class_weight)
+        for label in labels
+    )
+
+    head = MultiLabelLinearHead(
+        labels=labels,
+        coef=np.vstack([h['coef'] for h in heads]),
+        intercept=np.array([h['intercept'] for h in heads])
+    )
+    print(f"✅ Cabeza multi-etiqueta entrenada: {len(labels)} etiquetas, {head.coef_.shape[1]} features")
+    return head
+
+
+def tune_thresholds(
+    head: MultiLabelLinearHead,
+    X_val: Any,
+    Y_val: pd.DataFrame
+) -> Dict[str, float]:
+    """
+    Elegir el umbral que maximiza F1 en validación para cada etiqueta.
+
+    Args:
+        head: Cabeza entrenada (se actualizan sus umbrales)
+        X_val: Matriz de validación
+        Y_val: Etiquetas de validación
+
+    Returns:
+        Diccionario {etiqueta: umbral}
+    """
+    probabilities = head.predict_proba(X_val)
+
+    for j, label in enumerate(head.labels):
+        y = Y_val[label].to_numpy()
+        if y.sum() == 0:
+            continue
+
+        # F1 en cada umbral distinto con un orden + sumas acumuladas
+        order = np.argsort(-probabilities[:, j], kind='mergesort')
+        scores = probabilities[order, j]
+        tp = np.cumsum(y[order])
+        fp = np.cumsum(1 - y[order])
+        last_of_group = np.r_[scores[1:] != scores[:-1], True]
+        f1 = 2 * tp / (tp + fp + y.sum())
+        best = np.argmax(np.where(last_of_group, f1, -1))
+        head.thresholds[label] = float(scores[best])
+
+    return dict(head.thresholds)
+
+
+def evaluate_multilabel(
+    head: MultiLabelLinearHead,
+    X_test: Any,
+    Y_test: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Métricas por etiqueta.
+
+    Args:
+        head: Cabeza entrenada
+        X_test: Matriz de prueba
+        Y_test: Etiquetas de prueba
+
+    Returns:
+        DataFrame con soporte, umbral, precision, recall y F1 por etiqueta
+    """
+    predictions = head.predict(X_test)
+    rows = []
+    for j, label in enumerate(head.labels):
+        y = Y_test[label].to_numpy().astype(int)
+        cm = np.bincount(2 * y + predictions[:, j], minlength=4).reshape(2, 2)
+        metrics = metrics_from_confusion_matrix(cm)
+        rows.append({
+            'Etiqueta': label,
+            'Soporte': int(y.sum()),
+            'Umbral': head.thresholds[label],
+            'Precision': metrics['precision'],
+            'Recall': metrics['recall'],
+            'F1': metrics['f1']
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,400 @@
+"""
+Módulo de aprendizaje online para detección de hate speech.
+
+Modelo SGD (pérdida logística) sobre un vectorizador Hashing sin
+vocabulario, que se actualiza con `partial_fit` a partir de lotes
+etiquetados (CSVs depositados en una carpeta o la tabla `feedback`)
+y guarda snapshots versionados que la API puede servir.
+"""
+
+import copy
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+
+# Imports relativos o absolutos
+try:
+    from ..features.vectorization import TextVectorizer
+except ImportError:
+    import sys
+    src_path = Path(__file__).parent.parent
+    if str(src_path) not in sys.path:
+        sys.path.insert(0, str(src_path))
+    from features.vectorization import TextVectorizer
+
+
+MODEL_FILENAME = 'online_model.pkl'
+VECTORIZER_FILENAME = 'hashing_vectorizer.pkl'
+STATE_FILENAME = 'state.pkl'
+# Preprocesamiento de los textos crudos, el mismo al entrenar y al servir
+PREPROCESSING = {'use_spacy': True, 'remove_stopwords': True}
+
+
+def default_online_dir() -> Path:
+    """Directorio por defecto de los snapshots online (backend/models/online)."""
+    return Path(__file__).parent.parent.parent / 'models' / 'online'
+
+
+def to_binary_labels(labels: Iterable) -> np.ndarray:
+    """
+    Convertir etiquetas (bool, 'TRUE'/'FALSE', 0/1) a enteros 0/1.
+
+    Args:
+        labels: Etiquetas en cualquiera de los formatos del dataset
+
+    Returns:
+        Array de enteros 0/1
+    """
+    labels = pd.Series(labels)
+    if labels.dtype == object:
+        labels = labels.map(lambda v: str(v).strip().upper() in ('TRUE', '1', 'YES'))
+    return labels.astype(int).to_numpy()
+
+
+def list_snapshots(model_dir: Optional[Path] = None) -> List[int]:
+    """
+    Listar versiones de snapshots disponibles.
+
+    Args:
+        model_dir: Directorio de snapshots (default: models/online)
+
+    Returns:
+        Lista ordenada de números de versión
+    """
+    model_dir = Path(model_dir) if model_dir is not None else default_online_dir()
+    if not model_dir.exists():
+        return []
+
+    versions = []
+    for path in model_dir.iterdir():
+        if path.is_dir() and path.name.startswith('v') and path.name[1:].isdigit():
+            if (path / MODEL_FILENAME).exists():
+                versions.append(int(path.name[1:]))
+    return sorted(versions)
+
+
+def get_snapshot_paths(
+    model_dir: Optional[Path] = None,
+    version: Optional[int] = None
+) -> Tuple[Path, Path]:
+    """
+    Obtener rutas de modelo y vectorizador de un snapshot.
+
+    Args:
+        model_dir: Directorio de snapshots (default: models/online)
+        version: Versión a cargar (default: la más reciente)
+
+    Returns:
+        Tupla (ruta_modelo, ruta_vectorizador)
+    """
+    model_dir = Path(model_dir) if model_dir is not None else default_online_dir()
+    versions = list_snapshots(model_dir)
+    if not versions:
+        raise FileNotFoundError(f"No hay snapshots online en {model_dir}")
+
+    if version is None:
+        version = versions[-1]
+    elif version not in versions:
+        raise FileNotFoundError(f"Snapshot v{version:04d} no encontrado en {model_dir}")
+
+    snapshot_dir = model_dir / f'v{version:04d}'
+    return snapshot_dir / MODEL_FILENAME, snapshot_dir / VECTORIZER_FILENAME
+
+
+def get_snapshot_preprocessing(snapshot_dir: Path) -> Dict[str, Any]:
+    """
+    Configuración de preprocesamiento con la que se entrenó un snapshot.
+
+    Args:
+        snapshot_dir: Directorio del snapshot (`model_dir/vXXXX`)
+
+    Returns:
+        Diccionario para `HateSpeechPredictor(preprocessing=...)`, con
+        'enabled' a False si el modelo se entrenó con textos crudos
+    """
+    with open(Path(snapshot_dir) / STATE_FILENAME, 'rb') as f:
+        state = pickle.load(f)
+    return {**PREPROCESSING, 'enabled': state.get('preprocess', True)}
+
+
+class OnlineHateSpeechModel:
+    """
+    Modelo de hate speech actualizable incrementalmente.
+
+    El coste de cada actualización es proporcional a los datos nuevos:
+    el vectorizador Hashing no necesita reajustarse y el clasificador
+    SGD continúa desde sus pesos actuales.
+    """
+
+    def __init__(
+        self,
+        model_dir: Optional[Path] = None,
+        n_features: int = 2 ** 18,
+        alpha: float = 1e-5,
+        preprocess: bool = True
+    ):
+        """
+        Inicializar modelo online.
+
+        Args:
+            model_dir: Directorio de snapshots (default: models/online)
+            n_features: Dimensión del espacio hashing (default: 2**18)
+            alpha: Regularización L2 de SGD (default: 1e-5)
+            preprocess: Si True, aplica TextPreprocessor a los textos crudos
+                        (igual que HateSpeechPredictor al servir)
+        """
+        self.model_dir = Path(model_dir) if model_dir is not None else default_online_dir()
+        self.n_features = n_features
+        self.alpha = alpha
+        self.preprocess = preprocess
+
+        self.vectorizer = TextVectorizer(method='hashing', n_features=n_features)
+        self.model = SGDClassifier(loss='log_loss', alpha=alpha, random_state=42)
+        self.classes = np.array([0, 1])
+        self.n_samples_seen = 0
+        self.version = 0
+        self._preprocessor = None
+
+    def _prepare_texts(self, texts: Iterable[str]) -> pd.Series:
+        """Preprocesar textos crudos si está habilitado."""
+        texts = pd.Series(list(texts), dtype=object)
+        if not self.preprocess:
+            return texts
+
+        if self._preprocessor is None:
+            try:
+                from ..data.preprocessing import TextPreprocessor
+            except ImportError:
+                from data.preprocessing import TextPreprocessor
+            self._preprocessor = TextPreprocessor(use_spacy=PREPROCESSING['use_spacy'])
+
+        return texts.apply(lambda t: self._preprocessor.preprocess_text(
+            t, remove_stopwords=PREPROCESSING['remove_stopwords']
+        ))
+
+    def _checkpoint(self) -> Tuple[SGDClassifier, int]:
+        """Copia del estado aprendido, para deshacer una actualización fallida."""
+        return copy.deepcopy(self.model), self.n_samples_seen
+
+    def _restore(self, checkpoint: Tuple[SGDClassifier, int]):
+        """Volver al estado de `_checkpoint`."""
+        self.model, self.n_samples_seen = checkpoint
+
+    def partial_fit(self, texts: Iterable[str], labels: Iterable) -> 'OnlineHateSpeechModel':
+        """
+        Actualizar el modelo con un lote etiquetado.
+
+        Args:
+            texts: Textos del lote
+            labels: Etiquetas del lote
+
+        Returns:
+            self
+        """
+        texts = self._prepare_texts(texts)
+        y = to_binary_labels(labels)
+        if len(texts) == 0:
+            return self
+
+        X = self.vectorizer.transform(texts, sparse=True)
+        self.model.partial_fit(X, y, classes=self.classes)
+        self.n_samples_seen += len(y)
+        return self
+
+    def predict_proba(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Probabilidades [no tóxico, tóxico] para una lista de textos.
+
+        Args:
+            texts: Textos a puntuar
+
+        Returns:
+            Array (n, 2) de probabilidades
+        """
+        X = self.vectorizer.transform(self._prepare_texts(texts), sparse=True)
+        return self.model.predict_proba(X)
+
+    def update_from_csv(
+        self,
+        path: Path,
+        text_column: str = 'Text',
+        label_column: str = 'IsToxic',
+        chunksize: int = 10000,
+        archive: bool = True
+    ) -> int:
+        """
+        Consumir un CSV (o una carpeta de CSVs depositados) por lotes.
+
+        La actualización es todo o nada: si un lote falla, el modelo vuelve
+        al estado previo y no se archiva nada, así que reintentar no aprende
+        dos veces los mismos lotes. Con `archive`, los CSV solo se mueven
+        después de guardar el snapshot que los incluye.
+
+        Args:
+            path: Archivo CSV o carpeta con CSVs
+            text_column: Columna con el texto
+            label_column: Columna con la etiqueta
+            chunksize: Filas por lote de `partial_fit`
+            archive: Si True, guarda un snapshot y mueve los CSV consumidos
+                     a `processed/` para no entrenar dos veces con ellos
+
+        Returns:
+            Número de ejemplos consumidos
+        """
+        path = Path(path)
+        files = sorted(path.glob('*.csv')) if path.is_dir() else [path]
+
+        checkpoint = self._checkpoint()
+        consumed = 0
+        try:
+            for csv_file in files:
+                for chunk in pd.read_csv(csv_file, chunksize=chunksize):
+                    chunk = chunk.dropna(subset=[text_column, label_column])
+                    self.partial_fit(chunk[text_column], chunk[label_column])
+                    consumed += len(chunk)
+            if archive and consumed > 0:
+                self.save_snapshot()
+        except Exception:
+            self._restore(checkpoint)
+            raise
+
+        if archive:
+            for csv_file in files:
+                processed_dir = csv_file.parent / 'processed'
+                processed_dir.mkdir(exist_ok=True)
+                shutil.move(str(csv_file), str(processed_dir / csv_file.name))
+
+        print(f"✅ {consumed} ejemplos consumidos desde {len(files)} CSV(s)")
+        return consumed
+
+    def update_from_feedback(self, db_manager: Any = None, batch_size: int = 1000) -> int:
+        """
+        Consumir el feedback pendiente de la base de datos.
+
+        Tras aprender se guarda un snapshot, y solo entonces se marcan las
+        filas como consumidas con la versión que se escribió. Si algo falla
+        antes, el modelo vuelve al estado previo y las filas siguen pendientes.
+
+        Args:
+            db_manager: DatabaseManager (default: instancia global)
+            batch_size: Tamaño de lote de `partial_fit`
+
+        Returns:
+            Número de ejemplos consumidos
+        """
+        if db_manager is None:
+            try:
+                from ..utils.database import get_db_manager
+            except ImportError:
+                from utils.database import get_db_manager
+            db_manager = get_db_manager()
+
+        checkpoint = self._checkpoint()
+        ids = []
+        try:
+            while True:
+                batch = db_manager.get_pending_feedback(
+                    limit=batch_size, after_id=ids[-1] if ids else 0
+                )
+                if not batch:
+                    break
+                self.partial_fit([f['text'] for f in batch], [f['is_toxic'] for f in batch])
+                ids.extend(f['id'] for f in batch)
+            version = self.save_snapshot() if ids else None
+        except Exception:
+            self._restore(checkpoint)
+            raise
+
+        for start in range(0, len(ids), batch_size):
+            db_manager.mark_feedback_consumed(
+                ids[start:start + batch_size], model_version=f'v{version:04d}'
+            )
+
+        print(f"✅ {len(ids)} ejemplos de feedback consumidos")
+        return len(ids)
+
+    def save_snapshot(self) -> int:
+        """
+        Guardar un nuevo snapshot versionado.
+
+        Se escribe en un directorio temporal y se renombra al final, para
+        que la API nunca lea un snapshot a medio escribir.
+
+        Returns:
+            Versión escrita (el snapshot queda en `model_dir/vXXXX`)
+        """
+        if self.n_samples_seen == 0:
+            raise ValueError("El modelo online no ha visto ningún ejemplo todavía")
+
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        versions = list_snapshots(self.model_dir)
+        version = max(versions[-1] if versions else 0, self.version) + 1
+        snapshot_dir = self.model_dir / f'v{version:04d}'
+
+        tmp_dir = Path(tempfile.mkdtemp(prefix='.tmp_snapshot_', dir=self.model_dir))
+        try:
+            with open(tmp_dir / MODEL_FILENAME, 'wb') as f:
+                pickle.dump(self.model, f)
+            with open(tmp_dir / VECTORIZER_FILENAME, 'wb') as f:
+                pickle.dump(self.vectorizer.vectorizer, f)
+            with open(tmp_dir / STATE_FILENAME, 'wb') as f:
+                pickle.dump(self._state(version), f)
+            os.replace(tmp_dir, snapshot_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        self.version = version
+        print(f"✅ Snapshot online guardado: {snapshot_dir} ({self.n_samples_seen} ejemplos vistos)")
+        return version
+
+    def _state(self, version: int) -> Dict[str, Any]:
+        """Estado necesario para reanudar el entrenamiento."""
+        return {
+            'version': version,
+            'n_samples_seen': self.n_samples_seen,
+            'n_features': self.n_features,
+            'alpha': self.alpha,
+            'preprocess': self.preprocess
+        }
+
+    @classmethod
+    def load_snapshot(
+        cls,
+        model_dir: Optional[Path] = None,
+        version: Optional[int] = None
+    ) -> 'OnlineHateSpeechModel':
+        """
+        Cargar un snapshot para seguir entrenando.
+
+        Args:
+            model_dir: Directorio de snapshots (default: models/online)
+            version: Versión a cargar (default: la más reciente)
+
+        Returns:
+            Instancia de OnlineHateSpeechModel
+        """
+        model_path, vectorizer_path = get_snapshot_paths(model_dir, version)
+        with open(model_path.parent / STATE_FILENAME, 'rb') as f:
+            state = pickle.load(f)
+
+        instance = cls(
+            model_dir=model_path.parent.parent,
+            n_features=state['n_features'],
+            alpha=state['alpha'],
+            preprocess=state['preprocess']
+        )
+        with open(model_path, 'rb') as f:
+            instance.model = pickle.load(f)
+        instance.vectorizer = TextVectorizer.load(vectorizer_path)
+        instance.n_samples_seen = state['n_samples_seen']
+        instance.version = state['version']
+
+        print(f"✅ Snapshot online v{instance.version:04d} cargado")
+        return instance
@@ -0,0 +1,200 @@
+"""
+Módulo para guardar predicciones out-of-fold de modelos base.
+
+El stacking necesita los scores out-of-fold de cada modelo base, y
+calcularlos cuesta `cv` entrenamientos por modelo. Estos scores solo
+dependen de la configuración del modelo, de los datos y de los folds,
+así que se guardan en disco con esa clave: probar otro meta-modelo,
+otro subconjunto de modelos u otros pesos reutiliza las columnas ya
+calculadas en lugar de volver a entrenar.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import joblib
+import numpy as np
+import pandas as pd
+
+# Imports relativos o absolutos
+try:
+    from .evaluate import cross_validate_model, cv_fold_indices
+    from ..utils.fingerprint import data_fingerprint
+except ImportError:
+    import sys
+    src_path = Path(__file__).parent.parent
+    if str(src_path) not in sys.path:
+        sys.path.insert(0, str(src_path))
+    from models.evaluate import cross_validate_model, cv_fold_indices
+    from utils.fingerprint import data_fingerprint
+
+
+def default_oof_dir() -> Path:
+    """Directorio por defecto del almacén (backend/data/oof_store)."""
+    return Path(__file__).parent.parent.parent / 'data' / 'oof_store'
+
+
+def oof_key(
+    model_type: str,
+    params: Dict[str, Any],
+    data_hash: str,
+    cv: int,
+    random_state: int
+) -> str:
+    """
+    Clave estable de unas predicciones out-of-fold.
+
+    Args:
+        model_type: Tipo de modelo
+        params: Parámetros del modelo
+        data_hash: Huella de X e y (ver `data_fingerprint`)
+        cv: Número de folds
+        random_state: Semilla de los folds
+
+    Returns:
+        Hash en hexadecimal (16 primeros caracteres)
+    """
+    config = json.dumps({
+        'type': model_type.lower(),
+        'params': params,
+        'data': data_hash,
+        'cv': cv,
+        'random_state': random_state
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+
+
+class OOFStore:
+    """
+    Almacén (memoria + disco) de scores out-of-fold por configuración.
+
+    Cada entrada es un archivo `<clave>.joblib` escrito de forma atómica,
+    así que varias sesiones o workers pueden compartir el directorio.
+    """
+
+    def __init__(self, store_dir: Optional[Path] = None, use_disk: bool = True):
+        """
+        Inicializar almacén.
+
+        Args:
+            store_dir: Directorio del almacén (default: data/oof_store)
+            use_disk: Si False, solo se guarda en memoria
+        """
+        self.store_dir = Path(store_dir) if store_dir is not None else default_oof_dir()
+        self.use_disk = use_disk
+        self._memory: Dict[str, np.ndarray] = {}
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def _write_to_disk(self, path: Path, entry: Dict[str, Any]):
+        """Escribir una entrada de forma atómica (temporal + rename)."""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmp_', suffix='.joblib', dir=self.store_dir)
+        os.close(fd)
+        try:
+            joblib.dump(entry, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def get_or_compute(
+        self,
+        model_type: str,
+        params: Dict[str, Any],
+        X: Any,
+        y: pd.Series,
+        cv: int = 5,
+        random_state: int = 42,
+        n_jobs: int = 1,
+        data_hash: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Scores out-of-fold de una configuración, calculándolos solo si faltan.
+
+        Args:
+            model_type: Tipo de modelo
+            params: Parámetros del modelo
+            X: Matriz de características
+            y: Etiquetas
+            cv: Número de folds
+            random_state: Semilla de los folds
+            n_jobs: Folds en paralelo al calcular
+            data_hash: Huella de X e y ya calculada (opcional)
+
+        Returns:
+            Array con un score out-of-fold por ejemplo
+        """
+        data_hash = data_hash or data_fingerprint(X, y)
+        key = oof_key(model_type, params, data_hash, cv, random_state)
+
+        if key in self._memory:
+            self.stats['memory_hits'] += 1
+            return self._memory[key]
+
+        path = self.store_dir / f'{key}.joblib'
+        if self.use_disk and path.exists():
+            self.stats['disk_hits'] += 1
+            scores = joblib.load(path)['oof_scores']
+        else:
+            self.stats['misses'] += 1
+            folds = cv_fold_indices(y, cv, random_state)
+            scores = cross_validate_model(
+                model_type, X, y, folds=folds, n_jobs=n_jobs, verbose=False, **params
+            )['oof_scores']
+            if self.use_disk:
+                self._write_to_disk(path, {
+                    'oof_scores': scores,
+                    'model_type': model_type,
+                    'params': params,
+                    'cv': cv,
+                    'random_state': random_state
+                })
+
+        self._memory[key] = scores
+        return scores
+
+    def oof_matrix(
+        self,
+        configs: List[Dict[str, Any]],
+        X: Any,
+        y: pd.Series,
+        cv: int = 5,
+        random_state: int = 42,
+        n_jobs: int = 1
+    ) -> pd.DataFrame:
+        """
+        Matriz de scores out-of-fold (una columna por modelo base).
+
+        Args:
+            configs: Configuraciones [{'name', 'type', 'params'}, ...]
+            X: Matriz de características
+            y: Etiquetas
+            cv: Número de folds
+            random_state: Semilla de los folds
+            n_jobs: Folds en paralelo al calcular
+
+        Returns:
+            DataFrame (n_muestras, n_modelos) con los scores
+        """
+        data_hash = data_fingerprint(X, y)
+        return pd.DataFrame({
+            config.get('name', config['type']): self.get_or_compute(
+                config['type'], config.get('params', {}), X, y, cv, random_state, n_jobs, data_hash
+            )
+            for config in configs
+        })
+
+    def clear(self, disk: bool = False):
+        """
+        Vaciar el almacén.
+
+        Args:
+            disk: Si True, borra también las entradas en disco
+        """
+        self._memory.clear()
+        if disk and self.store_dir.exists():
+            for path in self.store_dir.glob('*.joblib'):
+                path.unlink()
@@ -5,80 +5,132 @@ Este módulo contiene funciones para optimizar modelos de ML
 con el objetivo de reducir overfitting y mejorar F1-score.
 """
 
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import uuid
 import optuna
-from typing import Dict, Any, Tuple, Optional
+from optuna.distributions import CategoricalDistribution, FloatDistribution, IntDistribution
+from pathlib import Path
+from typing import Dict, Any, Callable, Tuple, Optional, List
 import numpy as np
+from joblib import Parallel, delayed
 import pandas as pd
-from sklearn.model_selection import cross_val_score, StratifiedKFold
-from sklearn.metrics import f1_score, make_scorer
+from sklearn.model_selection import train_test_split
 
 # Imports relativos o absolutos según el contexto
 try:
     from .train import train_model
-    from .evaluate import evaluate_model
+    from .evaluate import evaluate_model, cv_fold_indices
+    from .trial_store import TrialModelStore
+    from ..utils.memmap import dump_shared_arrays, load_shared_array, cleanup_shared_arrays
+    from ..utils.fingerprint import data_fingerprint
+    from ..features.cache import FeatureCache
+    from ..utils.mlflow_runs import load_mlflow_runs
 except ImportError:
     # Si falla, intentar import absoluto
     import sys
-    from pathlib import Path
     # Añadir src al path si no está
     src_path = Path(__file__).parent.parent
     if str(src_path) not in sys.path:
         sys.path.insert(0, str(src_path))
     from models.train import train_model
-    from models.evaluate import evaluate_model
+    from models.evaluate import evaluate_model, cv_fold_indices
+    from models.trial_store import TrialModelStore
+    from utils.memmap import dump_shared_arrays, load_shared_array, cleanup_shared_arrays
+    from utils.fingerprint import data_fingerprint
+    from features.cache import FeatureCache
+    from utils.mlflow_runs import load_mlflow_runs
 
 
-def objective_svm(
-    trial,
-    X_train: np.ndarray,
-    X_test: np.ndarray,
-    y_train: pd.Series,
-    y_test: pd.Series,
-    vectorizer_type: str = 'tfidf'
-) -> float:
+# Score de un trial cuyo entrenamiento superó `trial_timeout` (igual que
+# la penalización por overfitting extremo: el sampler evita esa zona)
+TIMEOUT_PENALTY = -20.0
+
+# Peso de la penalización por coste con `cost_aware` (por década de segundos)
+COST_PENALTY_WEIGHT = 0.005
+
+# Objetivos de la búsqueda multi-objetivo: score, latencia por texto y tamaño
+MULTI_OBJECTIVE_DIRECTIONS = ['maximize', 'minimize', 'minimize']
+SERVING_ATTRS = ('latency_ms', 'model_size_kb')
+
+
+def default_storage_url() -> str:
     """
-    Función objetivo para optimizar SVM con Optuna.
-    Prioriza overfitting < 5% y F1-score > 0.55.
+    Storage persistente por defecto de los estudios (backend/data/optuna_studies.db).
+    
+    Returns:
+        URL SQLite del storage
+    """
+    db_path = Path(__file__).parent.parent.parent / 'data' / 'optuna_studies.db'
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    return f"sqlite:///{db_path}"
+
+
+def default_trial_store_dir(study_name: str, study_uid: str) -> Path:
+    """
+    Directorio por defecto de los modelos de trials de un estudio.
+    
+    Se separa por el identificador del estudio: dos estudios con el mismo
+    nombre en storages distintos no comparten modelos.
     
     Args:
-        trial: Trial de Optuna
-        X_train: Matriz de características de entrenamiento
-        X_test: Matriz de características de prueba
-        y_train: Etiquetas de entrenamiento
-        y_test: Etiquetas de prueba
-        vectorizer_type: Tipo de vectorizador ('tfidf' o 'count')
+        study_name: Nombre del estudio
+        study_uid: Identificador único del estudio (user attr 'study_uid')
         
     Returns:
-        Score a maximizar (penaliza overfitting alto)
+        Ruta backend/models/trials/<estudio>/<uid>
     """
-    # Hiperparámetros a optimizar
-    C = trial.suggest_float('C', 0.001, 10.0, log=True)
-    kernel = trial.suggest_categorical('kernel', ['linear', 'rbf'])
-    
-    # Entrenar modelo
-    model = train_model(
-        'svm',
-        X_train,
-        y_train,
-        C=C,
-        kernel=kernel,
-        class_weight='balanced'
-    )
-    
-    # Evaluar
-    results = evaluate_model(
-        model, X_train, X_test, y_train, y_test, verbose=False
-    )
+    return Path(__file__).parent.parent.parent / 'models' / 'trials' / study_name / study_uid
+
+
+def _find_duplicate_value(trial) -> Optional[Any]:
+    """
+    Buscar un trial terminado con exactamente los mismos parámetros.
     
-    test_f1 = results['test_f1']
-    diff_f1 = results['diff_f1']
+    Args:
+        trial: Trial actual (ya con sus parámetros sugeridos)
+        
+    Returns:
+        Valor del trial previo (tupla de valores en estudios multi-objetivo),
+        o None si la configuración es nueva
+    """
+    completed = trial.study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+    for previous in completed:
+        # Los trials históricos de MLFlow se evaluaron con otros datos: reevaluar
+        if _is_historical(previous):
+            continue
+        if previous.params == trial.params:
+            trial.set_user_attr('duplicate_of', previous.number)
+            if len(trial.study.directions) > 1:
+                for name in SERVING_ATTRS:
+                    if name in previous.user_attrs:
+                        trial.set_user_attr(name, previous.user_attrs[name])
+                return tuple(previous.values)
+            return previous.value
+    return None
+
+
+def _overfitting_score(test_f1: float, diff_f1: float) -> float:
+    """
+    Score de un trial: F1 penalizado por overfitting.
+    Prioriza overfitting < 5% y F1-score > 0.50.
     
+    Args:
+        test_f1: F1 en validación
+        diff_f1: Diferencia train-validación en puntos porcentuales
+        
+    Returns:
+        Score a maximizar
+    """
     # Penalizar si overfitting es muy alto
     if diff_f1 > 6.0:
         return -20.0  # Penalización fuerte
     
     # Score: F1-score menos penalización por overfitting
-    # Prioriza modelos con overfitting < 5%
     if diff_f1 < 5.0:
         score = test_f1 - (diff_f1 / 100) * 0.1  # Penalización mínima
     else:
@@ -91,75 +143,488 @@ def objective_svm(
     return score
 
 
-def objective_naive_bayes(
+def _fit_in_subprocess(conn, model_type: str, X: Any, y: Any, params: Dict[str, Any]):
+    """Entrenar en un proceso hijo y enviar (modelo, tiempo) por el pipe."""
+    start = time.perf_counter()
+    model = train_model(model_type, X, y, **params)
+    conn.send((model, time.perf_counter() - start))
+    conn.close()
+
+
+def _timed_fit(
+    model_type: str,
+    X: Any,
+    y: Any,
+    params: Dict[str, Any],
+    deadline: Optional[float] = None
+) -> Tuple[Any, float]:
+    """
+    Entrenar un modelo y medir el tiempo de ajuste en segundos.
+    
+    Con `deadline` (instante de `time.perf_counter()`) el ajuste se hace
+    en un proceso hijo (fork) que se mata si no termina a tiempo: sklearn
+    no se puede interrumpir desde dentro (libsvm, árboles en C).
+    
+    Args:
+        model_type: Tipo de modelo para `train_model`
+        X: Matriz de características
+        y: Etiquetas
+        params: Hiperparámetros del modelo
+        deadline: Límite de tiempo del trial (None = sin límite)
+        
+    Returns:
+        Tupla (modelo, segundos de ajuste)
+    """
+    if deadline is None or 'fork' not in multiprocessing.get_all_start_methods():
+        start = time.perf_counter()
+        model = train_model(model_type, X, y, **params)
+        return model, time.perf_counter() - start
+    
+    remaining = deadline - time.perf_counter()
+    if remaining <= 0:
+        raise TimeoutError("Tiempo del trial agotado antes de entrenar")
+    
+    context = multiprocessing.get_context('fork')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_fit_in_subprocess, args=(child_conn, model_type, X, y, params), daemon=True
+    )
+    process.start()
+    child_conn.close()
+    try:
+        if not parent_conn.poll(remaining):
+            raise TimeoutError(f"Entrenamiento de {model_type} cancelado tras {remaining:.1f}s")
+        try:
+            return parent_conn.recv()
+        except EOFError:
+            raise RuntimeError(f"El proceso de entrenamiento de {model_type} terminó sin resultado")
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        parent_conn.close()
+
+
+def _timed_evaluate(model: Any, X_fit: Any, X_val: Any, y_fit: Any, y_val: Any) -> Tuple[Dict[str, Any], float]:
+    """Evaluar un modelo y medir el tiempo de predicción en segundos."""
+    start = time.perf_counter()
+    results = evaluate_model(model, X_fit, X_val, y_fit, y_val, verbose=False)
+    return results, time.perf_counter() - start
+
+
+def _evaluate_params(
     trial,
+    model_type: str,
+    params: Dict[str, Any],
     X_train: np.ndarray,
     X_test: np.ndarray,
     y_train: pd.Series,
     y_test: pd.Series,
-    vectorizer_type: str = 'tfidf'
-) -> float:
+    cv: Optional[int] = None,
+    fidelity: Optional[List[float]] = None,
+    model_store: Optional[TrialModelStore] = None,
+    trial_timeout: Optional[float] = None,
+    cost_aware: bool = False,
+    serving_objectives: bool = False,
+    fold_features: Optional[Callable[[int, np.ndarray, np.ndarray], Tuple[Any, Any]]] = None
+) -> Any:
     """
-    Función objetivo para optimizar Naive Bayes con Optuna.
+    Entrenar y puntuar una configuración de hiperparámetros.
+    
+    Sin `cv` se entrena con todo train y se puntúa en test. Con `cv > 1`
+    se evalúa fold a fold sobre un StratifiedKFold de train (test queda
+    intacto para la evaluación final): tras cada fold se reporta al trial
+    el score medio acumulado, de modo que el pruner puede cortar pronto
+    las configuraciones sin futuro.
+    
+    Con `fidelity` (multi-fidelidad, excluyente con `cv`) se reserva un
+    20% estratificado de train para validar y se entrena sobre submuestras
+    estratificadas anidadas de tamaño creciente; el score de cada fracción
+    se reporta como un paso, con la fracción relativa a la menor como
+    recurso (1, 3, 9...), que es lo que espera SuccessiveHalvingPruner.
+    Solo los trials que llegan a la fracción 1.0 terminan, así que el
+    ranking final es siempre a fidelidad completa.
+    
+    Los tiempos totales de ajuste y predicción se guardan en los atributos
+    `fit_time` y `predict_time` del trial. En el modo sin `cv` el modelo
+    se entrena con todo train, así que se ofrece a `model_store` para no
+    reentrenarlo al final.
     
     Args:
         trial: Trial de Optuna
+        model_type: Tipo de modelo para `train_model`
+        params: Hiperparámetros sugeridos
         X_train: Matriz de características de entrenamiento
         X_test: Matriz de características de prueba
         y_train: Etiquetas de entrenamiento
         y_test: Etiquetas de prueba
-        vectorizer_type: Tipo de vectorizador ('tfidf' o 'count')
+        cv: Número de folds (None o 1 = validación en test)
+        fidelity: Fracciones crecientes de train, terminando en 1.0
+                  (ver `fidelity_fractions`)
+        model_store: Almacén de modelos de los mejores trials (opcional)
+        trial_timeout: Segundos máximos de entrenamiento del trial; si se
+                       superan se mata el ajuste y el trial recibe
+                       TIMEOUT_PENALTY (el sampler aprende a evitar la zona)
+        cost_aware: Si True, resta al score una pequeña penalización
+                    logarítmica por el tiempo del trial, de modo que a
+                    igualdad de score se prefieren configuraciones baratas
+        serving_objectives: Si True (estudio multi-objetivo), mide además
+                            la latencia por texto y el tamaño del modelo
+        fold_features: Con `cv`, función (fold, train_idx, val_idx) ->
+                       (X_fit, X_val) que da las matrices de cada fold en
+                       lugar de cortar X_train (p.ej. un vectorizador
+                       ajustado solo con los textos de entrenamiento del fold)
         
     Returns:
-        Score a maximizar
+        Score a maximizar, o tupla (score, latencia_ms, tamaño_kb) con
+        `serving_objectives`
     """
-    # Hiperparámetros a optimizar
-    alpha = trial.suggest_float('alpha', 0.1, 10.0, log=True)
-    fit_prior = trial.suggest_categorical('fit_prior', [True, False])
-    
-    # Entrenar modelo
-    model = train_model(
-        'naive_bayes',
-        X_train,
-        y_train,
-        alpha=alpha,
-        fit_prior=fit_prior
-    )
+    deadline = time.perf_counter() + trial_timeout if trial_timeout else None
+    
+    try:
+        if fidelity:
+            score, model = _evaluate_fidelity(trial, model_type, params, X_train, y_train,
+                                              fidelity, deadline)
+        elif cv and cv >= 2:
+            score, model = _evaluate_cv(trial, model_type, params, X_train, y_train, cv, deadline,
+                                        fold_features)
+        else:
+            score, model = _evaluate_holdout(trial, model_type, params, X_train, X_test,
+                                             y_train, y_test, deadline)
+    except TimeoutError as e:
+        trial.set_user_attr('timed_out', True)
+        print(f"⏱️  Trial {trial.number} cancelado: {e}")
+        if serving_objectives:
+            # Sin modelo no hay latencia ni tamaño: peor valor posible
+            return TIMEOUT_PENALTY, float('inf'), float('inf')
+        return TIMEOUT_PENALTY
+    
+    if cost_aware:
+        cost = trial.user_attrs.get('fit_time', 0.0) + trial.user_attrs.get('predict_time', 0.0)
+        trial.set_user_attr('raw_score', score)
+        score -= COST_PENALTY_WEIGHT * float(np.log10(1.0 + cost))
+    
+    full_train = not fidelity and not (cv and cv >= 2)
+    if full_train and model_store is not None:
+        model_store.offer(trial.number, score, model, trial.user_attrs.get('fit_time', 0.0))
+    
+    if serving_objectives:
+        # Con cv se mide el modelo del último fold: mismo tipo y tamaño de vocabulario
+        serving = measure_serving_cost(model, X_test)
+        for name in SERVING_ATTRS:
+            trial.set_user_attr(name, serving[name])
+        return score, serving['latency_ms'], serving['model_size_kb']
+    return score
+
+
+def measure_serving_cost(model: Any, X: Any, n_samples: int = 50) -> Dict[str, float]:
+    """
+    Medir el coste de servir un modelo.
+    
+    La latencia se mide prediciendo texto a texto (como en la API), con
+    la mediana para no depender de picos puntuales; el tamaño es el del
+    modelo serializado con pickle.
+    
+    Args:
+        model: Modelo entrenado
+        X: Matriz de características de la que tomar ejemplos
+        n_samples: Número de textos a cronometrar
+        
+    Returns:
+        Diccionario con latency_ms (por texto) y model_size_kb
+    """
+    predict = getattr(model, 'predict_proba', model.predict)
+    n_samples = max(1, min(n_samples, X.shape[0]))
+    
+    timings = []
+    for i in range(n_samples):
+        start = time.perf_counter()
+        predict(X[i:i + 1])
+        timings.append(time.perf_counter() - start)
+    
+    return {
+        'latency_ms': float(np.median(timings) * 1000),
+        'model_size_kb': len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 1024
+    }
+
+
+def _evaluate_holdout(
+    trial,
+    model_type: str,
+    params: Dict[str, Any],
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_train: pd.Series,
+    y_test: pd.Series,
+    deadline: Optional[float] = None
+) -> Tuple[float, Any]:
+    """
+    Entrenar con todo train y puntuar en test (ver `_evaluate_params`).
+    
+    Returns:
+        Tupla (score, modelo entrenado con todo train)
+    """
+    model, fit_time = _timed_fit(model_type, X_train, y_train, params, deadline)
+    trial.set_user_attr('fit_time', fit_time)
+    results, predict_time = _timed_evaluate(model, X_train, X_test, y_train, y_test)
+    trial.set_user_attr('predict_time', predict_time)
+    return _overfitting_score(results['test_f1'], results['diff_f1']), model
+
+
+def _evaluate_cv(
+    trial,
+    model_type: str,
+    params: Dict[str, Any],
+    X_train: np.ndarray,
+    y_train: pd.Series,
+    cv: int,
+    deadline: Optional[float] = None,
+    fold_features: Optional[Callable[[int, np.ndarray, np.ndarray], Tuple[Any, Any]]] = None
+) -> Tuple[float, Any]:
+    """
+    Evaluar fold a fold con pruning (ver `_evaluate_params`).
+    
+    Returns:
+        Tupla (score medio, modelo del último fold)
+    """
+    y = np.asarray(y_train)
+    # Mismos folds que `cross_validate_model` (cv_fold_indices)
+    folds = cv_fold_indices(y, cv)
+    
+    fold_scores = []
+    fold_f1 = []
+    fit_time = 0.0
+    predict_time = 0.0
+    for fold, (train_idx, val_idx) in enumerate(folds):
+        if fold_features is not None:
+            X_fit, X_val = fold_features(fold, train_idx, val_idx)
+        else:
+            X_fit, X_val = X_train[train_idx], X_train[val_idx]
+        model, fold_fit_time = _timed_fit(model_type, X_fit, y[train_idx], params, deadline)
+        results, fold_predict_time = _timed_evaluate(model, X_fit, X_val, y[train_idx], y[val_idx])
+        fit_time += fold_fit_time
+        predict_time += fold_predict_time
+        trial.set_user_attr('fit_time', fit_time)
+        trial.set_user_attr('predict_time', predict_time)
+        fold_scores.append(_overfitting_score(results['test_f1'], results['diff_f1']))
+        fold_f1.append(results['test_f1'])
+        
+        # Reportar el score medio hasta ahora y dejar decidir al pruner
+        # (Optuna no poda estudios multi-objetivo)
+        if len(trial.study.directions) > 1:
+            continue
+        trial.report(float(np.mean(fold_scores)), step=fold)
+        if trial.should_prune():
+            trial.set_user_attr('folds_evaluated', fold + 1)
+            raise optuna.TrialPruned()
+    
+    trial.set_user_attr('folds_evaluated', cv)
+    trial.set_user_attr('cv_f1_mean', float(np.mean(fold_f1)))
+    trial.set_user_attr('cv_f1_std', float(np.std(fold_f1)))
+    return float(np.mean(fold_scores)), model
+
+
+def fidelity_fractions(min_fraction: float, reduction_factor: int = 3) -> List[float]:
+    """
+    Fracciones de datos de cada escalón de successive halving.
+    
+    Args:
+        min_fraction: Fracción del primer escalón (p.ej. 0.1)
+        reduction_factor: Factor entre escalones consecutivos
+        
+    Returns:
+        Fracciones crecientes terminando en 1.0 (p.ej. [1/9, 1/3, 1])
+    """
+    if not 0 < min_fraction <= 1:
+        raise ValueError(f"min_fraction debe estar en (0, 1], recibido {min_fraction}")
+    if reduction_factor < 2:
+        raise ValueError(f"reduction_factor debe ser >= 2, recibido {reduction_factor}")
+    
+    fractions = [1.0]
+    while fractions[0] / reduction_factor >= min_fraction:
+        fractions.insert(0, fractions[0] / reduction_factor)
+    return fractions
+
+
+def _nested_stratified_subsamples(
+    y: np.ndarray,
+    fractions: List[float],
+    random_state: int = 42
+) -> List[np.ndarray]:
+    """
+    Índices de submuestras estratificadas y anidadas (cada una contiene a la anterior).
+    
+    Args:
+        y: Etiquetas
+        fractions: Fracciones crecientes
+        random_state: Semilla
+        
+    Returns:
+        Lista de arrays de índices, uno por fracción
+    """
+    rng = np.random.default_rng(random_state)
+    per_class = [rng.permutation(np.flatnonzero(y == label)) for label in np.unique(y)]
+    return [
+        np.sort(np.concatenate([
+            idx[:max(1, int(np.ceil(fraction * len(idx))))] for idx in per_class
+        ]))
+        for fraction in fractions
+    ]
+
+
+def _evaluate_fidelity(
+    trial,
+    model_type: str,
+    params: Dict[str, Any],
+    X_train: np.ndarray,
+    y_train: pd.Series,
+    fractions: List[float],
+    deadline: Optional[float] = None
+) -> Tuple[float, Any]:
+    """
+    Evaluar una configuración por escalones de fidelidad (ver `_evaluate_params`).
     
-    # Evaluar
-    results = evaluate_model(
-        model, X_train, X_test, y_train, y_test, verbose=False
+    Returns:
+        Tupla (score a fidelidad completa, modelo del último escalón)
+    """
+    y = np.asarray(y_train)
+    fit_idx, val_idx = train_test_split(
+        np.arange(len(y)), test_size=0.2, stratify=y, random_state=42
     )
+    subsamples = _nested_stratified_subsamples(y[fit_idx], fractions)
     
-    test_f1 = results['test_f1']
-    diff_f1 = results['diff_f1']
+    score = None
+    fit_time = 0.0
+    predict_time = 0.0
+    for fraction, subsample in zip(fractions, subsamples):
+        idx = fit_idx[subsample]
+        model, rung_fit_time = _timed_fit(model_type, X_train[idx], y[idx], params, deadline)
+        results, rung_predict_time = _timed_evaluate(
+            model, X_train[idx], X_train[val_idx], y[idx], y[val_idx]
+        )
+        fit_time += rung_fit_time
+        predict_time += rung_predict_time
+        trial.set_user_attr('fit_time', fit_time)
+        trial.set_user_attr('predict_time', predict_time)
+        score = _overfitting_score(results['test_f1'], results['diff_f1'])
+        trial.set_user_attr('fidelity_reached', fraction)
+        
+        if fraction < 1.0:
+            trial.report(score, step=int(round(fraction / fractions[0])))
+            if trial.should_prune():
+                raise optuna.TrialPruned()
     
-    # Penalizar si overfitting es muy alto
-    if diff_f1 > 6.0:
-        return -20.0
+    return score, model
+
+
+def _make_pruner(
+    pruner: Optional[str],
+    cv: Optional[int] = None,
+    fidelity: Optional[List[float]] = None
+):
+    """
+    Crear el pruner de Optuna.
     
-    # Score
-    if diff_f1 < 5.0:
-        score = test_f1 - (diff_f1 / 100) * 0.1
-    else:
-        score = test_f1 - (diff_f1 / 100) * 0.5
+    Los pasos de un trial son los folds de validación cruzada, así que
+    sin `cv` no hay valores intermedios y no se poda nada. En modo
+    multi-fidelidad los pasos son los escalones de datos y se usa
+    successive halving (o Hyperband si se pide).
     
-    if test_f1 < 0.50:
-        score -= 0.2
+    Args:
+        pruner: 'median', 'hyperband' o None
+        cv: Número de folds
+        fidelity: Fracciones de los escalones de multi-fidelidad
+        
+    Returns:
+        Pruner de Optuna
+    """
+    if pruner not in (None, 'median', 'hyperband'):
+        raise ValueError(f"Pruner '{pruner}' no soportado. Usa: 'median', 'hyperband' o None")
     
-    return score
+    if fidelity and len(fidelity) > 1:
+        reduction_factor = int(round(fidelity[1] / fidelity[0]))
+        if pruner == 'hyperband':
+            return optuna.pruners.HyperbandPruner(
+                min_resource=1,
+                max_resource=int(round(fidelity[-1] / fidelity[0])),
+                reduction_factor=reduction_factor
+            )
+        return optuna.pruners.SuccessiveHalvingPruner(
+            min_resource=1, reduction_factor=reduction_factor, min_early_stopping_rate=0
+        )
+    
+    if pruner is None or not cv or cv < 2:
+        return optuna.pruners.NopPruner()
+    if pruner == 'median':
+        # Comparar desde el primer fold, tras unos trials de referencia
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=0)
+    return optuna.pruners.HyperbandPruner(min_resource=1, max_resource=cv, reduction_factor=3)
 
 
-def objective_logistic_regression(
+# Espacio de búsqueda de hiperparámetros de cada modelo
+SEARCH_SPACES = {
+    'svm': {
+        'C': FloatDistribution(0.001, 10.0, log=True),
+        'kernel': CategoricalDistribution(['linear', 'rbf'])
+    },
+    'linear_svm': {
+        'C': FloatDistribution(0.001, 10.0, log=True),
+        'solver': CategoricalDistribution(['liblinear', 'sgd']),
+        'calibration': CategoricalDistribution(['sigmoid', 'isotonic'])
+    },
+    'naive_bayes': {
+        'alpha': FloatDistribution(0.1, 10.0, log=True),
+        'fit_prior': CategoricalDistribution([True, False])
+    },
+    'logistic': {
+        'C': FloatDistribution(0.001, 10.0, log=True),
+        'penalty': CategoricalDistribution(['l1', 'l2'])
+    },
+    'random_forest': {
+        'n_estimators': IntDistribution(50, 300),
+        'max_depth': IntDistribution(3, 20),
+        'min_samples_split': IntDistribution(2, 20),
+        'min_samples_leaf': IntDistribution(1, 10)
+    }
+}
+
+
+def _suggest_params(trial, model_type: str) -> Dict[str, Any]:
+    """
+    Sugerir en un trial los hiperparámetros de SEARCH_SPACES de un modelo.
+    
+    Args:
+        trial: Trial de Optuna
+        model_type: Tipo de modelo
+        
+    Returns:
+        Diccionario {parámetro: valor}
+    """
+    params = {}
+    for name, distribution in SEARCH_SPACES[model_type].items():
+        if isinstance(distribution, CategoricalDistribution):
+            params[name] = trial.suggest_categorical(name, distribution.choices)
+        elif isinstance(distribution, IntDistribution):
+            params[name] = trial.suggest_int(name, distribution.low, distribution.high,
+                                             step=distribution.step, log=distribution.log)
+        else:
+            params[name] = trial.suggest_float(name, distribution.low, distribution.high,
+                                               step=distribution.step, log=distribution.log)
+    return params
+
+
+def objective_svm(
     trial,
     X_train: np.ndarray,
     X_test: np.ndarray,
     y_train: pd.Series,
     y_test: pd.Series,
-    vectorizer_type: str = 'tfidf'
+    vectorizer_type: str = 'tfidf',
+    **evaluation
 ) -> float:
     """
-    Función objetivo para optimizar Logistic Regression con Optuna.
+    Función objetivo para optimizar SVM con Optuna.
+    Prioriza overfitting < 5% y F1-score > 0.55.
     
     Args:
         trial: Trial de Optuna
@@ -168,58 +633,79 @@ def objective_logistic_regression(
         y_train: Etiquetas de entrenamiento
         y_test: Etiquetas de prueba
         vectorizer_type: Tipo de vectorizador ('tfidf' o 'count')
+        **evaluation: Modo de evaluación para `_evaluate_params` (cv, fidelity)
         
     Returns:
-        Score a maximizar
+        Score a maximizar (penaliza overfitting alto)
     """
-    # Hiperparámetros a optimizar
-    C = trial.suggest_float('C', 0.001, 10.0, log=True)
-    penalty = trial.suggest_categorical('penalty', ['l1', 'l2'])
-    
-    # Entrenar modelo
-    model = train_model(
-        'logistic',
-        X_train,
-        y_train,
-        C=C,
-        penalty=penalty,
-        class_weight='balanced'
-    )
+    # Hiperparámetros a optimizar (ver SEARCH_SPACES)
+    params = _suggest_params(trial, 'svm')
     
-    # Evaluar
-    results = evaluate_model(
-        model, X_train, X_test, y_train, y_test, verbose=False
-    )
+    # No repetir configuraciones ya evaluadas (p.ej. al reanudar un estudio)
+    previous_value = _find_duplicate_value(trial)
+    if previous_value is not None:
+        return previous_value
     
-    test_f1 = results['test_f1']
-    diff_f1 = results['diff_f1']
+    # Entrenar y evaluar (en test, por folds o por fidelidades)
+    params['class_weight'] = 'balanced'
+    return _evaluate_params(
+        trial, 'svm', params, X_train, X_test, y_train, y_test, **evaluation
+    )
+
+
+def objective_linear_svm(
+    trial,
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_train: pd.Series,
+    y_test: pd.Series,
+    vectorizer_type: str = 'tfidf',
+    **evaluation
+) -> float:
+    """
+    Función objetivo para optimizar SVM lineal calibrado con Optuna.
     
-    # Penalizar si overfitting es muy alto
-    if diff_f1 > 6.0:
-        return -20.0
+    Mucho más barata por trial que `objective_svm` (sin libsvm ni
+    Platt scaling con 5 folds), útil para datasets grandes.
     
-    # Score
-    if diff_f1 < 5.0:
-        score = test_f1 - (diff_f1 / 100) * 0.1
-    else:
-        score = test_f1 - (diff_f1 / 100) * 0.5
+    Args:
+        trial: Trial de Optuna
+        X_train: Matriz de características de entrenamiento
+        X_test: Matriz de características de prueba
+        y_train: Etiquetas de entrenamiento
+        y_test: Etiquetas de prueba
+        vectorizer_type: Tipo de vectorizador ('tfidf' o 'count')
+        **evaluation: Modo de evaluación para `_evaluate_params` (cv, fidelity)
+        
+    Returns:
+        Score a maximizar
+    """
+    # Hiperparámetros a optimizar (ver SEARCH_SPACES)
+    params = _suggest_params(trial, 'linear_svm')
     
-    if test_f1 < 0.50:
-        score -= 0.2
+    # No repetir configuraciones ya evaluadas (p.ej. al reanudar un estudio)
+    previous_value = _find_duplicate_value(trial)
+    if previous_value is not None:
+        return previous_value
     
-    return score
+    # Entrenar y evaluar (en test, por folds o por fidelidades)
+    params['class_weight'] = 'balanced'
+    return _evaluate_params(
+        trial, 'linear_svm', params, X_train, X_test, y_train, y_test, **evaluation
+    )
 
 
-def objective_random_forest(
+def objective_naive_bayes(
     trial,
     X_train: np.ndarray,
     X_test: np.ndarray,
     y_train: pd.Series,
     y_test: pd.Series,
-    vectorizer_type: str = 'tfidf'
+    vectorizer_type: str = 'tfidf',
+    **evaluation
 ) -> float:
     """
-    Función objetivo para optimizar Random Forest con Optuna.
+    Función objetivo para optimizar Naive Bayes con Optuna.
     
     Args:
         trial: Trial de Optuna
@@ -228,117 +714,602 @@ def objective_random_forest(
         y_train: Etiquetas de entrenamiento
         y_test: Etiquetas de prueba
         vectorizer_type: Tipo de vectorizador ('tfidf' o 'count')
+        **evaluation: Modo de evaluación para `_evaluate_params` (cv, fidelity)
         
     Returns:
         Score a maximizar
     """
-    # Hiperparámetros a optimizar
-    n_estimators = trial.suggest_int('n_estimators', 50, 300)
-    max_depth = trial.suggest_int('max_depth', 3, 20)
-    min_samples_split = trial.suggest_int('min_samples_split', 2, 20)
-    min_samples_leaf = trial.suggest_int('min_samples_leaf', 1, 10)
-    
-    # Entrenar modelo
-    model = train_model(
-        'random_forest',
-        X_train,
-        y_train,
-        n_estimators=n_estimators,
-        max_depth=max_depth,
-        min_samples_split=min_samples_split,
-        min_samples_leaf=min_samples_leaf,
-        class_weight='balanced'
-    )
-    
-    # Evaluar
-    results = evaluate_model(
-        model, X_train, X_test, y_train, y_test, verbose=False
-    )
-    
-    test_f1 = results['test_f1']
-    diff_f1 = results['diff_f1']
-    
-    # Penalizar si overfitting es muy alto
-    if diff_f1 > 6.0:
-        return -20.0
-    
-    # Score
-    if diff_f1 < 5.0:
-        score = test_f1 - (diff_f1 / 100) * 0.1
-    else:
-        score = test_f1 - (diff_f1 / 100) * 0.5
+    # Hiperparámetros a optimizar (ver SEARCH_SPACES)
+    params = _suggest_params(trial, 'naive_bayes')
     
-    if test_f1 < 0.50:
-        score -= 0.2
+    # No repetir configuraciones ya evaluadas (p.ej. al reanudar un estudio)
+    previous_value = _find_duplicate_value(trial)
+    if previous_value is not None:
+        return previous_value
     
-    return score
+    # Entrenar y evaluar (en test, por folds o por fidelidades)
+    return _evaluate_params(
+        trial, 'naive_bayes', params, X_train, X_test, y_train, y_test, **evaluation
+    )
 
 
-def optimize_model(
-    model_type: str,
+def objective_logistic_regression(
+    trial,
     X_train: np.ndarray,
     X_test: np.ndarray,
     y_train: pd.Series,
     y_test: pd.Series,
-    n_trials: int = 100,
     vectorizer_type: str = 'tfidf',
-    study_name: Optional[str] = None
-) -> Tuple[Any, Dict[str, Any], optuna.Study]:
+    **evaluation
+) -> float:
     """
-    Optimizar modelo con Optuna.
+    Función objetivo para optimizar Logistic Regression con Optuna.
     
     Args:
-        model_type: Tipo de modelo ('svm', 'naive_bayes', 'logistic', 'random_forest')
+        trial: Trial de Optuna
         X_train: Matriz de características de entrenamiento
         X_test: Matriz de características de prueba
         y_train: Etiquetas de entrenamiento
         y_test: Etiquetas de prueba
-        n_trials: Número de trials de Optuna (default: 100)
         vectorizer_type: Tipo de vectorizador ('tfidf' o 'count')
-        study_name: Nombre del estudio de Optuna (opcional)
+        **evaluation: Modo de evaluación para `_evaluate_params` (cv, fidelity)
         
     Returns:
-        Tupla (mejor_modelo, mejores_parámetros, estudio)
+        Score a maximizar
     """
-    model_type = model_type.lower()
-    
-    # Seleccionar función objetivo
-    if model_type == 'svm':
-        objective_func = objective_svm
-    elif model_type == 'naive_bayes':
-        objective_func = objective_naive_bayes
-    elif model_type == 'logistic':
-        objective_func = objective_logistic_regression
-    elif model_type == 'random_forest':
-        objective_func = objective_random_forest
-    else:
-        raise ValueError(f"Tipo de modelo '{model_type}' no soportado")
+    # Hiperparámetros a optimizar (ver SEARCH_SPACES)
+    params = _suggest_params(trial, 'logistic')
     
-    # Crear estudio de Optuna
-    if study_name is None:
-        study_name = f"{model_type}_{vectorizer_type}_optimization"
+    # No repetir configuraciones ya evaluadas (p.ej. al reanudar un estudio)
+    previous_value = _find_duplicate_value(trial)
+    if previous_value is not None:
+        return previous_value
     
-    study = optuna.create_study(
-        direction='maximize',
-        study_name=study_name
+    # Entrenar y evaluar (en test, por folds o por fidelidades)
+    params['class_weight'] = 'balanced'
+    return _evaluate_params(
+        trial, 'logistic', params, X_train, X_test, y_train, y_test, **evaluation
     )
+
+
+def objective_random_forest(
+    trial,
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_train: pd.Series,
+    y_test: pd.Series,
+    vectorizer_type: str = 'tfidf',
+    **evaluation
+) -> float:
+    """
+    Función objetivo para optimizar Random Forest con Optuna.
     
-    # Crear función objetivo con parámetros fijos
-    def objective(trial):
-        return objective_func(trial, X_train, X_test, y_train, y_test, vectorizer_type)
+    Args:
+        trial: Trial de Optuna
+        X_train: Matriz de características de entrenamiento
+        X_test: Matriz de características de prueba
+        y_train: Etiquetas de entrenamiento
+        y_test: Etiquetas de prueba
+        vectorizer_type: Tipo de vectorizador ('tfidf' o 'count')
+        **evaluation: Modo de evaluación para `_evaluate_params` (cv, fidelity)
+        
+    Returns:
+        Score a maximizar
+    """
+    # Hiperparámetros a optimizar (ver SEARCH_SPACES)
+    params = _suggest_params(trial, 'random_forest')
+    
+    # No repetir configuraciones ya evaluadas (p.ej. al reanudar un estudio)
+    previous_value = _find_duplicate_value(trial)
+    if previous_value is not None:
+        return previous_value
+    
+    # Entrenar y evaluar (en test, por folds o por fidelidades)
+    params['class_weight'] = 'balanced'
+    return _evaluate_params(
+        trial, 'random_forest', params, X_train, X_test, y_train, y_test, **evaluation
+    )
+
+
+def _get_objective_func(model_type: str):
+    """
+    Obtener la función objetivo de un tipo de modelo.
+    
+    Args:
+        model_type: Tipo de modelo
+        
+    Returns:
+        Función objetivo
+    """
+    objectives = {
+        'svm': objective_svm,
+        'linear_svm': objective_linear_svm,
+        'naive_bayes': objective_naive_bayes,
+        'logistic': objective_logistic_regression,
+        'random_forest': objective_random_forest
+    }
+    if model_type not in objectives:
+        raise ValueError(f"Tipo de modelo '{model_type}' no soportado")
+    return objectives[model_type]
+
+
+def _make_storage(storage: Optional[str]):
+    """
+    Crear el storage de Optuna.
+    
+    Para SQLite se amplía el timeout de bloqueo, ya que varios procesos
+    escriben trials en el mismo archivo, y se activa el heartbeat para
+    recuperar trials interrumpidos.
+    
+    Args:
+        storage: URL del storage (p.ej. 'sqlite:///optuna.db') o None (memoria)
+        
+    Returns:
+        Storage de Optuna o None
+    """
+    if isinstance(storage, str) and storage.startswith('sqlite'):
+        return optuna.storages.RDBStorage(
+            storage,
+            engine_kwargs={'connect_args': {'timeout': 60}},
+            # Trials de un proceso que murió (sin heartbeat) se marcan como
+            # fallidos y se reintentan una vez con los mismos parámetros
+            heartbeat_interval=60,
+            grace_period=180,
+            failed_trial_callback=optuna.storages.RetryFailedTrialCallback(max_retry=1)
+        )
+    return storage
+
+
+def _open_study(
+    study_name: str,
+    storage: Optional[str],
+    persist: bool,
+    n_jobs: int,
+    n_trials: Optional[int],
+    pruner,
+    fingerprint: str,
+    attrs: Dict[str, Any],
+    directions: Optional[List[str]] = None
+) -> Tuple[optuna.Study, Optional[str], int, Optional[Path]]:
+    """
+    Crear o reanudar un estudio y calcular los trials pendientes.
+    
+    Args:
+        study_name: Nombre del estudio
+        storage: URL del storage (None = según `persist` y `n_jobs`)
+        persist: Si True y no hay storage, usa `default_storage_url()`
+        n_jobs: Procesos en paralelo (con más de uno hace falta storage)
+        n_trials: Número total de trials deseado (None = sin límite)
+        pruner: Pruner de Optuna
+        fingerprint: Huella de los datos de la búsqueda
+        attrs: Atributos descriptivos a guardar en un estudio nuevo
+        directions: Direcciones de un estudio multi-objetivo (default: maximizar)
+        
+    Returns:
+        Tupla (estudio, URL del storage usado, trials pendientes o None,
+        directorio temporal del storage o None); el directorio se libera
+        con `_close_temporary_study`
+    """
+    storage_dir = None
+    if storage is None and persist:
+        storage = default_storage_url()
+    if storage is None and n_jobs != 1:
+        # Los workers necesitan un storage compartido
+        storage_dir = Path(tempfile.mkdtemp(prefix='optuna_'))
+        storage = f"sqlite:///{storage_dir / 'optuna.db'}"
+    
+    study = optuna.create_study(
+        direction=None if directions else 'maximize',
+        directions=directions,
+        study_name=study_name,
+        storage=_make_storage(storage),
+        pruner=pruner,
+        load_if_exists=True
+    )
+    
+    # Comprobar que un estudio reanudado corresponde a los mismos datos
+    stored_fingerprint = study.user_attrs.get('data_fingerprint')
+    if stored_fingerprint is None:
+        study.set_user_attr('data_fingerprint', fingerprint)
+        study.set_user_attr('study_uid', uuid.uuid4().hex)
+        for name, value in attrs.items():
+            study.set_user_attr(name, value)
+    elif stored_fingerprint != fingerprint:
+        raise ValueError(f"El estudio '{study_name}' se creó con otros datos; "
+                        f"usa otro study_name para empezar uno nuevo")
+    elif 'study_uid' not in study.user_attrs:
+        # Estudio anterior a los identificadores: asignarle uno
+        study.set_user_attr('study_uid', uuid.uuid4().hex)
+    
+    finished_states = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+    n_finished = sum(
+        not _is_historical(t) for t in study.get_trials(deepcopy=False, states=finished_states)
+    )
+    remaining = max(0, n_trials - n_finished) if n_trials is not None else None
+    if n_finished > 0:
+        print(f"♻️  Reanudando estudio '{study_name}': {n_finished} trials terminados, "
+              f"{remaining if remaining is not None else 'sin límite de'} pendientes")
+    if remaining == 0:
+        print(f"✅ El estudio ya tiene {n_finished} trials, no hay nada que ejecutar")
+    
+    return study, storage, remaining, storage_dir
+
+
+def _close_temporary_study(
+    study: optuna.Study,
+    storage: Optional[str],
+    storage_dir: Optional[Path]
+) -> optuna.Study:
+    """
+    Pasar a memoria un estudio con storage temporal y borrar su directorio.
+    
+    Args:
+        study: Estudio abierto con `_open_study`
+        storage: URL del storage del estudio
+        storage_dir: Directorio temporal devuelto por `_open_study` (None = nada que hacer)
+        
+    Returns:
+        El mismo estudio, o una copia en memoria si su storage era temporal
+    """
+    if storage_dir is None:
+        return study
+    try:
+        memory_storage = optuna.storages.InMemoryStorage()
+        optuna.copy_study(
+            from_study_name=study.study_name, from_storage=storage, to_storage=memory_storage
+        )
+        return optuna.load_study(study_name=study.study_name, storage=memory_storage)
+    finally:
+        shutil.rmtree(storage_dir, ignore_errors=True)
+
+
+def _split_trials(n_trials: Optional[int], n_workers: int) -> List[Optional[int]]:
+    """Repartir n_trials entre workers lo más equilibrado posible (None = sin límite)."""
+    if n_trials is None:
+        return [None] * n_workers
+    return [n_trials // n_workers + (1 if i < n_trials % n_workers else 0) for i in range(n_workers)]
+
+
+def _optimize_worker(
+    study_name: str,
+    storage: str,
+    model_type: str,
+    data_paths: Dict[str, Path],
+    n_trials: Optional[int],
+    vectorizer_type: str,
+    evaluation: Dict[str, Any],
+    pruner: Any,
+    timeout: Optional[float] = None
+) -> int:
+    """
+    Ejecutar trials de un estudio compartido desde un proceso worker.
+    
+    Las matrices se leen con memory-mapping desde los archivos compartidos
+    y los trials se coordinan a través del storage SQLite.
+    
+    Args:
+        study_name: Nombre del estudio
+        storage: URL del storage compartido
+        model_type: Tipo de modelo
+        data_paths: Rutas de X_train, X_test, y_train, y_test
+        n_trials: Trials a ejecutar en este worker (None = hasta el timeout)
+        vectorizer_type: Tipo de vectorizador
+        evaluation: Opciones de evaluación de los objetivos (ver `_evaluate_params`)
+        pruner: Pruner de Optuna; no se guarda en el storage, así que se
+                pasa explícitamente a cada worker
+        timeout: Segundos disponibles para este worker (None = sin límite)
+        
+    Returns:
+        Número de trials ejecutados
+    """
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=_make_storage(storage),
+        pruner=pruner
+    )
+    
+    X_train = load_shared_array(data_paths['X_train'])
+    X_test = load_shared_array(data_paths['X_test'])
+    y_train = load_shared_array(data_paths['y_train'])
+    y_test = load_shared_array(data_paths['y_test'])
+    objective_func = _get_objective_func(model_type)
+    
+    n_executed = 0
+    
+    def objective(trial):
+        nonlocal n_executed
+        n_executed += 1
+        return objective_func(trial, X_train, X_test, y_train, y_test, vectorizer_type, **evaluation)
+    
+    study.optimize(objective, n_trials=n_trials, timeout=timeout)
+    return n_executed
+
+
+def _run_study(
+    study: optuna.Study,
+    study_name: str,
+    storage: Optional[str],
+    model_type: str,
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_train: pd.Series,
+    y_test: pd.Series,
+    vectorizer_type: str,
+    evaluation: Dict[str, Any],
+    trial_pruner: Any,
+    remaining: Optional[int],
+    n_jobs: int,
+    timeout: Optional[float]
+) -> optuna.Study:
+    """
+    Ejecutar los trials pendientes de un estudio, en serie o en procesos.
+    
+    Args:
+        study: Estudio abierto con `_open_study`
+        study_name: Nombre del estudio
+        storage: URL del storage (compartido por los workers)
+        model_type: Tipo de modelo
+        X_train: Matriz de características de entrenamiento
+        X_test: Matriz de características de prueba
+        y_train: Etiquetas de entrenamiento
+        y_test: Etiquetas de prueba
+        vectorizer_type: Tipo de vectorizador
+        evaluation: Opciones de evaluación (ver `_evaluate_params`)
+        trial_pruner: Pruner de Optuna
+        remaining: Trials pendientes (None = hasta el timeout)
+        n_jobs: Procesos en paralelo (-1 = todos los núcleos)
+        timeout: Segundos máximos de búsqueda
+        
+    Returns:
+        Estudio con todos los trials (recargado si hubo workers)
+    """
+    objective_func = _get_objective_func(model_type)
+    
+    if n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, remaining if remaining is not None else n_jobs))
+    budget = f"{remaining} trials" if remaining is not None else "trials sin límite"
+    if timeout is not None:
+        budget += f" (máximo {timeout:.0f}s)"
+    
+    if remaining == 0:
+        return study
     
     # Optimizar
-    print(f"🔍 Optimizando {model_type.upper()} con {n_trials} trials...")
-    study.optimize(objective, n_trials=n_trials, show_progress_bar=True)
+    if n_jobs == 1:
+        def objective(trial):
+            return objective_func(trial, X_train, X_test, y_train, y_test, vectorizer_type, **evaluation)
+        
+        print(f"🔍 Optimizando {model_type.upper()} con {budget}...")
+        study.optimize(objective, n_trials=remaining, timeout=timeout, show_progress_bar=True)
+    else:
+        print(f"🔍 Optimizando {model_type.upper()} con {budget} en {n_jobs} procesos...")
+        data_paths = dump_shared_arrays({
+            'X_train': X_train,
+            'X_test': X_test,
+            'y_train': np.asarray(y_train),
+            'y_test': np.asarray(y_test)
+        })
+        try:
+            Parallel(n_jobs=n_jobs)(
+                delayed(_optimize_worker)(
+                    study_name, storage, model_type, data_paths, worker_trials,
+                    vectorizer_type, evaluation, trial_pruner, timeout
+                )
+                for worker_trials in _split_trials(remaining, n_jobs)
+            )
+        finally:
+            cleanup_shared_arrays(data_paths)
+        
+        # Recargar el estudio con los trials de todos los workers
+        study = optuna.load_study(study_name=study_name, storage=_make_storage(storage))
     
-    # Obtener mejores parámetros
-    best_params = study.best_params
-    print(f"\n✅ Mejores parámetros encontrados:")
-    for param, value in best_params.items():
-        print(f"   {param}: {value}")
+    n_pruned = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.PRUNED,)))
+    if n_pruned:
+        print(f"✂️  {n_pruned} trials podados antes de completar la evaluación")
+    
+    print("\n⏱️  Coste de la búsqueda:")
+    print(summarize_trial_costs([study]).to_string(index=False))
+    
+    return study
+
+
+def optimize_model(
+    model_type: str,
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_train: pd.Series,
+    y_test: pd.Series,
+    n_trials: Optional[int] = 100,
+    vectorizer_type: str = 'tfidf',
+    study_name: Optional[str] = None,
+    n_jobs: int = 1,
+    storage: Optional[str] = None,
+    persist: bool = False,
+    cv: Optional[int] = None,
+    pruner: Optional[str] = 'median',
+    fidelity_min_fraction: Optional[float] = None,
+    reduction_factor: int = 3,
+    model_store: Optional[TrialModelStore] = None,
+    keep_top_k: int = 3,
+    timeout: Optional[float] = None,
+    trial_timeout: Optional[float] = None,
+    cost_aware: bool = False,
+    warm_start_top_n: int = 0,
+    warm_start_add_trials: bool = False,
+    mlruns_dir: Optional[Path] = None
+) -> Tuple[Any, Dict[str, Any], optuna.Study]:
+    """
+    Optimizar modelo con Optuna.
+    
+    Con `persist=True` (o un `storage`) los estudios se guardan en SQLite
+    y se reanudan con `load_if_exists`: `n_trials` es el total deseado, así
+    que volver a llamar tras un fallo (o con un `n_trials` mayor) solo
+    ejecuta los trials que faltan. Las configuraciones ya evaluadas no se
+    vuelven a entrenar. El estudio guarda una huella de los datos y se
+    niega a reanudarse con datos distintos; el nombre por defecto ya
+    incluye esa huella, así que solo un `study_name` explícito puede
+    chocar con datos nuevos.
+    
+    Con `n_jobs > 1` los trials se ejecutan en procesos independientes
+    (no hilos: el GIL y libsvm serializarían el trabajo) que comparten el
+    estudio a través de un storage SQLite y leen las matrices de
+    características con memory-mapping, sin copiarlas a cada worker.
+    
+    Con `cv` cada trial se valida con StratifiedKFold sobre train y el
+    pruner detiene las configuraciones peores que la mediana (o según
+    Hyperband) tras cada fold. El conjunto de test solo se usa para
+    evaluar el modelo final.
+    
+    Con `fidelity_min_fraction` la búsqueda es multi-fidelidad (en lugar
+    de validación cruzada): cada trial empieza con una submuestra
+    estratificada pequeña de train y successive halving solo promociona
+    a fracciones mayores (×`reduction_factor`) las configuraciones
+    prometedoras. Permite muchos más trials con el mismo tiempo.
+    
+    Con `cv=None` cada trial entrena con todo train: los modelos de los
+    `keep_top_k` mejores trials se guardan en disco y el mejor se
+    devuelve directamente, sin volver a entrenarlo. Con validación
+    cruzada o multi-fidelidad ningún trial ve todo train, así que el
+    mejor modelo se entrena una vez al final; con `persist` (o un
+    `model_store`) se guarda, y reanudar el estudio lo reutiliza si el
+    mejor trial no ha cambiado. Sin `persist` el almacén es temporal y
+    se borra al terminar.
+    
+    Para ajustarse a una ventana de tiempo, `timeout` limita la búsqueda
+    completa (con `n_trials=None` se ejecutan trials hasta agotarlo) y
+    `trial_timeout` mata los entrenamientos desbocados (SVC RBF, bosques
+    profundos). Cada trial registra sus tiempos de ajuste y predicción y
+    al final se imprime el resumen de costes (`summarize_trial_costs`).
+    
+    Un estudio nuevo puede arrancar en caliente desde runs anteriores de
+    MLFlow (`warm_start_study`): las mejores configuraciones históricas
+    se evalúan primero y, opcionalmente, el sampler parte de todos los
+    runs con el mismo vectorizador.
+    
+    Args:
+        model_type: Tipo de modelo ('svm', 'linear_svm', 'naive_bayes', 'logistic',
+                    'random_forest')
+        X_train: Matriz de características de entrenamiento
+        X_test: Matriz de características de prueba
+        y_train: Etiquetas de entrenamiento
+        y_test: Etiquetas de prueba
+        n_trials: Número total de trials del estudio (default: 100; None =
+                  sin límite, requiere `timeout`)
+        vectorizer_type: Tipo de vectorizador ('tfidf' o 'count')
+        study_name: Nombre del estudio de Optuna (default: incluye la huella
+                    de los datos, así que cada conjunto de datos tiene el suyo)
+        n_jobs: Procesos en paralelo (default: 1, -1 = todos los núcleos)
+        storage: URL del storage de Optuna (opcional)
+        persist: Si True y no hay storage, usa `default_storage_url()`
+                 (default: False, el estudio vive en memoria o en un
+                 SQLite temporal si n_jobs > 1)
+        cv: Folds de validación cruzada por trial (default: None = usar test;
+            p.ej. 5 para validar en train y podar por folds)
+        pruner: 'median' (default), 'hyperband' o None para no podar
+        fidelity_min_fraction: Fracción de train del primer escalón de
+                               multi-fidelidad (p.ej. 0.1); None = desactivado
+        reduction_factor: Factor entre escalones de multi-fidelidad (default: 3)
+        model_store: Almacén de modelos de trials (default: models/trials/<estudio>/<uid>
+                     si persist, o un directorio temporal)
+        keep_top_k: Modelos de trials a conservar en el almacén por defecto
+        timeout: Segundos máximos de búsqueda (sin contar el modelo final)
+        trial_timeout: Segundos máximos de entrenamiento por trial
+        cost_aware: Si True, a igualdad de score se prefieren trials baratos
+        warm_start_top_n: Configuraciones históricas de MLFlow a evaluar
+                          primero en un estudio nuevo (default: 0)
+        warm_start_add_trials: Si True, añade los runs históricos como
+                               trials para informar al sampler
+        mlruns_dir: Directorio mlruns (default: backend/mlruns)
+        
+    Returns:
+        Tupla (mejor_modelo, mejores_parámetros, estudio)
+    """
+    model_type = model_type.lower()
+    if n_trials is None and timeout is None:
+        raise ValueError("Indica n_trials, timeout o ambos")
     
-    # Entrenar mejor modelo
-    best_model = train_model(model_type, X_train, y_train, **best_params)
+    # Validar el tipo de modelo antes de crear nada
+    _get_objective_func(model_type)
+    
+    # Crear estudio de Optuna (el nombre por defecto incluye la huella de
+    # los datos: con datos nuevos empieza otro estudio en lugar de fallar)
+    fingerprint = data_fingerprint(X_train, X_test, y_train, y_test)
+    if study_name is None:
+        study_name = f"{model_type}_{vectorizer_type}_optimization_{fingerprint[:8]}"
+    
+    if fidelity_min_fraction is not None:
+        evaluation = {'fidelity': fidelity_fractions(fidelity_min_fraction, reduction_factor)}
+        print(f"ℹ️  Multi-fidelidad con fracciones {[round(f, 3) for f in evaluation['fidelity']]} "
+              f"(sustituye a la validación cruzada)")
+    else:
+        evaluation = {'cv': cv}
+    trial_pruner = _make_pruner(pruner, **evaluation)
+    evaluation.update({'trial_timeout': trial_timeout, 'cost_aware': cost_aware})
+    
+    study, storage, remaining, storage_dir = _open_study(
+        study_name, storage, persist, n_jobs, n_trials, trial_pruner, fingerprint,
+        {'model_type': model_type, 'vectorizer_type': vectorizer_type}
+    )
+    
+    # Sin cv ni multi-fidelidad los trials entrenan con todo train y se
+    # guardan los mejores. Con cv solo se guarda el modelo final, para que
+    # reanudar un estudio persistente no vuelva a entrenarlo
+    full_train = not evaluation.get('cv') and not evaluation.get('fidelity')
+    tmp_store_dir = None
+    if model_store is None and (full_train or persist):
+        if persist:
+            store_dir = default_trial_store_dir(study_name, study.user_attrs['study_uid'])
+        else:
+            store_dir = tmp_store_dir = Path(tempfile.mkdtemp(prefix='trial_models_'))
+        model_store = TrialModelStore(store_dir, top_k=keep_top_k, fingerprint=fingerprint)
+    elif model_store is not None and model_store.fingerprint is None:
+        model_store.fingerprint = fingerprint
+    if full_train:
+        evaluation['model_store'] = model_store
+    
+    try:
+        try:
+            if (warm_start_top_n > 0 or warm_start_add_trials) and not study.get_trials(deepcopy=False):
+                warm_start_study(
+                    study, model_type, vectorizer_type, top_n=warm_start_top_n,
+                    add_as_trials=warm_start_add_trials, mlruns_dir=mlruns_dir
+                )
+            
+            study = _run_study(
+                study, study_name, storage, model_type, X_train, X_test, y_train, y_test,
+                vectorizer_type, evaluation, trial_pruner, remaining, n_jobs, timeout
+            )
+        finally:
+            # El SQLite temporal de los workers no sobrevive a la llamada
+            study = _close_temporary_study(study, storage, storage_dir)
+        
+        # Mejor trial evaluado en esta búsqueda (no los históricos de MLFlow)
+        best_trial = _best_evaluated_trial(study)
+        if best_trial is None:
+            raise ValueError(f"Ningún trial de '{study_name}' se completó dentro del presupuesto")
+        
+        # Obtener mejores parámetros
+        best_params = best_trial.params
+        print(f"\n✅ Mejores parámetros encontrados:")
+        for param, value in best_params.items():
+            print(f"   {param}: {value}")
+        
+        # Reutilizar el modelo del mejor trial si está guardado
+        best_number = best_trial.user_attrs.get('duplicate_of', best_trial.number)
+        if model_store is not None and model_store.has(best_number):
+            best_model = model_store.load(best_number)
+            print(f"♻️  Modelo del trial {best_number} reutilizado (sin reentrenar)")
+        else:
+            start = time.perf_counter()
+            best_model = train_model(model_type, X_train, y_train, **best_params)
+            if model_store is not None and not full_train:
+                model_store.offer(best_number, best_trial.value, best_model, time.perf_counter() - start)
+    finally:
+        # El almacén temporal (sin persist) no sobrevive a la llamada
+        if tmp_store_dir is not None:
+            shutil.rmtree(tmp_store_dir, ignore_errors=True)
     
     # Evaluar mejor modelo
     best_results = evaluate_model(
@@ -347,3 +1318,612 @@ def optimize_model(
     
     return best_model, best_params, study
 
+
+def summarize_trial_costs(studies: List[optuna.Study]) -> pd.DataFrame:
+    """
+    Resumir el tiempo gastado por familia de modelo.
+    
+    Args:
+        studies: Estudios a resumir (la familia sale del atributo
+                 `model_type` del estudio)
+        
+    Returns:
+        DataFrame con trials por estado y tiempos de ajuste, predicción
+        y reloj por familia
+    """
+    rows = {}
+    for study in studies:
+        family = study.user_attrs.get('model_type', study.study_name)
+        row = rows.setdefault(family, {
+            'Familia': family, 'Trials': 0, 'Completados': 0, 'Podados': 0,
+            'Cancelados': 0, 'Ajuste (s)': 0.0, 'Predicción (s)': 0.0, 'Total (s)': 0.0
+        })
+        for trial in study.get_trials(deepcopy=False):
+            row['Trials'] += 1
+            row['Completados'] += trial.state == optuna.trial.TrialState.COMPLETE
+            row['Podados'] += trial.state == optuna.trial.TrialState.PRUNED
+            row['Cancelados'] += bool(trial.user_attrs.get('timed_out'))
+            row['Ajuste (s)'] += trial.user_attrs.get('fit_time', 0.0)
+            row['Predicción (s)'] += trial.user_attrs.get('predict_time', 0.0)
+            if trial.duration is not None:
+                row['Total (s)'] += trial.duration.total_seconds()
+    
+    df = pd.DataFrame(list(rows.values()))
+    if not df.empty:
+        df['Media por trial (s)'] = df['Total (s)'] / df['Trials'].clip(lower=1)
+        df = df.round(3)
+    return df
+
+
+def optimize_models_within_budget(
+    model_types: List[str],
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_train: pd.Series,
+    y_test: pd.Series,
+    timeout: float,
+    **optimize_kwargs
+) -> Tuple[Dict[str, Dict[str, Any]], pd.DataFrame]:
+    """
+    Optimizar varias familias de modelos dentro de una ventana de tiempo.
+    
+    El tiempo que queda se reparte a partes iguales entre las familias
+    pendientes, de modo que lo que sobra de una familia rápida pasa a
+    las siguientes.
+    
+    Args:
+        model_types: Familias a optimizar (ver `optimize_model`)
+        X_train: Matriz de características de entrenamiento
+        X_test: Matriz de características de prueba
+        y_train: Etiquetas de entrenamiento
+        y_test: Etiquetas de prueba
+        timeout: Segundos totales de la ventana
+        **optimize_kwargs: Argumentos para `optimize_model` (trial_timeout,
+                           cv, cost_aware, n_trials...)
+        
+    Returns:
+        Tupla ({familia: {'model', 'params', 'study'}}, resumen de costes)
+    """
+    optimize_kwargs.setdefault('n_trials', None)
+    deadline = time.monotonic() + timeout
+    results = {}
+    studies = []
+    
+    for i, model_type in enumerate(model_types):
+        share = (deadline - time.monotonic()) / (len(model_types) - i)
+        if share <= 0:
+            print(f"⚠️  Sin tiempo para {model_type.upper()}")
+            continue
+        
+        try:
+            model, params, study = optimize_model(
+                model_type, X_train, X_test, y_train, y_test, timeout=share, **optimize_kwargs
+            )
+        except ValueError as e:
+            print(f"⚠️  {model_type.upper()}: {e}")
+            continue
+        results[model_type] = {'model': model, 'params': params, 'study': study}
+        studies.append(study)
+    
+    summary = summarize_trial_costs(studies)
+    print("\n⏱️  Tiempo por familia de modelo:")
+    print(summary.to_string(index=False))
+    return results, summary
+
+
+def optimize_multi_objective(
+    model_type: str,
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_train: pd.Series,
+    y_test: pd.Series,
+    n_trials: Optional[int] = 100,
+    vectorizer_type: str = 'tfidf',
+    study_name: Optional[str] = None,
+    n_jobs: int = 1,
+    storage: Optional[str] = None,
+    persist: bool = False,
+    cv: Optional[int] = 5,
+    timeout: Optional[float] = None,
+    trial_timeout: Optional[float] = None
+) -> Tuple[pd.DataFrame, optuna.Study]:
+    """
+    Optimizar score, latencia de inferencia y tamaño del modelo a la vez.
+    
+    Cada trial devuelve (score, latencia por texto en ms, tamaño en KB)
+    y el resultado es el frente de Pareto: configuraciones que ninguna
+    otra supera en los tres objetivos. Así un modelo un 0.2% mejor pero
+    10× más lento no gana por defecto; el modelo final se elige con
+    `select_model_under_latency_budget`. Optuna no poda estudios
+    multi-objetivo, así que no hay pruner ni multi-fidelidad.
+    
+    Args:
+        model_type: Tipo de modelo (ver `optimize_model`)
+        X_train: Matriz de características de entrenamiento
+        X_test: Matriz de características de prueba
+        y_train: Etiquetas de entrenamiento
+        y_test: Etiquetas de prueba
+        n_trials: Número total de trials del estudio (None = hasta el timeout)
+        vectorizer_type: Tipo de vectorizador ('tfidf' o 'count')
+        study_name: Nombre del estudio de Optuna (default: incluye la huella
+                    de los datos, así que cada conjunto de datos tiene el suyo)
+        n_jobs: Procesos en paralelo (default: 1, -1 = todos los núcleos)
+        storage: URL del storage de Optuna (opcional)
+        persist: Si True y no hay storage, usa `default_storage_url()`
+                 (default: False, el estudio vive en memoria)
+        cv: Folds de validación cruzada por trial (default: 5, None = usar test)
+        timeout: Segundos máximos de búsqueda
+        trial_timeout: Segundos máximos de entrenamiento por trial
+        
+    Returns:
+        Tupla (frente de Pareto como DataFrame, estudio)
+    """
+    model_type = model_type.lower()
+    if n_trials is None and timeout is None:
+        raise ValueError("Indica n_trials, timeout o ambos")
+    _get_objective_func(model_type)
+    
+    fingerprint = data_fingerprint(X_train, X_test, y_train, y_test)
+    if study_name is None:
+        study_name = f"{model_type}_{vectorizer_type}_multiobjective_{fingerprint[:8]}"
+    
+    evaluation = {'cv': cv, 'trial_timeout': trial_timeout, 'serving_objectives': True}
+    trial_pruner = optuna.pruners.NopPruner()
+    study, storage, remaining, storage_dir = _open_study(
+        study_name, storage, persist, n_jobs, n_trials, trial_pruner, fingerprint,
+        {'model_type': model_type, 'vectorizer_type': vectorizer_type},
+        directions=MULTI_OBJECTIVE_DIRECTIONS
+    )
+    try:
+        study = _run_study(
+            study, study_name, storage, model_type, X_train, X_test, y_train, y_test,
+            vectorizer_type, evaluation, trial_pruner, remaining, n_jobs, timeout
+        )
+    finally:
+        study = _close_temporary_study(study, storage, storage_dir)
+    
+    front = pareto_front(study)
+    print(f"\n✅ Frente de Pareto: {len(front)} configuraciones")
+    print(front.to_string(index=False))
+    return front, study
+
+
+def pareto_front(study: optuna.Study) -> pd.DataFrame:
+    """
+    Tabla del frente de Pareto de un estudio multi-objetivo.
+    
+    Args:
+        study: Estudio creado con `optimize_multi_objective`
+        
+    Returns:
+        DataFrame ordenado por score con trial, score, latencia, tamaño
+        y parámetros
+    """
+    rows = []
+    for trial in study.best_trials:
+        score, latency_ms, size_kb = trial.values
+        rows.append({
+            'Trial': trial.number,
+            'Score': score,
+            'Latencia (ms)': latency_ms,
+            'Tamaño (KB)': size_kb,
+            'Parámetros': trial.params
+        })
+    if not rows:
+        return pd.DataFrame(columns=['Trial', 'Score', 'Latencia (ms)', 'Tamaño (KB)', 'Parámetros'])
+    return pd.DataFrame(rows).sort_values('Score', ascending=False).reset_index(drop=True)
+
+
+def select_model_under_latency_budget(
+    study: optuna.Study,
+    X_train: np.ndarray,
+    y_train: pd.Series,
+    max_latency_ms: float,
+    max_size_kb: Optional[float] = None
+) -> Tuple[Any, Dict[str, Any], optuna.trial.FrozenTrial]:
+    """
+    Elegir del frente de Pareto el mejor modelo que cumple el presupuesto de servicio.
+    
+    Args:
+        study: Estudio creado con `optimize_multi_objective`
+        X_train: Matriz de características de entrenamiento
+        y_train: Etiquetas de entrenamiento
+        max_latency_ms: Latencia máxima por texto en milisegundos
+        max_size_kb: Tamaño máximo del modelo serializado (opcional)
+        
+    Returns:
+        Tupla (modelo entrenado con todo train, parámetros, trial elegido)
+    """
+    candidates = [
+        trial for trial in study.best_trials
+        if trial.values[1] <= max_latency_ms
+        and (max_size_kb is None or trial.values[2] <= max_size_kb)
+    ]
+    if not candidates:
+        raise ValueError(f"Ninguna configuración del frente de Pareto cumple "
+                        f"latencia <= {max_latency_ms} ms"
+                        + (f" y tamaño <= {max_size_kb} KB" if max_size_kb is not None else ""))
+    
+    chosen = max(candidates, key=lambda trial: trial.values[0])
+    model_type = study.user_attrs['model_type']
+    print(f"✅ Trial {chosen.number} elegido: score {chosen.values[0]:.4f}, "
+          f"{chosen.values[1]:.3f} ms/texto, {chosen.values[2]:.1f} KB")
+    
+    model = train_model(model_type, X_train, y_train, **chosen.params)
+    return model, chosen.params, chosen
+
+
+def _is_historical(trial: optuna.trial.FrozenTrial) -> bool:
+    """Indicar si un trial se añadió desde un run histórico de MLFlow."""
+    return trial.user_attrs.get('source') == 'mlflow'
+
+
+def _best_evaluated_trial(study: optuna.Study) -> Optional[optuna.trial.FrozenTrial]:
+    """Mejor trial completado del estudio, sin contar los históricos de MLFlow."""
+    completed = [
+        t for t in study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+        if not _is_historical(t)
+    ]
+    return max(completed, key=lambda t: t.value) if completed else None
+
+
+def _params_from_run(run_params: Dict[str, str], model_type: str) -> Dict[str, Any]:
+    """
+    Convertir los parámetros de un run (strings) al espacio de búsqueda.
+    
+    Args:
+        run_params: Parámetros del run tal como los guarda MLFlow
+        model_type: Tipo de modelo
+        
+    Returns:
+        Parámetros válidos del espacio de búsqueda (puede estar incompleto);
+        vacío si algún valor está fuera del espacio
+    """
+    params = {}
+    for name, distribution in SEARCH_SPACES[model_type].items():
+        if name not in run_params:
+            continue
+        raw = run_params[name]
+        try:
+            if isinstance(distribution, CategoricalDistribution):
+                matches = [c for c in distribution.choices if str(c) == raw]
+                if not matches:
+                    return {}
+                value = matches[0]
+            elif isinstance(distribution, IntDistribution):
+                value = int(float(raw))
+            else:
+                value = float(raw)
+        except ValueError:
+            return {}
+        if not distribution._contains(distribution.to_internal_repr(value)):
+            return {}
+        params[name] = value
+    return params
+
+
+def historical_configurations(
+    model_type: str,
+    vectorizer_type: str = 'tfidf',
+    mlruns_dir: Optional[Path] = None,
+    vectorizer_params: Optional[Dict[str, Any]] = None
+) -> pd.DataFrame:
+    """
+    Configuraciones de runs anteriores de MLFlow para un modelo y vectorizador.
+    
+    Se reconocen los runs de `MLFlowTracker.log_model_training` (parámetros
+    `model_type`/`vectorizer_type` y métricas test_f1/diff_f1) y los de
+    `log_hyperparameter_optimization` (tag `study_name` y métrica
+    best_f1_score, que ya es el score del estudio).
+    
+    Args:
+        model_type: Tipo de modelo
+        vectorizer_type: Tipo de vectorizador que deben haber usado los runs
+        mlruns_dir: Directorio mlruns (default: backend/mlruns)
+        vectorizer_params: Parámetros del vectorizador que deben coincidir
+                           si el run los registró (p.ej. max_features)
+        
+    Returns:
+        DataFrame con run_id, score y params, ordenado por score
+    """
+    rows = []
+    for run in load_mlflow_runs(mlruns_dir).itertuples():
+        run_params, metrics = run.params, run.metrics
+        study_name = run.tags.get('study_name', '')
+        
+        if run_params.get('model_type', '').lower() == model_type:
+            run_vectorizer = run_params.get('vectorizer_type', run.tags.get('vectorizer'))
+        elif study_name.startswith(f'{model_type}_'):
+            run_vectorizer = study_name[len(model_type) + 1:].split('_')[0]
+        else:
+            continue
+        if run_vectorizer is not None and run_vectorizer != vectorizer_type:
+            continue
+        if any(name in run_params and run_params[name] != str(value)
+               for name, value in (vectorizer_params or {}).items()):
+            continue
+        
+        params = _params_from_run(run_params, model_type)
+        if not params:
+            continue
+        
+        if 'test_f1' in metrics and 'diff_f1' in metrics:
+            score = _overfitting_score(metrics['test_f1'], metrics['diff_f1'])
+        elif 'best_f1_score' in metrics:
+            score = metrics['best_f1_score']
+        else:
+            score = None
+        rows.append({'run_id': run.run_id, 'score': score, 'params': params})
+    
+    df = pd.DataFrame(rows, columns=['run_id', 'score', 'params'])
+    return df.sort_values('score', ascending=False, na_position='last').reset_index(drop=True)
+
+
+def warm_start_study(
+    study: optuna.Study,
+    model_type: str,
+    vectorizer_type: str = 'tfidf',
+    top_n: int = 5,
+    add_as_trials: bool = False,
+    mlruns_dir: Optional[Path] = None,
+    vectorizer_params: Optional[Dict[str, Any]] = None
+) -> Dict[str, int]:
+    """
+    Sembrar un estudio con configuraciones de runs anteriores de MLFlow.
+    
+    Las `top_n` mejores configuraciones distintas se encolan para que los
+    primeros trials las evalúen con los datos actuales. Con `add_as_trials`
+    los runs completos se añaden además como trials terminados (marcados
+    con `source='mlflow'`), de modo que el sampler empieza con un modelo
+    de la zona buena; no cuentan para `n_trials` ni para elegir el mejor.
+    
+    Args:
+        study: Estudio de un solo objetivo
+        model_type: Tipo de modelo
+        vectorizer_type: Tipo de vectorizador
+        top_n: Configuraciones históricas a encolar
+        add_as_trials: Si True, añade los runs como trials históricos
+        mlruns_dir: Directorio mlruns (default: backend/mlruns)
+        vectorizer_params: Parámetros del vectorizador que deben coincidir
+        
+    Returns:
+        Diccionario con el número de trials encolados y añadidos
+    """
+    history = historical_configurations(model_type, vectorizer_type, mlruns_dir, vectorizer_params)
+    space = SEARCH_SPACES[model_type]
+    
+    seen = set()
+    enqueued = 0
+    for params in history['params']:
+        key = tuple(sorted(params.items()))
+        if enqueued >= top_n or key in seen:
+            continue
+        seen.add(key)
+        study.enqueue_trial(params, skip_if_exists=True)
+        enqueued += 1
+    
+    added = 0
+    if add_as_trials:
+        for run in history.itertuples():
+            if run.score is None or pd.isna(run.score) or set(run.params) != set(space):
+                continue
+            study.add_trial(optuna.trial.create_trial(
+                params=run.params,
+                distributions=space,
+                value=float(run.score),
+                user_attrs={'source': 'mlflow', 'mlflow_run_id': run.run_id}
+            ))
+            added += 1
+    
+    print(f"♻️  Arranque en caliente desde MLFlow: {enqueued} configuraciones encoladas, "
+          f"{added} runs añadidos al sampler")
+    return {'enqueued': enqueued, 'added': added}
+
+
+# Espacio de búsqueda del vectorizador. Valores discretos para que los
+# trials repitan configuraciones y reutilicen las features cacheadas.
+VECTORIZER_SEARCH_SPACE = {
+    'max_features': [500, 1000, 2000, 5000, 10000],
+    'ngram_range': ['1-1', '1-2', '1-3'],
+    'min_df': [1, 2, 3, 5],
+    'max_df': [0.8, 0.9, 0.95, 1.0],
+    'sublinear_tf': [False, True]
+}
+
+
+def suggest_vectorizer_params(trial, vectorizer_type: str = 'tfidf') -> Dict[str, Any]:
+    """
+    Sugerir parámetros del vectorizador en un trial.
+    
+    Los parámetros se registran en el trial con el prefijo `vec_` para no
+    chocar con los del modelo.
+    
+    Args:
+        trial: Trial de Optuna
+        vectorizer_type: 'tfidf' o 'count' (sublinear_tf solo aplica a TF-IDF)
+        
+    Returns:
+        Parámetros listos para TextVectorizer
+    """
+    params = {}
+    for name, choices in VECTORIZER_SEARCH_SPACE.items():
+        if name == 'sublinear_tf' and vectorizer_type != 'tfidf':
+            continue
+        params[name] = trial.suggest_categorical(f'vec_{name}', choices)
+    return _vectorizer_params_from_trial(params)
+
+
+def _vectorizer_params_from_trial(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Convertir parámetros de trial (p.ej. ngram_range '1-2') a TextVectorizer."""
+    params = {name[len('vec_'):] if name.startswith('vec_') else name: value
+              for name, value in params.items()}
+    if 'ngram_range' in params:
+        low, high = params['ngram_range'].split('-')
+        params['ngram_range'] = (int(low), int(high))
+    return params
+
+
+def optimize_with_vectorizer(
+    model_type: str,
+    texts_train: pd.Series,
+    texts_test: pd.Series,
+    y_train: pd.Series,
+    y_test: pd.Series,
+    n_trials: int = 100,
+    vectorizer_type: str = 'tfidf',
+    study_name: Optional[str] = None,
+    storage: Optional[str] = None,
+    persist: bool = False,
+    cv: Optional[int] = 5,
+    pruner: Optional[str] = 'median',
+    feature_cache: Optional[FeatureCache] = None
+) -> Tuple[Any, Any, Dict[str, Any], optuna.Study]:
+    """
+    Optimizar conjuntamente vectorizador y modelo con Optuna.
+    
+    Cada trial sugiere una configuración de vectorizador
+    (VECTORIZER_SEARCH_SPACE) y los hiperparámetros del modelo. Las
+    matrices se obtienen de una FeatureCache, así que cada configuración
+    única de vectorizador se ajusta una sola vez (y entre ejecuciones,
+    gracias a la caché en disco). Los textos deben llegar ya
+    preprocesados: el preprocesamiento se hace una única vez fuera.
+    
+    Con `cv`, el vectorizador se ajusta en cada fold solo con los textos
+    de entrenamiento del fold (vocabulario e IDF no ven el fold de
+    validación). Las huellas de los textos y de cada fold se calculan una
+    sola vez por estudio y se pasan a la caché.
+    
+    Args:
+        model_type: Tipo de modelo (ver `optimize_model`)
+        texts_train: Textos preprocesados de entrenamiento
+        texts_test: Textos preprocesados de prueba
+        y_train: Etiquetas de entrenamiento
+        y_test: Etiquetas de prueba
+        n_trials: Número total de trials del estudio (default: 100)
+        vectorizer_type: 'tfidf' o 'count'
+        study_name: Nombre del estudio de Optuna (default: incluye la huella
+                    de los datos, así que cada conjunto de datos tiene el suyo)
+        storage: URL del storage de Optuna (opcional)
+        persist: Si True y no hay storage, usa `default_storage_url()`
+                 (default: False, el estudio vive en memoria)
+        cv: Folds de validación cruzada por trial (default: 5, None = usar test)
+        pruner: 'median' (default), 'hyperband' o None para no podar
+        feature_cache: Caché de features (default: FeatureCache en
+                       data/feature_cache dimensionada para `cv` folds)
+        
+    Returns:
+        Tupla (mejor_modelo, mejor_vectorizador, mejores_parámetros, estudio)
+    """
+    model_type = model_type.lower()
+    objective_func = _get_objective_func(model_type)
+    
+    fingerprint = data_fingerprint(texts_train, texts_test, y_train, y_test)
+    if study_name is None:
+        study_name = f"{model_type}_{vectorizer_type}_joint_optimization_{fingerprint[:8]}"
+    
+    study, storage, remaining, _ = _open_study(
+        study_name, storage, persist, 1, n_trials, _make_pruner(pruner, cv), fingerprint,
+        {'model_type': model_type, 'vectorizer_type': vectorizer_type, 'joint_vectorizer': True}
+    )
+    
+    texts_hash = data_fingerprint(texts_train, texts_test)
+    use_cv = bool(cv and cv >= 2)
+    # Con CV cada configuración ocupa una entrada por fold
+    feature_cache = feature_cache or FeatureCache(folds=cv if use_cv else 1)
+    if use_cv:
+        # Mismos folds que `_evaluate_cv`; sus huellas se calculan una vez
+        fold_hashes = [
+            data_fingerprint(texts_train.iloc[train_idx], texts_train.iloc[val_idx])
+            for train_idx, val_idx in cv_fold_indices(np.asarray(y_train), cv)
+        ]
+    
+    def objective(trial):
+        vectorizer_params = suggest_vectorizer_params(trial, vectorizer_type)
+        if not use_cv:
+            X_train, X_test, _ = feature_cache.get_or_compute(
+                texts_train, texts_test, vectorizer_type, data_hash=texts_hash, **vectorizer_params
+            )
+            trial.set_user_attr('n_features', int(X_train.shape[1]))
+            return objective_func(trial, X_train, X_test, y_train, y_test, vectorizer_type, cv=cv)
+        
+        def fold_features(fold, train_idx, val_idx):
+            # Vectorizador ajustado solo con la parte de entrenamiento del fold
+            X_fit, X_val, _ = feature_cache.get_or_compute(
+                texts_train.iloc[train_idx], texts_train.iloc[val_idx], vectorizer_type,
+                data_hash=fold_hashes[fold], **vectorizer_params
+            )
+            if fold == 0:
+                trial.set_user_attr('n_features', int(X_fit.shape[1]))
+            return X_fit, X_val
+        
+        return objective_func(trial, None, None, y_train, y_test, vectorizer_type,
+                              cv=cv, fold_features=fold_features)
+    
+    if remaining > 0:
+        print(f"🔍 Optimizando {vectorizer_type.upper()} + {model_type.upper()} con {remaining} trials...")
+        study.optimize(objective, n_trials=remaining, show_progress_bar=True)
+        stats = feature_cache.stats
+        print(f"   Caché de features: {stats['memory_hits']} aciertos en memoria, "
+              f"{stats['disk_hits']} en disco, {stats['misses']} vectorizaciones")
+    
+    # Separar parámetros del vectorizador y del modelo
+    best_params = study.best_params
+    vectorizer_params = _vectorizer_params_from_trial(
+        {k: v for k, v in best_params.items() if k.startswith('vec_')}
+    )
+    model_params = {k: v for k, v in best_params.items() if not k.startswith('vec_')}
+    print(f"\n✅ Mejores parámetros encontrados:")
+    for param, value in best_params.items():
+        print(f"   {param}: {value}")
+    
+    # Entrenar mejor modelo con las features de la mejor configuración
+    X_train, X_test, best_vectorizer = feature_cache.get_or_compute(
+        texts_train, texts_test, vectorizer_type, data_hash=texts_hash, **vectorizer_params
+    )
+    best_model = train_model(model_type, X_train, y_train, **model_params)
+    evaluate_model(best_model, X_train, X_test, y_train, y_test, verbose=True)
+    
+    return best_model, best_vectorizer, {'vectorizer': vectorizer_params, 'model': model_params}, study
+
+
+def get_study_history(
+    study_name: str,
+    storage: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Obtener el historial de trials de un estudio guardado.
+    
+    Args:
+        study_name: Nombre del estudio
+        storage: URL del storage (default: `default_storage_url()`)
+        
+    Returns:
+        DataFrame con un trial por fila (parámetros, valor, estado, duración)
+    """
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=_make_storage(storage or default_storage_url())
+    )
+    return study.trials_dataframe()
+
+
+def list_studies(storage: Optional[str] = None) -> pd.DataFrame:
+    """
+    Listar los estudios guardados en un storage.
+    
+    Args:
+        storage: URL del storage (default: `default_storage_url()`)
+        
+    Returns:
+        DataFrame con nombre, número de trials y mejor valor de cada estudio
+    """
+    summaries = optuna.get_all_study_summaries(storage=_make_storage(storage or default_storage_url()))
+    return pd.DataFrame([
+        {
+            'Estudio': summary.study_name,
+            'Trials': summary.n_trials,
+            'Mejor valor': summary.best_trial.value if summary.best_trial else None,
+            'Inicio': summary.datetime_start
+        }
+        for summary in summaries
+    ])
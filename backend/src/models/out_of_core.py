@@ -0,0 +1,366 @@
+"""
+Módulo de entrenamiento out-of-core sobre CSVs leídos por bloques.
+
+Permite entrenar con datasets que no caben en memoria: cada bloque del
+CSV se preprocesa, se vectoriza con Hashing (sin vocabulario que ajustar)
+y se pasa a un modelo incremental (`partial_fit`). Una fracción
+estratificada de cada bloque se reserva en disco como conjunto de
+evaluación, de modo que la memoria queda acotada por el tamaño del bloque.
+El held-out (u otro CSV etiquetado de cualquier tamaño) se evalúa también
+por bloques con `evaluate_stream`.
+"""
+
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.linear_model import SGDClassifier
+
+# Imports relativos o absolutos
+try:
+    from ..features.vectorization import TextVectorizer
+    from .online import to_binary_labels
+    from .evaluate import binary_confusion_matrix, metrics_from_confusion_matrix
+except ImportError:
+    import sys
+    src_path = Path(__file__).parent.parent
+    if str(src_path) not in sys.path:
+        sys.path.insert(0, str(src_path))
+    from features.vectorization import TextVectorizer
+    from models.online import to_binary_labels
+    from models.evaluate import binary_confusion_matrix, metrics_from_confusion_matrix
+
+
+def create_incremental_model(model_type: str, **kwargs) -> Any:
+    """
+    Crear un modelo que soporta `partial_fit`.
+
+    Args:
+        model_type: 'naive_bayes', 'sgd' (SVM lineal, pérdida hinge) o
+                    'logistic' (regresión logística por SGD)
+        **kwargs: Parámetros específicos del modelo
+
+    Returns:
+        Modelo sin entrenar
+    """
+    model_type = model_type.lower()
+
+    if model_type == 'naive_bayes':
+        return MultinomialNB(**{'alpha': 1.0, **kwargs})
+    elif model_type == 'sgd':
+        return SGDClassifier(**{'loss': 'hinge', 'alpha': 1e-5, 'random_state': 42, **kwargs})
+    elif model_type == 'logistic':
+        return SGDClassifier(**{'loss': 'log_loss', 'alpha': 1e-5, 'random_state': 42, **kwargs})
+    else:
+        raise ValueError(f"Tipo de modelo incremental '{model_type}' no soportado. "
+                         f"Usa: 'naive_bayes', 'sgd', 'logistic'")
+
+
+def iter_csv_chunks(
+    csv_path: Path,
+    text_column: str = 'Text',
+    label_column: str = 'IsToxic',
+    chunksize: int = 10000,
+    preprocessor: Any = None,
+    keep_default_na: bool = True
+) -> Iterator[Tuple[pd.Series, np.ndarray]]:
+    """
+    Leer un CSV etiquetado por bloques.
+
+    Args:
+        csv_path: Ruta del CSV
+        text_column: Columna con el texto
+        label_column: Columna con la etiqueta
+        chunksize: Filas por bloque
+        preprocessor: TextPreprocessor opcional para los textos crudos
+        keep_default_na: Si False, los textos vacíos (o 'NA', 'null'...)
+                         se leen como texto y no se descartan
+
+    Yields:
+        Tuplas (textos, etiquetas 0/1) de cada bloque
+    """
+    reader = pd.read_csv(csv_path, chunksize=chunksize, usecols=[text_column, label_column],
+                         keep_default_na=keep_default_na)
+    for chunk in reader:
+        chunk = chunk.dropna(subset=[text_column, label_column])
+        if chunk.empty:
+            continue
+
+        texts = chunk[text_column].astype(str).reset_index(drop=True)
+        if preprocessor is not None:
+            texts = texts.apply(lambda t: preprocessor.preprocess_text(t, remove_stopwords=True))
+
+        yield texts, to_binary_labels(chunk[label_column])
+
+
+def stratified_holdout_mask(
+    labels: np.ndarray,
+    test_size: float,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Marcar una fracción estratificada de un bloque como held-out.
+
+    Args:
+        labels: Etiquetas del bloque
+        test_size: Fracción a reservar por clase
+        rng: Generador aleatorio
+
+    Returns:
+        Máscara booleana (True = evaluación)
+    """
+    mask = np.zeros(len(labels), dtype=bool)
+    for label in np.unique(labels):
+        idx = np.flatnonzero(labels == label)
+        n_holdout = int(round(len(idx) * test_size))
+        mask[rng.choice(idx, size=n_holdout, replace=False)] = True
+    return mask
+
+
+def train_out_of_core(
+    csv_path: Path,
+    model_type: str = 'sgd',
+    text_column: str = 'Text',
+    label_column: str = 'IsToxic',
+    chunksize: int = 10000,
+    test_size: float = 0.2,
+    n_epochs: int = 1,
+    preprocess: bool = False,
+    vectorizer_params: Optional[Dict[str, Any]] = None,
+    holdout_path: Optional[Path] = None,
+    random_state: int = 42,
+    **model_params
+) -> Tuple[Any, TextVectorizer, Dict[str, Any]]:
+    """
+    Entrenar un modelo incremental leyendo el CSV por bloques.
+
+    El split train/held-out se decide por bloque con una semilla derivada
+    del índice del bloque, así que es idéntico en todas las épocas. Las
+    filas held-out se escriben a disco en la primera época y se evalúan
+    al final también por bloques.
+
+    Args:
+        csv_path: Ruta del CSV etiquetado
+        model_type: 'naive_bayes', 'sgd' o 'logistic'
+        text_column: Columna con el texto
+        label_column: Columna con la etiqueta
+        chunksize: Filas por bloque (acota la memoria)
+        test_size: Fracción estratificada reservada para evaluación
+        n_epochs: Número de pasadas sobre los datos de entrenamiento
+        preprocess: Si True, aplica TextPreprocessor a cada bloque
+        vectorizer_params: Parámetros del vectorizador Hashing
+        holdout_path: CSV donde guardar el held-out (default: temporal,
+                      borrado al terminar)
+        random_state: Semilla
+        **model_params: Parámetros del modelo incremental
+
+    Returns:
+        Tupla (modelo, vectorizador, métricas en held-out)
+    """
+    model = create_incremental_model(model_type, **model_params)
+    vectorizer = TextVectorizer(method='hashing', **(vectorizer_params or {}))
+    classes = np.array([0, 1])
+
+    preprocessor = None
+    if preprocess:
+        try:
+            from ..data.preprocessing import TextPreprocessor
+        except ImportError:
+            from data.preprocessing import TextPreprocessor
+        preprocessor = TextPreprocessor(use_spacy=True)
+
+    # Sin holdout_path, el held-out vive en un directorio temporal que se
+    # borra tras la evaluación
+    tmp_dir = tempfile.TemporaryDirectory(prefix='out_of_core_') if holdout_path is None else None
+    holdout_path = Path(tmp_dir.name) / 'holdout.csv' if tmp_dir is not None else Path(holdout_path)
+    holdout_path.parent.mkdir(parents=True, exist_ok=True)
+    if holdout_path.exists():
+        holdout_path.unlink()
+
+    try:
+        print(f"🔧 Entrenamiento out-of-core: {model_type.upper()}, bloques de {chunksize} filas")
+
+        n_train = 0
+        n_holdout = 0
+        for epoch in range(n_epochs):
+            chunks = iter_csv_chunks(csv_path, text_column, label_column, chunksize, preprocessor)
+            for chunk_idx, (texts, labels) in enumerate(chunks):
+                rng = np.random.default_rng([random_state, chunk_idx])
+                holdout_mask = stratified_holdout_mask(labels, test_size, rng)
+
+                if epoch == 0 and holdout_mask.any():
+                    pd.DataFrame({
+                        'text': texts[holdout_mask].values,
+                        'label': labels[holdout_mask]
+                    }).to_csv(holdout_path, mode='a', header=not holdout_path.exists(), index=False,
+                              na_rep='')
+                    n_holdout += int(holdout_mask.sum())
+
+                train_mask = ~holdout_mask
+                if not train_mask.any():
+                    continue
+
+                X_chunk = vectorizer.transform(texts[train_mask], sparse=True)
+                model.partial_fit(X_chunk, labels[train_mask], classes=classes)
+                if epoch == 0:
+                    n_train += int(train_mask.sum())
+
+            print(f"   Época {epoch + 1}/{n_epochs} completada")
+
+        if n_train == 0:
+            raise ValueError(f"No hay datos de entrenamiento en {csv_path}")
+
+        # Evaluación en streaming sobre el held-out. Los textos que quedan
+        # vacíos tras preprocesar se leen como '' (no NaN), para evaluar
+        # todas las filas contadas en n_holdout
+        cm = np.zeros((2, 2), dtype=np.int64)
+        if n_holdout > 0:
+            cm = evaluate_stream(model, vectorizer, holdout_path, 'text', 'label',
+                                 chunksize, verbose=False, sparse=True,
+                                 keep_default_na=False)['confusion_matrix']
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    metrics = metrics_from_confusion_matrix(cm)
+    results = {
+        'test_accuracy': metrics['accuracy'],
+        'test_precision': metrics['precision'],
+        'test_recall': metrics['recall'],
+        'test_f1': metrics['f1'],
+        'confusion_matrix': cm,
+        'n_train': n_train,
+        'n_holdout': n_holdout,
+        'holdout_path': str(holdout_path) if tmp_dir is None else None
+    }
+
+    print(f"✅ Entrenamiento completado: {n_train} ejemplos de train, {n_holdout} held-out")
+    print(f"   F1 (held-out): {results['test_f1']:.4f}")
+
+    return model, vectorizer, results
+
+
+def _evaluate_chunk(
+    model: Any,
+    vectorizer: TextVectorizer,
+    texts: pd.Series,
+    labels: np.ndarray,
+    n_bins: int,
+    sparse: bool = False
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Conteos de un bloque: matriz de confusión e histograma de probabilidades.
+
+    Args:
+        model: Modelo entrenado
+        vectorizer: Vectorizador ajustado
+        texts: Textos del bloque (ya preprocesados)
+        labels: Etiquetas 0/1 del bloque
+        n_bins: Intervalos del histograma en [0, 1]
+        sparse: Si True, el modelo recibe la matriz sparse sin densificar
+
+    Returns:
+        Tupla (matriz 2x2, histograma (2, n_bins) por clase real o None
+        si el modelo no tiene `predict_proba`)
+    """
+    X_chunk = vectorizer.transform(texts, sparse=sparse)
+    # predict (no argmax de las probabilidades) para coincidir con evaluate_model
+    cm = binary_confusion_matrix(labels, model.predict(X_chunk).astype(int))
+
+    histogram = None
+    if hasattr(model, 'predict_proba'):
+        bins = np.minimum((model.predict_proba(X_chunk)[:, 1] * n_bins).astype(int), n_bins - 1)
+        histogram = np.bincount(n_bins * labels + bins, minlength=2 * n_bins).reshape(2, n_bins)
+    return cm, histogram
+
+
+def evaluate_stream(
+    model: Any,
+    vectorizer: TextVectorizer,
+    csv_path: Path,
+    text_column: str = 'text',
+    label_column: str = 'label',
+    chunksize: int = 10000,
+    preprocessor: Any = None,
+    n_bins: int = 20,
+    n_jobs: int = 1,
+    verbose: bool = True,
+    sparse: bool = False,
+    keep_default_na: bool = True
+) -> Dict[str, Any]:
+    """
+    Evaluar un modelo sobre un CSV etiquetado leído por bloques.
+
+    Cada bloque se vectoriza, se predice y se reduce a su matriz de
+    confusión y a un histograma de probabilidades por clase; solo se
+    acumulan esos conteos, así que la memoria depende del tamaño del
+    bloque y no del CSV. Las métricas salen de la matriz total y
+    coinciden con las de `evaluate_model` sobre los mismos datos en
+    memoria. Con `n_jobs > 1` los bloques se evalúan en paralelo (joblib
+    mantiene como mucho 2 * n_jobs bloques en vuelo).
+
+    Args:
+        model: Modelo entrenado
+        vectorizer: Vectorizador ajustado
+        csv_path: CSV etiquetado (p.ej. el held-out de `train_out_of_core`)
+        text_column: Columna con el texto
+        label_column: Columna con la etiqueta
+        chunksize: Filas por bloque
+        preprocessor: TextPreprocessor opcional para textos crudos
+        n_bins: Intervalos del histograma de probabilidades
+        n_jobs: Workers en paralelo (1 = secuencial)
+        verbose: Si True, imprime el resumen
+        sparse: Si True, no densifica cada bloque. Por defecto se densifica,
+                igual que al servir: un SVC entrenado en denso rechaza
+                matrices sparse. Los modelos de `train_out_of_core` se
+                entrenan en sparse y se evalúan con True
+        keep_default_na: Si False, los textos vacíos se evalúan en lugar
+                         de descartarse (ver `iter_csv_chunks`)
+
+    Returns:
+        Diccionario con test_accuracy, test_precision, test_recall,
+        test_f1, confusion_matrix, n_examples y probability_histogram
+        ({'bin_edges', 'not_toxic', 'toxic'} o None)
+    """
+    chunks = iter_csv_chunks(csv_path, text_column, label_column, chunksize, preprocessor,
+                             keep_default_na)
+    if n_jobs == 1:
+        partials = (_evaluate_chunk(model, vectorizer, texts, labels, n_bins, sparse)
+                    for texts, labels in chunks)
+    else:
+        partials = Parallel(n_jobs=n_jobs, return_as='generator_unordered')(
+            delayed(_evaluate_chunk)(model, vectorizer, texts, labels, n_bins, sparse)
+            for texts, labels in chunks
+        )
+
+    cm = np.zeros((2, 2), dtype=np.int64)
+    histogram = None
+    for chunk_cm, chunk_histogram in partials:
+        cm += chunk_cm
+        if chunk_histogram is not None:
+            histogram = chunk_histogram if histogram is None else histogram + chunk_histogram
+
+    metrics = metrics_from_confusion_matrix(cm)
+    results = {
+        'test_accuracy': metrics['accuracy'],
+        'test_precision': metrics['precision'],
+        'test_recall': metrics['recall'],
+        'test_f1': metrics['f1'],
+        'confusion_matrix': cm,
+        'n_examples': int(cm.sum()),
+        'probability_histogram': None if histogram is None else {
+            'bin_edges': np.linspace(0.0, 1.0, n_bins + 1),
+            'not_toxic': histogram[0],
+            'toxic': histogram[1]
+        }
+    }
+
+    if verbose:
+        print(f"✅ Evaluación en streaming: {results['n_examples']} ejemplos")
+        print(f"   F1: {results['test_f1']:.4f}  Accuracy: {results['test_accuracy']:.4f}")
+
+    return results
+
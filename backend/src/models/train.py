@@ -6,14 +6,30 @@ de clasificación de texto.
 """
 
 import pickle
+import time
+import tracemalloc
+import warnings
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple, Union
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
 from sklearn.naive_bayes import MultinomialNB
-from sklearn.linear_model import LogisticRegression
-from sklearn.svm import SVC
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.svm import SVC, LinearSVC
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.base import clone
+
+# Imports relativos o absolutos según el contexto
+try:
+    from ..utils.memmap import dump_shared_arrays, load_shared_array, cleanup_shared_arrays
+except ImportError:
+    import sys
+    src_path = Path(__file__).parent.parent
+    if str(src_path) not in sys.path:
+        sys.path.insert(0, str(src_path))
+    from utils.memmap import dump_shared_arrays, load_shared_array, cleanup_shared_arrays
 
 
 def train_naive_bayes(
@@ -105,6 +121,73 @@ def train_svm(
     return model
 
 
+def train_linear_svm(
+    X_train: np.ndarray,
+    y_train: pd.Series,
+    C: float = 1.0,
+    solver: str = 'liblinear',
+    calibration: str = 'sigmoid',
+    calibration_cv: int = 3,
+    class_weight: Optional[str] = 'balanced',
+    max_iter: int = 1000
+) -> CalibratedClassifierCV:
+    """
+    Entrenar SVM lineal rápido con un único paso de calibración.
+    
+    Alternativa a `train_svm` para datasets grandes: en lugar de libsvm
+    (`SVC(probability=True)`, coste O(n²) y 5 folds internos de Platt),
+    usa LinearSVC (liblinear) o SGD con pérdida hinge, ambos lineales en
+    el número de muestras y compatibles con matrices sparse. Las
+    probabilidades se obtienen con un único calibrador ajustado sobre
+    predicciones out-of-fold (`ensemble=False`), por lo que el modelo
+    final es un solo SVM lineal + una función de calibración.
+    
+    Args:
+        X_train: Matriz de características de entrenamiento (densa o sparse)
+        y_train: Etiquetas de entrenamiento
+        C: Parámetro de regularización (default: 1.0)
+        solver: 'liblinear' (LinearSVC) o 'sgd' (SGDClassifier hinge)
+        calibration: Método de calibración ('sigmoid' o 'isotonic')
+        calibration_cv: Folds para las predicciones del calibrador (default: 3)
+        class_weight: Peso de clases ('balanced' o None, default: 'balanced')
+        max_iter: Máximo número de iteraciones (default: 1000)
+        
+    Returns:
+        Modelo calibrado con `predict_proba`
+    """
+    if calibration not in ('sigmoid', 'isotonic'):
+        raise ValueError(f"Calibración '{calibration}' no soportada. Usa 'sigmoid' o 'isotonic'")
+    
+    if solver == 'liblinear':
+        base_model = LinearSVC(
+            C=C,
+            class_weight=class_weight,
+            max_iter=max_iter,
+            random_state=42
+        )
+    elif solver == 'sgd':
+        # alpha equivale a 1 / (C * n_muestras) en la formulación de SVM
+        base_model = SGDClassifier(
+            loss='hinge',
+            alpha=1.0 / (C * X_train.shape[0]),
+            class_weight=class_weight,
+            max_iter=max_iter,
+            tol=1e-4,
+            random_state=42
+        )
+    else:
+        raise ValueError(f"Solver '{solver}' no soportado. Usa 'liblinear' o 'sgd'")
+    
+    model = CalibratedClassifierCV(
+        estimator=base_model,
+        method=calibration,
+        cv=calibration_cv,
+        ensemble=False  # Un solo SVM final + un solo calibrador
+    )
+    model.fit(X_train, y_train)
+    return model
+
+
 def train_random_forest(
     X_train: np.ndarray,
     y_train: pd.Series,
@@ -152,7 +235,8 @@ def train_model(
     Función genérica para entrenar modelos.
     
     Args:
-        model_type: Tipo de modelo ('naive_bayes', 'logistic', 'svm', 'random_forest')
+        model_type: Tipo de modelo ('naive_bayes', 'logistic', 'svm',
+                    'linear_svm', 'random_forest')
         X_train: Matriz de características de entrenamiento
         y_train: Etiquetas de entrenamiento
         **kwargs: Parámetros específicos del modelo
@@ -168,11 +252,208 @@ def train_model(
         return train_logistic_regression(X_train, y_train, **kwargs)
     elif model_type == 'svm':
         return train_svm(X_train, y_train, **kwargs)
+    elif model_type == 'linear_svm':
+        return train_linear_svm(X_train, y_train, **kwargs)
     elif model_type == 'random_forest':
         return train_random_forest(X_train, y_train, **kwargs)
     else:
         raise ValueError(f"Tipo de modelo '{model_type}' no soportado. "
-                        f"Usa: 'naive_bayes', 'logistic', 'svm', 'random_forest'")
+                        f"Usa: 'naive_bayes', 'logistic', 'svm', 'linear_svm', 'random_forest'")
+
+
+def _fit_config(
+    config: Dict[str, Any],
+    X_train: Any,
+    y_train: Any
+) -> Dict[str, Any]:
+    """
+    Entrenar una configuración midiendo tiempo y memoria pico.
+    
+    Args:
+        config: {'name': ..., 'type': ..., 'params': {...}}
+        X_train: Matriz de características (o ruta a su copia memory-mapped)
+        y_train: Etiquetas (o ruta a su copia memory-mapped)
+        
+    Returns:
+        Diccionario con modelo, tiempo de ajuste y memoria pico
+    """
+    if isinstance(X_train, Path):
+        X_train = load_shared_array(X_train)
+    if isinstance(y_train, Path):
+        y_train = load_shared_array(y_train)
+    
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        model = train_model(config['type'], X_train, y_train, **config.get('params', {}))
+        fit_time = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        'model': model,
+        'fit_time': fit_time,
+        'peak_memory_mb': peak / (1024 ** 2)
+    }
+
+
+def train_many(
+    configs: List[Dict[str, Any]],
+    X_train: np.ndarray,
+    y_train: pd.Series,
+    n_jobs: int = -1,
+    verbose: bool = True
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Entrenar varias configuraciones de modelos en paralelo.
+    
+    La matriz de características se guarda una sola vez en disco y cada
+    worker la lee con memory-mapping, en lugar de recibir una copia
+    serializada. El tiempo total es el del modelo más lento, no la suma.
+    
+    Args:
+        configs: Lista de configuraciones
+                 [{'name': 'svm', 'type': 'svm', 'params': {...}}, ...]
+        X_train: Matriz de características de entrenamiento
+        y_train: Etiquetas de entrenamiento
+        n_jobs: Número de procesos (-1 = todos los núcleos, 1 = secuencial)
+        verbose: Si True, imprime resumen
+        
+    Returns:
+        Diccionario {nombre: {'model', 'fit_time', 'peak_memory_mb'}}
+        (memoria pico medida con tracemalloc dentro del worker)
+    """
+    names = [config.get('name', config['type']) for config in configs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Nombres de configuración duplicados: {names}")
+    
+    y_array = np.asarray(y_train)
+    
+    if n_jobs == 1 or len(configs) == 1:
+        outputs = [_fit_config(config, X_train, y_array) for config in configs]
+    else:
+        shared_paths = dump_shared_arrays({'X_train': X_train, 'y_train': y_array})
+        try:
+            outputs = Parallel(n_jobs=n_jobs)(
+                delayed(_fit_config)(config, shared_paths['X_train'], shared_paths['y_train'])
+                for config in configs
+            )
+        finally:
+            cleanup_shared_arrays(shared_paths)
+    
+    results = dict(zip(names, outputs))
+    
+    if verbose:
+        print(f"✅ {len(results)} modelos entrenados")
+        for name, result in results.items():
+            print(f"   {name}: {result['fit_time']:.2f}s, "
+                  f"memoria pico {result['peak_memory_mb']:.1f} MB")
+    
+    return results
+
+
+def _n_iter(model: Any) -> int:
+    """Número de iteraciones del último ajuste (máximo entre clases)."""
+    return int(np.max(model.n_iter_))
+
+
+def _fit_linear(model: Any, X_train: Any, y_train: Any, init_from: Any = None) -> Any:
+    """
+    Ajustar un modelo lineal, opcionalmente partiendo de otros coeficientes.
+    
+    Args:
+        model: LogisticRegression o SGDClassifier sin ajustar
+        X_train: Matriz de características
+        y_train: Etiquetas
+        init_from: Modelo ajustado cuyos coeficientes sirven de punto de partida
+        
+    Returns:
+        Modelo ajustado
+    """
+    if init_from is None:
+        model.fit(X_train, y_train)
+    elif isinstance(model, SGDClassifier):
+        model.fit(X_train, y_train, coef_init=init_from.coef_, intercept_init=init_from.intercept_)
+    else:
+        # LogisticRegression con warm_start=True parte de coef_/intercept_
+        model.set_params(warm_start=True)
+        model.coef_ = init_from.coef_.copy()
+        model.intercept_ = init_from.intercept_.copy()
+        model.fit(X_train, y_train)
+        # Que un `fit` posterior del modelo servido empiece desde cero
+        model.set_params(warm_start=False)
+    return model
+
+
+def warm_start_retrain(
+    base_model: Union[Any, Path],
+    X_train: np.ndarray,
+    y_train: pd.Series,
+    compare_cold: bool = True,
+    verbose: bool = True
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Reentrenar un modelo lineal partiendo de los coeficientes actuales.
+    
+    Útil para el reentrenamiento periódico sobre un corpus que crece poco:
+    con el mismo espacio de features, el optimizador arranca cerca del
+    óptimo y converge en pocas iteraciones. Una LogisticRegression con
+    liblinear se reentrena con 'saga' (emite un UserWarning), y el modelo
+    devuelto queda con `warm_start=False`.
+    
+    Args:
+        base_model: Modelo servido (LogisticRegression o SGDClassifier)
+                    o ruta a su .pkl
+        X_train: Matriz de características actualizada
+        y_train: Etiquetas actualizadas
+        compare_cold: Si True, entrena también desde cero para comparar
+        verbose: Si True, imprime el informe
+        
+    Returns:
+        Tupla (modelo_reentrenado, informe con iteraciones y tiempos)
+    """
+    if isinstance(base_model, (str, Path)):
+        base_model = load_model(Path(base_model))
+    
+    if not isinstance(base_model, (LogisticRegression, SGDClassifier)):
+        raise ValueError(f"Warm start no soportado para {type(base_model).__name__}. "
+                        f"Usa LogisticRegression o SGDClassifier")
+    
+    if base_model.n_features_in_ != X_train.shape[1]:
+        raise ValueError(f"El espacio de features cambió ({base_model.n_features_in_} -> "
+                        f"{X_train.shape[1]}); usa un reentrenamiento completo")
+    
+    template = clone(base_model)
+    if isinstance(template, LogisticRegression) and template.solver == 'liblinear':
+        # liblinear no admite warm start; saga soporta l1 y l2
+        template.set_params(solver='saga')
+        warnings.warn("liblinear no soporta warm start: el modelo reentrenado usa el "
+                      "solver 'saga' (optimiza lo mismo, pero converge de forma distinta)",
+                      UserWarning)
+    
+    start = time.perf_counter()
+    warm_model = _fit_linear(clone(template), X_train, y_train, init_from=base_model)
+    report = {
+        'warm_n_iter': _n_iter(warm_model),
+        'warm_fit_time': time.perf_counter() - start
+    }
+    
+    if compare_cold:
+        start = time.perf_counter()
+        cold_model = _fit_linear(clone(template), X_train, y_train)
+        report['cold_n_iter'] = _n_iter(cold_model)
+        report['cold_fit_time'] = time.perf_counter() - start
+        report['speedup'] = report['cold_fit_time'] / max(report['warm_fit_time'], 1e-9)
+    
+    if verbose:
+        print("✅ Reentrenamiento con warm start completado")
+        print(f"   Warm start: {report['warm_n_iter']} iteraciones, {report['warm_fit_time']:.3f}s")
+        if compare_cold:
+            print(f"   Desde cero: {report['cold_n_iter']} iteraciones, {report['cold_fit_time']:.3f}s")
+            print(f"   Aceleración: {report['speedup']:.1f}x")
+    
+    return warm_model, report
 
 
 def save_model(model: Any, filepath: Path, model_info: Optional[Dict] = None):
@@ -0,0 +1,151 @@
+"""
+Módulo para guardar los modelos entrenados de los mejores trials de Optuna.
+
+Cuando un trial entrena sobre todo el conjunto de entrenamiento, su
+modelo ya es el modelo final: guardarlo evita volver a entrenar el
+mejor trial al terminar el estudio (el ajuste más caro en SVC con
+calibración de probabilidades). El almacén está acotado a los `top_k`
+mejores trials y es seguro con varios procesos escribiendo a la vez.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+import joblib
+
+
+class TrialModelStore:
+    """
+    Almacén en disco de los modelos de los `top_k` mejores trials.
+
+    Cada trial guardado tiene dos archivos: `trial_XXXXX.joblib` (modelo)
+    y `trial_XXXXX.json` (score). El ranking se reconstruye desde los
+    JSON, así que no hay un índice compartido que proteger entre workers.
+
+    Con `fingerprint`, cada entrada guarda la huella de los datos con los
+    que se entrenó y solo se listan o cargan las que coinciden: un modelo
+    de otro conjunto de datos nunca se devuelve como si fuera de este.
+    """
+
+    def __init__(
+        self,
+        store_dir: Optional[Path] = None,
+        top_k: int = 3,
+        fingerprint: Optional[str] = None
+    ):
+        """
+        Inicializar almacén.
+
+        Args:
+            store_dir: Directorio del almacén (default: directorio temporal)
+            top_k: Número máximo de modelos guardados
+            fingerprint: Huella de los datos de entrenamiento (opcional)
+        """
+        if top_k < 1:
+            raise ValueError(f"top_k debe ser >= 1, recibido {top_k}")
+        self.store_dir = Path(store_dir) if store_dir is not None else Path(tempfile.mkdtemp(prefix='trial_models_'))
+        self.top_k = top_k
+        self.fingerprint = fingerprint
+
+    def _read_entry(self, trial_number: int) -> Optional[dict]:
+        """Leer el JSON de un trial si es de estos datos (None si no)."""
+        try:
+            with open(self._score_path(trial_number), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None  # Inexistente, borrado o a medio escribir por otro worker
+        if self.fingerprint is not None and entry.get('fingerprint') != self.fingerprint:
+            return None
+        return entry
+
+    def _model_path(self, trial_number: int) -> Path:
+        return self.store_dir / f'trial_{trial_number:05d}.joblib'
+
+    def _score_path(self, trial_number: int) -> Path:
+        return self.store_dir / f'trial_{trial_number:05d}.json'
+
+    def ranking(self) -> List[Tuple[int, float]]:
+        """
+        Trials guardados ordenados de mejor a peor.
+
+        Returns:
+            Lista de tuplas (número de trial, score)
+        """
+        if not self.store_dir.exists():
+            return []
+
+        entries = []
+        for path in self.store_dir.glob('trial_*.json'):
+            entry = self._read_entry(int(path.stem.split('_')[1]))
+            if entry is not None and self._model_path(entry['trial']).exists():
+                entries.append((entry['trial'], entry['score']))
+        return sorted(entries, key=lambda e: (-e[1], e[0]))
+
+    def offer(self, trial_number: int, score: float, model: Any, fit_time: float = 0.0) -> bool:
+        """
+        Guardar el modelo de un trial si entra en el top-k.
+
+        Args:
+            trial_number: Número del trial
+            score: Score del trial (mayor es mejor)
+            model: Modelo entrenado con todo el conjunto de entrenamiento
+            fit_time: Tiempo de entrenamiento en segundos
+
+        Returns:
+            True si el modelo se guardó
+        """
+        ranking = self.ranking()
+        if len(ranking) >= self.top_k and score <= ranking[self.top_k - 1][1]:
+            return False
+
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        # Modelo primero y score después: un JSON sin modelo nunca se lista
+        self._atomic_write(self._model_path(trial_number), lambda path: joblib.dump(model, path))
+        entry = {
+            'trial': trial_number,
+            'score': float(score),
+            'fit_time': float(fit_time),
+            'fingerprint': self.fingerprint
+        }
+        self._atomic_write(
+            self._score_path(trial_number),
+            lambda path: Path(path).write_text(json.dumps(entry), encoding='utf-8')
+        )
+
+        # Descartar lo que haya quedado fuera del top-k
+        for evicted, _ in self.ranking()[self.top_k:]:
+            self._score_path(evicted).unlink(missing_ok=True)
+            self._model_path(evicted).unlink(missing_ok=True)
+        return True
+
+    def _atomic_write(self, path: Path, write):
+        """Escribir en un temporal y renombrar, para no dejar archivos a medias."""
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmp_', dir=self.store_dir)
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def has(self, trial_number: int) -> bool:
+        """Indicar si el modelo de un trial está guardado (y es de estos datos)."""
+        return self._read_entry(trial_number) is not None and self._model_path(trial_number).exists()
+
+    def load(self, trial_number: int) -> Any:
+        """
+        Cargar el modelo de un trial.
+
+        Args:
+            trial_number: Número del trial
+
+        Returns:
+            Modelo entrenado
+        """
+        path = self._model_path(trial_number)
+        if not self.has(trial_number):
+            raise FileNotFoundError(f"No hay modelo guardado para el trial {trial_number} en {self.store_dir}")
+        return joblib.load(path)
@@ -29,6 +29,20 @@ class Prediction(Base):
     video_id = Column(String(50), nullable=True, index=True)  # Si viene de YouTube
 
 
+class Feedback(Base):
+    """Modelo de tabla para etiquetas corregidas (feedback) de comentarios."""
+    __tablename__ = 'feedback'
+    
+    id = Column(Integer, primary_key=True, index=True)
+    text = Column(Text, nullable=False)
+    is_toxic = Column(Boolean, nullable=False)  # Etiqueta verdadera
+    prediction_id = Column(Integer, nullable=True, index=True)  # Predicción corregida (opcional)
+    source = Column(String(100), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    consumed_at = Column(DateTime, nullable=True, index=True)  # None = pendiente de entrenar
+    model_version = Column(String(50), nullable=True)  # Versión online que lo consumió
+
+
 class DatabaseManager:
     """Gestor de base de datos para predicciones."""
     
@@ -166,6 +180,106 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def save_feedback(
+        self,
+        text: str,
+        is_toxic: bool,
+        prediction_id: Optional[int] = None,
+        source: Optional[str] = None
+    ) -> int:
+        """
+        Guardar una etiqueta de feedback para entrenamiento online.
+        
+        Args:
+            text: Texto etiquetado
+            is_toxic: Etiqueta verdadera
+            prediction_id: ID de la predicción que corrige (opcional)
+            source: Origen del feedback ('api', 'moderator', etc.)
+            
+        Returns:
+            ID del feedback guardado
+        """
+        session = self.get_session()
+        try:
+            feedback = Feedback(
+                text=text,
+                is_toxic=is_toxic,
+                prediction_id=prediction_id,
+                source=source,
+                created_at=datetime.utcnow()
+            )
+            session.add(feedback)
+            session.commit()
+            session.refresh(feedback)
+            return feedback.id
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def get_pending_feedback(self, limit: int = 1000, after_id: int = 0) -> List[Dict]:
+        """
+        Obtener feedback aún no consumido por el modelo online.
+        
+        Args:
+            limit: Número máximo de resultados
+            after_id: Solo feedback con ID mayor (para paginar sin marcar)
+            
+        Returns:
+            Lista de feedback como diccionarios (más antiguos primero)
+        """
+        session = self.get_session()
+        try:
+            feedback = session.query(Feedback).filter(
+                Feedback.consumed_at.is_(None),
+                Feedback.id > after_id
+            ).order_by(Feedback.id.asc()).limit(limit).all()
+            
+            return [
+                {
+                    'id': f.id,
+                    'text': f.text,
+                    'is_toxic': f.is_toxic,
+                    'prediction_id': f.prediction_id,
+                    'source': f.source,
+                    'created_at': f.created_at.isoformat()
+                }
+                for f in feedback
+            ]
+        finally:
+            session.close()
+    
+    def mark_feedback_consumed(self, ids: List[int], model_version: Optional[str] = None) -> int:
+        """
+        Marcar feedback como consumido por una versión del modelo online.
+        
+        Args:
+            ids: IDs de feedback a marcar
+            model_version: Versión del modelo que lo consumió
+            
+        Returns:
+            Número de filas actualizadas
+        """
+        if not ids:
+            return 0
+        
+        session = self.get_session()
+        try:
+            updated = session.query(Feedback).filter(
+                Feedback.id.in_(ids)
+            ).update(
+                {Feedback.consumed_at: datetime.utcnow(), Feedback.model_version: model_version},
+                synchronize_session=False
+            )
+            session.commit()
+            return updated
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
     def get_predictions(
         self,
         limit: int = 100,
@@ -0,0 +1,53 @@
+"""
+Módulo para calcular huellas (hashes) de datos.
+
+Sirve para detectar si un estudio, una caché de features o un conjunto
+de predicciones guardado corresponde exactamente a los mismos datos.
+"""
+
+import hashlib
+from typing import Any
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def _update_with_array(digest: Any, array: Any):
+    """Añadir un array (denso, sparse, Series o lista) al hash."""
+    if sparse.issparse(array):
+        array = array.tocsr()
+        digest.update(f'sparse{array.shape}'.encode())
+        for component in (array.data, array.indices, array.indptr):
+            _update_with_array(digest, component)
+        return
+
+    if isinstance(array, (pd.Series, pd.DataFrame)):
+        array = array.to_numpy()
+    array = np.asarray(array)
+
+    if array.dtype == object:
+        # Textos: hash de cada elemento como string
+        digest.update(f'object{array.shape}'.encode())
+        for value in array.ravel():
+            digest.update(str(value).encode('utf-8'))
+            digest.update(b'\0')
+        return
+
+    digest.update(f'{array.dtype.str}{array.shape}'.encode())
+    digest.update(np.ascontiguousarray(array).tobytes())
+
+
+def data_fingerprint(*arrays: Any) -> str:
+    """
+    Calcular una huella SHA-256 de uno o varios arrays.
+
+    Args:
+        *arrays: Arrays de numpy, matrices sparse, Series o listas de textos
+
+    Returns:
+        Hash en hexadecimal (16 primeros caracteres)
+    """
+    digest = hashlib.sha256()
+    for array in arrays:
+        _update_with_array(digest, array)
+    return digest.hexdigest()[:16]
@@ -0,0 +1,79 @@
+"""
+Módulo para compartir matrices entre procesos mediante memory-mapping.
+
+Los workers paralelos (entrenamiento de varios modelos, trials de Optuna)
+leen la misma matriz de características desde disco con `mmap_mode='r'`
+en lugar de recibir una copia serializada cada uno.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+import joblib
+
+# Directorios creados por `dump_shared_arrays`: solo estos se borran enteros
+_created_folders: Set[Path] = set()
+
+
+def dump_shared_arrays(
+    arrays: Dict[str, Any],
+    folder: Optional[Path] = None
+) -> Dict[str, Path]:
+    """
+    Guardar arrays (densos o sparse) en disco para leerlos con memmap.
+
+    Args:
+        arrays: Diccionario {nombre: array}
+        folder: Directorio destino (default: directorio temporal nuevo)
+
+    Returns:
+        Diccionario {nombre: ruta del archivo}
+    """
+    if folder is None:
+        folder = Path(tempfile.mkdtemp(prefix='shared_arrays_'))
+        _created_folders.add(folder)
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    paths = {}
+    for name, array in arrays.items():
+        path = folder / f'{name}.joblib'
+        # Sin compresión: joblib solo puede hacer memmap de arrays sin comprimir
+        joblib.dump(array, path)
+        paths[name] = path
+    return paths
+
+
+def load_shared_array(path: Path, mmap_mode: Optional[str] = 'r') -> Any:
+    """
+    Cargar un array guardado con `dump_shared_arrays`.
+
+    Args:
+        path: Ruta del archivo
+        mmap_mode: Modo de memory-mapping ('r' por defecto, None para cargar en RAM)
+
+    Returns:
+        Array (np.memmap para densos, matriz sparse con buffers mapeados)
+    """
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+def cleanup_shared_arrays(paths: Dict[str, Path]):
+    """
+    Eliminar los arrays compartidos.
+
+    Solo se borran los archivos escritos por `dump_shared_arrays`; el
+    directorio se elimina únicamente si lo creó ella (un `folder`
+    indicado por el usuario se conserva con el resto de su contenido).
+
+    Args:
+        paths: Diccionario devuelto por `dump_shared_arrays`
+    """
+    for path in paths.values():
+        Path(path).unlink(missing_ok=True)
+
+    for folder in {Path(p).parent for p in paths.values()}:
+        if folder in _created_folders:
+            shutil.rmtree(folder, ignore_errors=True)
+            _created_folders.discard(folder)
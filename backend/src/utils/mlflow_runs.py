@@ -0,0 +1,101 @@
+"""
+Módulo para leer runs históricos del store local de MLFlow (`mlruns/`).
+
+Lee directamente el formato de archivos de MLFlow
+(`<experimento>/<run>/params|metrics|tags`), de modo que no hace falta
+tener MLFlow instalado ni un servidor levantado para aprovechar los
+parámetros y métricas de entrenamientos anteriores.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import pandas as pd
+
+
+def default_mlruns_dir() -> Path:
+    """Directorio por defecto del store de MLFlow (backend/mlruns)."""
+    return Path(__file__).parent.parent.parent / 'mlruns'
+
+
+def _read_meta_field(meta_path: Path, field: str) -> Optional[str]:
+    """Leer un campo de nivel superior de un meta.yaml sin depender de PyYAML."""
+    if not meta_path.exists():
+        return None
+    for line in meta_path.read_text(encoding='utf-8').splitlines():
+        if line.startswith(f'{field}:'):
+            return line.split(':', 1)[1].strip().strip("'\"")
+    return None
+
+
+def _read_values(folder: Path) -> Dict[str, str]:
+    """Leer un directorio params/ o tags/ (un archivo por clave)."""
+    if not folder.exists():
+        return {}
+    return {
+        path.name: path.read_text(encoding='utf-8').strip()
+        for path in folder.iterdir() if path.is_file()
+    }
+
+
+def _read_metrics(folder: Path) -> Dict[str, float]:
+    """Leer el último valor de cada métrica (líneas 'timestamp valor paso')."""
+    metrics = {}
+    if not folder.exists():
+        return metrics
+    for path in folder.iterdir():
+        lines = [line.split() for line in path.read_text(encoding='utf-8').splitlines() if line.strip()]
+        if lines:
+            metrics[path.name] = float(lines[-1][1])
+    return metrics
+
+
+def load_mlflow_runs(
+    mlruns_dir: Optional[Path] = None,
+    experiment_name: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Cargar los runs terminados de un store local de MLFlow.
+
+    Args:
+        mlruns_dir: Directorio mlruns (default: backend/mlruns)
+        experiment_name: Filtrar por experimento (opcional)
+
+    Returns:
+        DataFrame con run_id, experiment, run_name, params (dict),
+        metrics (dict) y tags (dict); vacío si no hay runs
+    """
+    mlruns_dir = Path(mlruns_dir) if mlruns_dir is not None else default_mlruns_dir()
+    columns = ['run_id', 'experiment', 'run_name', 'params', 'metrics', 'tags']
+    if not mlruns_dir.exists():
+        return pd.DataFrame(columns=columns)
+
+    rows: List[Dict[str, Any]] = []
+    for experiment_dir in sorted(mlruns_dir.iterdir()):
+        if not experiment_dir.is_dir() or experiment_dir.name.startswith('.'):
+            continue
+        experiment = _read_meta_field(experiment_dir / 'meta.yaml', 'name')
+        if experiment is None:
+            continue  # models/ (registro de modelos) u otros directorios
+        if experiment_name is not None and experiment != experiment_name:
+            continue
+
+        for run_dir in sorted(experiment_dir.iterdir()):
+            meta_path = run_dir / 'meta.yaml'
+            if not run_dir.is_dir() or not meta_path.exists():
+                continue
+            # Estado 3 = FINISHED en el formato de archivos de MLFlow
+            status = _read_meta_field(meta_path, 'status')
+            if status not in ('3', 'FINISHED'):
+                continue
+
+            tags = _read_values(run_dir / 'tags')
+            rows.append({
+                'run_id': run_dir.name,
+                'experiment': experiment,
+                'run_name': _read_meta_field(meta_path, 'run_name') or tags.get('mlflow.runName'),
+                'params': _read_values(run_dir / 'params'),
+                'metrics': _read_metrics(run_dir / 'metrics'),
+                'tags': tags
+            })
+
+    return pd.DataFrame(rows, columns=columns)
@@ -59,3 +59,43 @@ def backend_root():
     """Ruta raíz del backend."""
     return Path(__file__).parent.parent
 
+
+
+def write_mlflow_run(mlruns_dir, run_id, params, metrics, tags=None, status=3):
+    """Escribir un run con el formato de archivos de MLFlow."""
+    experiment_dir = Path(mlruns_dir) / '1'
+    experiment_dir.mkdir(parents=True, exist_ok=True)
+    (experiment_dir / 'meta.yaml').write_text("experiment_id: '1'\nname: hate_speech_detection\n")
+    
+    run_dir = experiment_dir / run_id
+    for folder in ('params', 'metrics', 'tags'):
+        (run_dir / folder).mkdir(parents=True, exist_ok=True)
+    (run_dir / 'meta.yaml').write_text(f"run_id: {run_id}\nrun_name: {run_id}\nstatus: {status}\n")
+    for name, value in params.items():
+        (run_dir / 'params' / name).write_text(str(value))
+    for name, value in metrics.items():
+        (run_dir / 'metrics' / name).write_text(f"1700000000000 {value} 0\n")
+    for name, value in (tags or {}).items():
+        (run_dir / 'tags' / name).write_text(str(value))
+
+
+@pytest.fixture
+def fake_mlruns(tmp_path):
+    """Store de MLFlow con runs anteriores de naive_bayes."""
+    mlruns_dir = tmp_path / 'mlruns'
+    write_mlflow_run(mlruns_dir, 'good', {'model_type': 'naive_bayes', 'vectorizer_type': 'tfidf',
+                                          'alpha': '0.5', 'fit_prior': 'False'},
+                     {'test_f1': 0.8, 'diff_f1': 0.02})
+    write_mlflow_run(mlruns_dir, 'worse', {'model_type': 'naive_bayes', 'vectorizer_type': 'tfidf',
+                                           'alpha': '2.0', 'fit_prior': 'True'},
+                     {'test_f1': 0.7, 'diff_f1': 0.02})
+    write_mlflow_run(mlruns_dir, 'optuna', {'alpha': '1.5', 'fit_prior': 'True'},
+                     {'best_f1_score': 0.75}, tags={'study_name': 'naive_bayes_tfidf_optimization'})
+    write_mlflow_run(mlruns_dir, 'other_vectorizer', {'model_type': 'naive_bayes', 'vectorizer_type': 'count',
+                                                      'alpha': '0.2', 'fit_prior': 'True'},
+                     {'test_f1': 0.9, 'diff_f1': 0.0})
+    write_mlflow_run(mlruns_dir, 'failed', {'model_type': 'naive_bayes', 'alpha': '0.3'},
+                     {'test_f1': 0.95, 'diff_f1': 0.0}, status=4)
+    write_mlflow_run(mlruns_dir, 'svm', {'model_type': 'svm', 'C': '1.0', 'kernel': 'linear'},
+                     {'test_f1': 0.85, 'diff_f1': 0.01})
+    return mlruns_dir
@@ -0,0 +1,173 @@
+"""
+Tests para el formato de artefactos con manifest.
+"""
+import json
+import pytest
+import numpy as np
+import pandas as pd
+from src.features.vectorization import TextVectorizer
+from sklearn.svm import SVC
+from src.models.train import train_logistic_regression, save_model
+from src.models.artifacts import (
+    save_artifact,
+    load_artifact,
+    load_manifest,
+    update_manifest,
+    convert_legacy_model,
+    LEGACY_CALIBRATION,
+    MANIFEST_FILENAME
+)
+import src.api.predict as predict_module
+import src.models.artifacts as artifacts_module
+
+
+TEXTS = pd.Series([
+    "you are stupid and should die",
+    "great video thanks for sharing",
+    "idiot go away nobody likes you",
+    "very informative content love it"
+] * 5)
+LABELS = pd.Series([1, 0, 1, 0] * 5)
+
+
+class _IdentityPreprocessor:
+    """Preprocesador mínimo para no depender de spaCy/NLTK en los tests."""
+    
+    def __init__(self, use_spacy=True):
+        pass
+    
+    def preprocess_text(self, text, remove_stopwords=True):
+        return text.lower()
+
+
+@pytest.fixture
+def trained_pipeline():
+    """Vectorizador y modelo entrenados sobre textos de ejemplo."""
+    vectorizer = TextVectorizer(method='tfidf', min_df=1, max_features=50)
+    X = vectorizer.fit_transform(TEXTS)
+    model = train_logistic_regression(X, LABELS)
+    return model, vectorizer, X
+
+
+class TestArtifacts:
+    """Tests para guardar, verificar y cargar artefactos."""
+    
+    def test_save_and_load_roundtrip(self, trained_pipeline, tmp_path):
+        """Test que el artefacto reproduce las predicciones y el manifest."""
+        model, vectorizer, X = trained_pipeline
+        save_artifact(
+            tmp_path, model, vectorizer, threshold=0.42,
+            metrics={'test_f1': np.float64(0.8), 'confusion_matrix': np.eye(2, dtype=int)}
+        )
+        
+        manifest = json.loads((tmp_path / MANIFEST_FILENAME).read_text())
+        assert manifest['threshold'] == 0.42
+        assert manifest['model_class'] == 'LogisticRegression'
+        assert manifest['metrics']['confusion_matrix'] == [[1, 0], [0, 1]]
+        assert len(manifest['files']['model']['sha256']) == 64
+        
+        loaded = load_artifact(tmp_path, mmap_mode='r')
+        np.testing.assert_allclose(loaded['model'].predict_proba(X), model.predict_proba(X))
+        np.testing.assert_array_equal(loaded['vectorizer'].transform(TEXTS), X)
+    
+    def test_load_detects_tampering(self, trained_pipeline, tmp_path):
+        """Test que un archivo modificado no pasa la verificación de hash."""
+        model, vectorizer, _ = trained_pipeline
+        save_artifact(tmp_path, model, vectorizer)
+        with open(tmp_path / 'model.joblib', 'ab') as f:
+            f.write(b'corrupted')
+        with pytest.raises(ValueError):
+            load_artifact(tmp_path)
+    
+    def test_full_hash_detects_same_size_tampering(self, trained_pipeline, tmp_path, monkeypatch):
+        """Test que el hash completo es opcional y detecta cambios del mismo tamaño."""
+        model, vectorizer, _ = trained_pipeline
+        save_artifact(tmp_path, model, vectorizer)
+        
+        hashed = []
+        original_sha256 = artifacts_module.file_sha256
+        monkeypatch.setattr(artifacts_module, 'file_sha256',
+                            lambda path: hashed.append(path) or original_sha256(path))
+        load_artifact(tmp_path)
+        assert hashed == []
+        
+        data = bytearray((tmp_path / 'vectorizer.joblib').read_bytes())
+        data[-2] ^= 0xFF
+        (tmp_path / 'vectorizer.joblib').write_bytes(bytes(data))
+        with pytest.raises(ValueError):
+            load_artifact(tmp_path, full_hash=True)
+    
+    def test_update_manifest(self, trained_pipeline, tmp_path):
+        """Test que se pueden actualizar los parámetros de servicio."""
+        model, vectorizer, _ = trained_pipeline
+        save_artifact(tmp_path, model, vectorizer, threshold=0.5)
+        update_manifest(tmp_path, threshold=0.61)
+        assert load_manifest(tmp_path)['threshold'] == 0.61
+        # Los hashes de los archivos siguen siendo válidos
+        load_artifact(tmp_path)
+    
+    def test_convert_legacy_model(self, trained_pipeline, tmp_path):
+        """Test conversión de .pkl antiguos con la calibración histórica."""
+        model, vectorizer, _ = trained_pipeline
+        save_model(model, tmp_path / 'model.pkl')
+        vectorizer.save(tmp_path / 'vectorizer.pkl')
+        
+        convert_legacy_model(tmp_path / 'model.pkl', tmp_path / 'vectorizer.pkl', tmp_path / 'artifact', threshold=0.47)
+        manifest = load_manifest(tmp_path / 'artifact')
+        assert manifest['threshold'] == 0.47
+        assert manifest['calibration'] == LEGACY_CALIBRATION
+    
+    def test_svc_artifact_round_trip(self, tmp_path):
+        """Test que un SVC guardado como artefacto predice tras cargarlo."""
+        vectorizer = TextVectorizer(method='tfidf', min_df=1, max_features=50)
+        X = vectorizer.fit_transform(TEXTS)
+        model = SVC(probability=True, random_state=42).fit(X, LABELS)
+        save_artifact(tmp_path, model, vectorizer)
+        
+        loaded = load_artifact(tmp_path)
+        np.testing.assert_allclose(loaded['model'].predict_proba(X), model.predict_proba(X))
+
+
+class TestPredictorFromArtifact:
+    """Tests para servir un artefacto con HateSpeechPredictor."""
+    
+    def test_predictor_uses_manifest_parameters(self, trained_pipeline, tmp_path, monkeypatch):
+        """Test que umbral y calibración vienen del manifest."""
+        monkeypatch.setattr(predict_module, 'TextPreprocessor', _IdentityPreprocessor)
+        model, vectorizer, _ = trained_pipeline
+        save_artifact(tmp_path, model, vectorizer, threshold=0.0, calibration={'type': 'identity'})
+        
+        predictor = predict_module.load_predictor(tmp_path)
+        assert predictor.threshold == 0.0
+        result = predictor.predict("great video thanks")
+        raw = model.predict_proba(vectorizer.transform(pd.Series(["great video thanks"])))[0, 1]
+        assert result['is_toxic'] is True
+        assert result['probability_toxic'] == pytest.approx(raw)
+    
+    def test_legacy_calibration_is_default(self, trained_pipeline, tmp_path, monkeypatch):
+        """Test que sin manifest se mantiene el comportamiento anterior."""
+        monkeypatch.setattr(predict_module, 'TextPreprocessor', _IdentityPreprocessor)
+        model, vectorizer, _ = trained_pipeline
+        save_model(model, tmp_path / 'svm_augmented_model.pkl')
+        vectorizer.save(tmp_path / 'vectorizer.pkl')
+        
+        predictor = predict_module.HateSpeechPredictor(tmp_path / 'svm_augmented_model.pkl', tmp_path / 'vectorizer.pkl')
+        assert predictor.threshold == 0.50
+        assert predictor._calibrate_probability(0.475) == pytest.approx(0.50)
+        assert predictor._calibrate_probability(1.0) == pytest.approx(0.90)
+    
+    def test_dense_trained_svc_is_served(self, tmp_path, monkeypatch):
+        """Test que un SVC entrenado en denso recibe la matriz densa por defecto."""
+        monkeypatch.setattr(predict_module, 'TextPreprocessor', _IdentityPreprocessor)
+        vectorizer = TextVectorizer(method='tfidf', min_df=1, max_features=50)
+        X = vectorizer.fit_transform(TEXTS)
+        model = SVC(probability=True, random_state=42).fit(X, LABELS)
+        save_model(model, tmp_path / 'model.pkl')
+        vectorizer.save(tmp_path / 'vectorizer.pkl')
+        
+        predictor = predict_module.HateSpeechPredictor(tmp_path / 'model.pkl', tmp_path / 'vectorizer.pkl')
+        results = predictor.predict_batch(["you are stupid", "great video"])
+        expected = model.predict_proba(vectorizer.transform(pd.Series(["you are stupid", "great video"])))[:, 1]
+        assert [r['probability_toxic'] for r in results] == pytest.approx(
+            [predictor._calibrate_probability(p) for p in expected]
+        )
@@ -0,0 +1,95 @@
+"""
+Tests para la medición del coste de servicio.
+"""
+import numpy as np
+import pytest
+import pandas as pd
+from scipy import sparse
+from src.features.vectorization import TextVectorizer
+from src.models.train import train_logistic_regression, train_naive_bayes
+from src.models.evaluate import evaluate_model, compare_models
+from src.models.benchmark import benchmark_serving, benchmark_models
+
+
+TEXTS = pd.Series([
+    "you are stupid and should die",
+    "great video thanks for sharing",
+    "idiot go away nobody likes you",
+    "very informative content love it"
+] * 5)
+LABELS = pd.Series([1, 0, 1, 0] * 5)
+
+
+class _InputSpy:
+    """Modelo mínimo que anota si recibe la matriz sparse y ocupa `n_mb` MB."""
+    
+    def __init__(self, n_mb=0):
+        self.payload = np.ones(n_mb * 1024 ** 2 // 8)
+        self.saw_sparse = set()
+    
+    def predict_proba(self, X):
+        self.saw_sparse.add(sparse.issparse(X))
+        return np.full((X.shape[0], 2), 0.5)
+
+
+@pytest.fixture
+def serving_models():
+    """Vectorizador y dos modelos entrenados sobre textos de ejemplo."""
+    vectorizer = TextVectorizer(method='tfidf', min_df=1, max_features=50)
+    X = vectorizer.fit_transform(TEXTS)
+    models = {
+        'Logistic': train_logistic_regression(X, LABELS),
+        'Naive Bayes': train_naive_bayes(X, LABELS)
+    }
+    return models, vectorizer, X
+
+
+class TestBenchmark:
+    """Tests para benchmark_serving y benchmark_models."""
+    
+    def test_benchmark_serving(self, serving_models):
+        """Test que se miden todas las dimensiones de coste."""
+        models, vectorizer, _ = serving_models
+        cost = benchmark_serving(models['Logistic'], vectorizer, TEXTS, batch_sizes=(1, 8),
+                                 n_single=20, min_batch_time=0.01)
+        assert cost['latency_p50_ms'] <= cost['latency_p99_ms']
+        assert cost['throughput_b8'] > 0 and cost['throughput_b1'] > 0
+        assert cost['load_time_ms'] > 0
+        assert cost['peak_rss_mb'] >= 0
+        assert cost['artifact_size_kb'] > 0
+        
+        with pytest.raises(ValueError):
+            benchmark_serving(models['Logistic'], vectorizer, pd.Series([], dtype=str))
+    
+    def test_peak_rss_counts_loaded_model(self, serving_models):
+        """Test que el RSS pico incluye lo que ocupa el modelo cargado."""
+        _, vectorizer, _ = serving_models
+        cost = benchmark_serving(_InputSpy(n_mb=64), vectorizer, TEXTS, batch_sizes=(1,),
+                                 n_single=1, min_batch_time=0.0)
+        assert cost['peak_rss_mb'] >= 48
+    
+    def test_sparse_per_model(self, serving_models):
+        """Test que cada modelo se mide con la entrada con la que se sirve."""
+        _, vectorizer, _ = serving_models
+        models = {'Denso': _InputSpy(), 'Sparse': _InputSpy()}
+        serving = benchmark_models(models, vectorizer, TEXTS, batch_sizes=(1,), n_single=2,
+                                   sparse={'Sparse': True}, verbose=False)
+        assert models['Denso'].saw_sparse == {False}
+        assert models['Sparse'].saw_sparse == {True}
+        assert 'RSS pico (MB)' in serving.columns
+    
+    def test_compare_models_with_latency_budget(self, serving_models):
+        """Test que los modelos fuera de presupuesto pasan al final."""
+        models, vectorizer, X = serving_models
+        serving = benchmark_models(models, vectorizer, TEXTS, batch_sizes=(1,), n_single=10,
+                                   verbose=False)
+        assert serving['Modelo'].tolist() == ['Logistic', 'Naive Bayes']
+        assert 'Throughput b=1 (textos/s)' in serving.columns
+        
+        # Forzar que solo Naive Bayes cumpla el presupuesto
+        serving.loc[serving['Modelo'] == 'Logistic', 'Latencia p99 (ms)'] = 1e6
+        results = {name: evaluate_model(m, X, X, LABELS, LABELS, verbose=False)
+                   for name, m in models.items()}
+        comparison = compare_models(results, serving=serving, max_latency_ms=1e3)
+        assert comparison['Modelo'].tolist() == ['Naive Bayes', 'Logistic']
+        assert comparison['Cumple latencia'].tolist() == [True, False]
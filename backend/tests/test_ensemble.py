@@ -0,0 +1,119 @@
+"""
+Tests para los ensembles de modelos.
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from src.models import ensemble as ensemble_module
+from src.models.ensemble import (
+    create_voting_classifier,
+    create_stacking_classifier,
+    PrefitVotingClassifier,
+    collapse_linear_ensemble
+)
+from src.models.train import train_naive_bayes
+
+
+CONFIGS = [
+    {'name': 'nb', 'type': 'naive_bayes'},
+    {'name': 'lr', 'type': 'logistic'}
+]
+
+
+@pytest.fixture
+def ensemble_data():
+    """Datos con señal para entrenar los modelos base."""
+    rng = np.random.default_rng(0)
+    X = rng.random((200, 15))
+    y = (X[:, :3].sum(axis=1) + rng.normal(0, 0.3, 200) > 1.5).astype(int)
+    return X[:150], X[150:], pd.Series(y[:150]), pd.Series(y[150:])
+
+
+class TestPrefitEnsembles:
+    """Tests para los ensembles con modelos pre-entrenados."""
+    
+    @pytest.mark.parametrize('voting', ['soft', 'hard'])
+    def test_prefit_voting_matches_sklearn(self, ensemble_data, voting):
+        """Test que el voting pre-entrenado predice igual que VotingClassifier."""
+        X_train, X_test, y_train, _ = ensemble_data
+        reference = create_voting_classifier(CONFIGS, X_train, y_train, voting=voting, weights=[1, 2])
+        prefit = create_voting_classifier(CONFIGS, X_train, y_train, voting=voting, weights=[1, 2],
+                                          prefit=True, n_jobs=1)
+        np.testing.assert_array_equal(prefit.predict(X_test), reference.predict(X_test))
+        if voting == 'soft':
+            np.testing.assert_allclose(prefit.predict_proba(X_test), reference.predict_proba(X_test))
+    
+    def test_fitted_models_are_not_retrained(self, ensemble_data, monkeypatch):
+        """Test que los modelos ya entrenados y los OOF cacheados se reutilizan."""
+        X_train, X_test, y_train, _ = ensemble_data
+        fitted = {name: train_naive_bayes(X_train, y_train) for name in ('nb', 'lr')}
+        oof = {name: np.random.default_rng(1).random(len(y_train)) for name in ('nb', 'lr')}
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("No se debe entrenar ningún modelo base")
+        monkeypatch.setattr(ensemble_module, 'train_many', fail)
+        monkeypatch.setattr(ensemble_module, 'cross_validate_model', fail)
+        
+        stacking = create_stacking_classifier(CONFIGS, X_train, y_train, prefit=True,
+                                              fitted_models=fitted, oof_scores=oof)
+        assert stacking.named_estimators_['nb'] is fitted['nb']
+        assert stacking.predict_proba(X_test).shape == (len(X_test), 2)
+    
+    def test_prefit_stacking_uses_out_of_fold_scores(self, ensemble_data):
+        """Test que el meta-modelo se ajusta sobre scores out-of-fold."""
+        X_train, X_test, y_train, y_test = ensemble_data
+        stacking = create_stacking_classifier(CONFIGS, X_train, y_train, cv=3, prefit=True, n_jobs=1)
+        assert stacking.final_estimator_.coef_.shape == (1, 2)
+        assert stacking.transform(X_test).shape == (len(X_test), 2)
+        assert (stacking.predict(X_test) == y_test).mean() > 0.7
+    
+    def test_invalid_prefit_voting(self, ensemble_data):
+        """Test validación de votación y pesos."""
+        X_train, _, y_train, _ = ensemble_data
+        model = train_naive_bayes(X_train, y_train)
+        with pytest.raises(ValueError):
+            PrefitVotingClassifier([('nb', model)], voting='median')
+        with pytest.raises(ValueError):
+            PrefitVotingClassifier([('nb', model)], weights=[1, 2])
+
+
+class TestCollapseLinearEnsemble:
+    """Tests para exportar un soft voting como un modelo lineal."""
+    
+    def test_linear_members_are_folded(self, ensemble_data):
+        """Test que el modelo colapsado reproduce el ensemble con un solo vector."""
+        X_train, X_test, y_train, y_test = ensemble_data
+        configs = CONFIGS + [{'name': 'lsvm', 'type': 'linear_svm'}]
+        ensemble = create_voting_classifier(configs, X_train, y_train)
+        collapsed, report = collapse_linear_ensemble(ensemble, X_train, X_test, y_test, verbose=False)
+        
+        assert report['linear_members'] == ['nb', 'lr', 'lsvm']
+        assert report['nonlinear_members'] == []
+        assert collapsed.coef_.shape == (X_train.shape[1],)
+        assert report['agreement'] >= 0.95
+        assert report['mean_abs_diff'] < 0.05
+        assert abs(report['f1_ensemble'] - report['f1_collapsed']) < 0.05
+        
+        expected = 1.0 / (1.0 + np.exp(-(X_test @ collapsed.coef_ + collapsed.intercept_)))
+        np.testing.assert_allclose(collapsed.predict_proba(X_test)[:, 1], expected)
+    
+    def test_nonlinear_members_are_kept(self, ensemble_data):
+        """Test que los miembros no lineales se evalúan aparte."""
+        X_train, X_test, y_train, _ = ensemble_data
+        configs = CONFIGS + [{'name': 'rf', 'type': 'random_forest'}]
+        ensemble = create_voting_classifier(configs, X_train, y_train, prefit=True, n_jobs=1)
+        collapsed, report = collapse_linear_ensemble(ensemble, X_train, X_test, n_jobs=2, verbose=False)
+        assert report['nonlinear_members'] == ['rf']
+        assert report['max_abs_diff'] < 0.1
+        assert collapsed.predict(X_test).shape == (len(X_test),)
+    
+    def test_invalid_ensembles(self, ensemble_data):
+        """Test que solo se colapsan soft votings con miembros lineales."""
+        X_train, _, y_train, _ = ensemble_data
+        hard = create_voting_classifier(CONFIGS, X_train, y_train, voting='hard', prefit=True, n_jobs=1)
+        with pytest.raises(ValueError):
+            collapse_linear_ensemble(hard, X_train, verbose=False)
+        forest = create_voting_classifier([{'name': 'rf', 'type': 'random_forest'}], X_train, y_train,
+                                          prefit=True, n_jobs=1)
+        with pytest.raises(ValueError):
+            collapse_linear_ensemble(forest, X_train, verbose=False)
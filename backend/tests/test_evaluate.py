@@ -6,9 +6,19 @@ import numpy as np
 import pandas as pd
 from src.models.evaluate import (
     evaluate_model,
+    binary_confusion_matrix,
     compare_models,
-    print_classification_report
+    metrics_from_confusion_matrix,
+    print_classification_report,
+    threshold_sweep,
+    select_threshold,
+    bootstrap_metrics,
+    paired_bootstrap_comparison,
+    _bootstrap_counts,
+    cv_fold_indices,
+    cross_validate_model
 )
+from src.features.cache import FeatureCache
 from src.models.train import train_naive_bayes
 
 
@@ -130,3 +140,257 @@ class TestPrintClassificationReport:
             model, X_test, y_test
         )
 
+
+
+class TestMetricsFromConfusionMatrix:
+    """Tests para métricas calculadas desde conteos."""
+    
+    def test_matches_sklearn(self):
+        """Test que coincide con las funciones de sklearn."""
+        from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
+        rng = np.random.default_rng(1)
+        y_true = rng.integers(0, 2, 200)
+        y_pred = rng.integers(0, 2, 200)
+        metrics = metrics_from_confusion_matrix(confusion_matrix(y_true, y_pred))
+        assert metrics['accuracy'] == pytest.approx(accuracy_score(y_true, y_pred))
+        assert metrics['precision'] == pytest.approx(precision_score(y_true, y_pred))
+        assert metrics['recall'] == pytest.approx(recall_score(y_true, y_pred))
+        assert metrics['f1'] == pytest.approx(f1_score(y_true, y_pred))
+    
+    def test_zero_division(self):
+        """Test que sin positivos predichos las métricas valen 0."""
+        metrics = metrics_from_confusion_matrix(np.array([[5, 0], [3, 0]]))
+        assert metrics['precision'] == 0.0
+        assert metrics['f1'] == 0.0
+
+
+class TestSinglePassEvaluation:
+    """Tests para las métricas calculadas con bincount en evaluate_model."""
+    
+    def test_matches_sklearn_exactly(self, sample_vectorized_data):
+        """Test que el diccionario es idéntico al calculado con sklearn."""
+        from sklearn.metrics import f1_score, precision_score, confusion_matrix
+        X_train, X_test, y_train, y_test = sample_vectorized_data
+        model = train_naive_bayes(X_train, y_train)
+        results = evaluate_model(model, X_train, X_test, y_train, y_test, verbose=False)
+        
+        y_test_pred = model.predict(X_test)
+        assert results['test_f1'] == f1_score(y_test, y_test_pred, zero_division=0)
+        assert results['test_precision'] == precision_score(y_test, y_test_pred, zero_division=0)
+        assert results['train_f1'] == f1_score(y_train, model.predict(X_train), zero_division=0)
+        np.testing.assert_array_equal(results['confusion_matrix'], confusion_matrix(y_test, y_test_pred))
+    
+    def test_reuses_train_predictions(self, sample_vectorized_data):
+        """Test que con y_train_pred solo se predice sobre test."""
+        X_train, X_test, y_train, y_test = sample_vectorized_data
+        model = train_naive_bayes(X_train, y_train)
+        y_train_pred = model.predict(X_train)
+        expected = evaluate_model(model, X_train, X_test, y_train, y_test, verbose=False)
+        
+        calls = []
+        original_predict = model.predict
+        model.predict = lambda X: calls.append(len(X)) or original_predict(X)
+        results = evaluate_model(model, X_train, X_test, y_train, y_test,
+                                 verbose=False, y_train_pred=y_train_pred)
+        assert calls == [len(X_test)]
+        assert results['train_f1'] == expected['train_f1']
+    
+    def test_binary_confusion_matrix(self):
+        """Test matriz 2x2 y etiquetas no binarias."""
+        cm = binary_confusion_matrix(pd.Series([0, 1, 1, 0]), np.array([0, 1, 0, 0]))
+        np.testing.assert_array_equal(cm, [[2, 0], [1, 1]])
+        assert binary_confusion_matrix(np.array([1, 2]), np.array([1, 2])) is None
+        assert binary_confusion_matrix(np.array(['a', 'b']), np.array(['a', 'b'])) is None
+    
+    def test_single_label_and_fallback(self):
+        """Test que la matriz tiene la misma forma que con sklearn."""
+        class Constant:
+            def __init__(self, value):
+                self.value = value
+            
+            def predict(self, X):
+                return np.full(len(X), self.value)
+        
+        X = np.zeros((4, 1))
+        y = pd.Series([1, 1, 1, 1])
+        results = evaluate_model(Constant(1), X, X, y, y, verbose=False)
+        np.testing.assert_array_equal(results['confusion_matrix'], [[4]])
+        assert results['test_f1'] == 1.0
+        
+        # Etiquetas fuera de 0/1 usan el cálculo de sklearn
+        y = pd.Series([2, 2, 1, 1])
+        results = evaluate_model(Constant(1), X, X, y, y, verbose=False)
+        assert results['test_accuracy'] == 0.5
+        assert results['confusion_matrix'].shape == (2, 2)
+
+
+class TestThresholdSweep:
+    """Tests para el barrido de umbrales."""
+    
+    def test_matches_brute_force(self):
+        """Test que coincide con recalcular las métricas en cada umbral."""
+        from sklearn.metrics import f1_score, precision_score
+        rng = np.random.default_rng(2)
+        y = rng.integers(0, 2, 300)
+        scores = np.round(rng.random(300), 2)  # con empates
+        sweep = threshold_sweep(y, scores, cost_fp=1.0, cost_fn=5.0)
+        
+        assert sweep['Umbral'].is_monotonic_decreasing
+        assert len(sweep) == len(np.unique(scores))
+        for row in sweep.sample(20, random_state=0).itertuples():
+            y_pred = (scores >= row.Umbral).astype(int)
+            assert row.F1 == pytest.approx(f1_score(y, y_pred))
+            assert row.Precision == pytest.approx(precision_score(y, y_pred, zero_division=0))
+            fp = int(((y_pred == 1) & (y == 0)).sum())
+            fn = int(((y_pred == 0) & (y == 1)).sum())
+            assert row.Coste == fp + 5.0 * fn
+    
+    def test_select_threshold_updates_manifest(self, sample_vectorized_data, tmp_path):
+        """Test que el umbral elegido se guarda en el manifest del artefacto."""
+        from src.features.vectorization import TextVectorizer
+        from src.models.artifacts import save_artifact, load_manifest
+        X_train, X_test, y_train, y_test = sample_vectorized_data
+        model = train_naive_bayes(X_train, y_train)
+        vectorizer = TextVectorizer(method='tfidf', min_df=1)
+        vectorizer.fit_transform(pd.Series(['uno dos', 'tres cuatro']))
+        save_artifact(tmp_path, model, vectorizer, threshold=0.5)
+        
+        selection = select_threshold(model, X_test, y_test, objective='cost',
+                                     cost_fn=3.0, artifact_dir=tmp_path, verbose=False)
+        manifest = load_manifest(tmp_path)
+        assert manifest['threshold'] == selection['threshold']
+        assert manifest['threshold_selection']['cost_fn'] == 3.0
+        
+        y_pred = (model.predict_proba(X_test)[:, 1] >= selection['threshold']).astype(int)
+        fp = int(((y_pred == 1) & (y_test == 0)).sum())
+        fn = int(((y_pred == 0) & (y_test == 1)).sum())
+        assert selection['cost'] == fp + 3.0 * fn
+        
+        with pytest.raises(ValueError):
+            select_threshold(model, X_test, y_test, objective='accuracy')
+
+
+class TestBootstrap:
+    """Tests para intervalos de confianza bootstrap."""
+    
+    def test_counts_match_loop(self):
+        """Test que las matrices vectorizadas coinciden con un bucle."""
+        rng = np.random.default_rng(3)
+        y = rng.integers(0, 2, 50)
+        y_pred = rng.integers(0, 2, 50)
+        codes = 2 * y + y_pred
+        counts = _bootstrap_counts([codes], 30, np.random.default_rng(7), max_cells=500)[0]
+        
+        indices = np.random.default_rng(7)
+        expected = np.vstack([
+            np.bincount(codes[row], minlength=4)
+            for block in (10, 10, 10) for row in indices.integers(0, 50, size=(block, 50))
+        ])
+        np.testing.assert_array_equal(counts, expected)
+    
+    def test_intervals_contain_point_estimate(self):
+        """Test que cada intervalo contiene el valor observado."""
+        rng = np.random.default_rng(4)
+        y = rng.integers(0, 2, 200)
+        y_pred = np.where(rng.random(200) < 0.8, y, 1 - y)
+        ci = bootstrap_metrics(y, y_pred, n_bootstrap=500)
+        assert ci['Métrica'].tolist() == ['accuracy', 'precision', 'recall', 'f1']
+        assert (ci['IC inferior'] <= ci['Valor']).all() and (ci['Valor'] <= ci['IC superior']).all()
+        assert (ci['IC superior'] - ci['IC inferior'] > 0).all()
+    
+    def test_paired_comparison(self):
+        """Test comparación pareada entre modelos."""
+        rng = np.random.default_rng(5)
+        y = rng.integers(0, 2, 300)
+        good = np.where(rng.random(300) < 0.9, y, 1 - y)
+        bad = np.where(rng.random(300) < 0.6, y, 1 - y)
+        
+        result = paired_bootstrap_comparison(y, good, bad, n_bootstrap=500)
+        assert result['ci_lower'] > 0
+        assert result['prob_a_better'] > 0.95
+        same = paired_bootstrap_comparison(y, good, good, n_bootstrap=100)
+        assert same['difference'] == same['ci_lower'] == same['ci_upper'] == 0.0
+        with pytest.raises(ValueError):
+            paired_bootstrap_comparison(y, good, bad, metric='auc')
+    
+    def test_compare_models_with_intervals(self, sample_vectorized_data):
+        """Test que compare_models añade intervalos y empates."""
+        X_train, X_test, y_train, y_test = sample_vectorized_data
+        models = {
+            'NB (alpha=1.0)': train_naive_bayes(X_train, y_train),
+            'NB (alpha=0.5)': train_naive_bayes(X_train, y_train, alpha=0.5)
+        }
+        results = {name: evaluate_model(m, X_train, X_test, y_train, y_test, verbose=False)
+                   for name, m in models.items()}
+        predictions = {name: m.predict(X_test) for name, m in models.items()}
+        
+        comparison = compare_models(results, y_test=y_test, predictions=predictions, n_bootstrap=200)
+        assert {'F1 IC inferior', 'F1 IC superior', 'Empate con el mejor'} <= set(comparison.columns)
+        assert comparison['Empate con el mejor'].iloc[0]
+    
+    def test_tie_reference_is_best_f1_for_any_metric(self):
+        """Test que el empate se calcula contra el mejor F1 aunque se ordene por otra métrica."""
+        rng = np.random.default_rng(7)
+        y = rng.integers(0, 2, 400)
+        predictions = {
+            'Bueno': np.where(rng.random(400) < 0.9, y, 1 - y),
+            'Todo tóxico': np.ones(400, dtype=int)
+        }
+        results = {}
+        for name, y_pred in predictions.items():
+            metrics = metrics_from_confusion_matrix(np.bincount(y * 2 + y_pred, minlength=4))
+            results[name] = {'test_f1': metrics['f1'], 'train_f1': metrics['f1'], 'diff_f1': 0.0,
+                             'test_accuracy': metrics['accuracy'], 'test_precision': metrics['precision'],
+                             'test_recall': metrics['recall']}
+        
+        comparison = compare_models(results, metric='test_recall', y_test=y,
+                                    predictions=predictions, n_bootstrap=300).set_index('Modelo')
+        assert comparison.index[0] == 'Todo tóxico'
+        assert comparison.loc['Bueno', 'Empate con el mejor']
+        assert not comparison.loc['Todo tóxico', 'Empate con el mejor']
+
+
+class TestCrossValidateModel:
+    """Tests para el motor de validación cruzada."""
+    
+    def test_oof_predictions_cover_every_example(self, sample_vectorized_data):
+        """Test que cada ejemplo recibe exactamente una predicción out-of-fold."""
+        X_train, _, y_train, _ = sample_vectorized_data
+        folds = cv_fold_indices(y_train, cv=4)
+        val = np.sort(np.concatenate([val_idx for _, val_idx in folds]))
+        np.testing.assert_array_equal(val, np.arange(len(y_train)))
+        
+        results = cross_validate_model('naive_bayes', X_train, y_train, folds=folds, verbose=False)
+        assert len(results['folds']) == 4
+        assert len(results['models']) == 4
+        
+        # El score out-of-fold es el del modelo que no vio ese ejemplo
+        train_idx, val_idx = folds[1]
+        np.testing.assert_array_equal(
+            results['oof_scores'][val_idx], results['models'][1].predict_proba(X_train[val_idx])[:, 1]
+        )
+        with pytest.raises(ValueError):
+            cv_fold_indices(y_train, cv=1)
+    
+    def test_parallel_matches_serial(self, sample_vectorized_data):
+        """Test que los folds en paralelo dan el mismo resultado."""
+        X_train, _, y_train, _ = sample_vectorized_data
+        serial = cross_validate_model('logistic', X_train, y_train, cv=3, verbose=False)
+        parallel = cross_validate_model('logistic', X_train, y_train, cv=3, n_jobs=2, verbose=False)
+        np.testing.assert_allclose(serial['oof_scores'], parallel['oof_scores'])
+        assert serial['cv_f1_mean'] == parallel['cv_f1_mean']
+    
+    def test_fold_features_are_cached(self, tmp_path):
+        """Test que el vectorizador se ajusta por fold una sola vez."""
+        texts = pd.Series(['stupid idiot die', 'great video thanks', 'hate you loser',
+                           'love this content'] * 10)
+        y = pd.Series([1, 0, 1, 0] * 10)
+        cache = FeatureCache(tmp_path)
+        params = {'min_df': 1}
+        first = cross_validate_model('naive_bayes', texts, y, cv=3, vectorizer_method='tfidf',
+                                     vectorizer_params=params, feature_cache=cache, verbose=False)
+        cross_validate_model('logistic', texts, y, folds=first['fold_indices'], vectorizer_method='tfidf',
+                             vectorizer_params=params, feature_cache=cache, verbose=False)
+        assert cache.stats['misses'] == 3
+        assert cache.stats['memory_hits'] == 3
+        assert first['oof_metrics']['f1'] == 1.0
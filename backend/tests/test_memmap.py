@@ -0,0 +1,32 @@
+"""
+Tests para los arrays compartidos con memory-mapping.
+"""
+import numpy as np
+from scipy import sparse
+from src.utils.memmap import dump_shared_arrays, load_shared_array, cleanup_shared_arrays
+
+
+class TestSharedArrays:
+    """Tests para dump/load/cleanup de arrays compartidos."""
+
+    def test_round_trip(self):
+        """Test que densos y sparse se recuperan iguales."""
+        X = sparse.random(20, 10, density=0.2, format='csr', random_state=0)
+        y = np.arange(20)
+        paths = dump_shared_arrays({'X': X, 'y': y})
+        try:
+            assert (load_shared_array(paths['X']) != X).nnz == 0
+            np.testing.assert_array_equal(load_shared_array(paths['y']), y)
+        finally:
+            cleanup_shared_arrays(paths)
+        assert not paths['X'].parent.exists()
+
+    def test_cleanup_keeps_user_folder(self, tmp_path):
+        """Test que con folder= solo se borran los archivos escritos."""
+        other = tmp_path / 'other.txt'
+        other.write_text('no borrar')
+        paths = dump_shared_arrays({'y': np.arange(5)}, folder=tmp_path)
+
+        cleanup_shared_arrays(paths)
+        assert not paths['y'].exists()
+        assert other.exists()
@@ -0,0 +1,25 @@
+"""
+Tests para la lectura de runs históricos de MLFlow.
+"""
+from src.utils.mlflow_runs import load_mlflow_runs
+
+
+class TestLoadMlflowRuns:
+    """Tests para load_mlflow_runs."""
+    
+    def test_reads_finished_runs(self, fake_mlruns):
+        """Test que se leen params, métricas y tags de los runs terminados."""
+        runs = load_mlflow_runs(fake_mlruns).set_index('run_id')
+        assert 'failed' not in runs.index
+        assert len(runs) == 5
+        
+        good = runs.loc['good']
+        assert good['experiment'] == 'hate_speech_detection'
+        assert good['params']['alpha'] == '0.5'
+        assert good['metrics']['test_f1'] == 0.8
+        assert runs.loc['optuna', 'tags']['study_name'] == 'naive_bayes_tfidf_optimization'
+    
+    def test_filters_and_missing_store(self, fake_mlruns, tmp_path):
+        """Test filtro por experimento y store inexistente."""
+        assert load_mlflow_runs(fake_mlruns, experiment_name='other').empty
+        assert load_mlflow_runs(tmp_path / 'missing').empty
@@ -0,0 +1,191 @@
+"""
+Tests para el módulo de aprendizaje online.
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from src.models.online import (
+    OnlineHateSpeechModel,
+    list_snapshots,
+    get_snapshot_paths,
+    to_binary_labels
+)
+from src.utils.database import DatabaseManager, Feedback
+import src.api.predict as predict_module
+
+
+TEXTS = [
+    "you are stupid and should die",
+    "great video thanks for sharing",
+    "idiot go away nobody likes you",
+    "very informative content love it"
+] * 5
+LABELS = [1, 0, 1, 0] * 5
+
+
+class _IdentityPreprocessor:
+    """Preprocesador mínimo para no depender de spaCy/NLTK en los tests."""
+    
+    def __init__(self, use_spacy=True):
+        pass
+    
+    def preprocess_text(self, text, remove_stopwords=True):
+        return text
+
+
+class _MaskingPreprocessor:
+    """Preprocesador que cambia el texto y registra su configuración."""
+    
+    calls = []
+    
+    def __init__(self, use_spacy=True):
+        self.use_spacy = use_spacy
+    
+    def preprocess_text(self, text, remove_stopwords=True):
+        _MaskingPreprocessor.calls.append((self.use_spacy, remove_stopwords))
+        return text.replace('stupid', 'idiot')
+
+
+class TestOnlineModel:
+    """Tests para OnlineHateSpeechModel."""
+    
+    def test_partial_fit_and_predict(self, tmp_path):
+        """Test que el modelo aprende incrementalmente."""
+        model = OnlineHateSpeechModel(model_dir=tmp_path, preprocess=False)
+        model.partial_fit(TEXTS[:10], LABELS[:10])
+        model.partial_fit(TEXTS[10:], LABELS[10:])
+        assert model.n_samples_seen == len(TEXTS)
+        
+        probabilities = model.predict_proba(["you are stupid", "love this video"])
+        assert probabilities.shape == (2, 2)
+        assert probabilities[0, 1] > probabilities[1, 1]
+    
+    def test_snapshots_are_versioned(self, tmp_path):
+        """Test que cada snapshot crea una versión nueva recargable."""
+        model = OnlineHateSpeechModel(model_dir=tmp_path, preprocess=False)
+        model.partial_fit(TEXTS, LABELS)
+        assert model.save_snapshot() == 1
+        model.partial_fit(TEXTS, LABELS)
+        assert model.save_snapshot() == 2
+        assert list_snapshots(tmp_path) == [1, 2]
+        
+        model_path, vectorizer_path = get_snapshot_paths(tmp_path)
+        assert model_path.parent.name == 'v0002'
+        assert vectorizer_path.exists()
+        
+        loaded = OnlineHateSpeechModel.load_snapshot(tmp_path, version=1)
+        assert loaded.version == 1
+        assert loaded.n_samples_seen == len(TEXTS)
+    
+    def test_save_snapshot_requires_data(self, tmp_path):
+        """Test que no se guarda un modelo sin entrenar."""
+        model = OnlineHateSpeechModel(model_dir=tmp_path, preprocess=False)
+        with pytest.raises(ValueError):
+            model.save_snapshot()
+    
+    def test_update_from_csv_archives_files(self, tmp_path):
+        """Test que los CSV consumidos se mueven a processed/."""
+        drop_dir = tmp_path / 'drops'
+        drop_dir.mkdir()
+        pd.DataFrame({'Text': TEXTS, 'IsToxic': ['TRUE' if l else 'FALSE' for l in LABELS]}).to_csv(
+            drop_dir / 'batch_001.csv', index=False
+        )
+        
+        model = OnlineHateSpeechModel(model_dir=tmp_path / 'online', preprocess=False)
+        consumed = model.update_from_csv(drop_dir, chunksize=7)
+        assert consumed == len(TEXTS)
+        assert not (drop_dir / 'batch_001.csv').exists()
+        assert (drop_dir / 'processed' / 'batch_001.csv').exists()
+        assert list_snapshots(tmp_path / 'online') == [1]
+    
+    def test_update_from_csv_failure_rolls_back(self, tmp_path):
+        """Test que un CSV roto no deja lotes aprendidos ni archivados a medias."""
+        drop_dir = tmp_path / 'drops'
+        drop_dir.mkdir()
+        pd.DataFrame({'Text': TEXTS, 'IsToxic': LABELS}).to_csv(drop_dir / 'batch_001.csv', index=False)
+        pd.DataFrame({'Text': TEXTS}).to_csv(drop_dir / 'batch_002.csv', index=False)
+        
+        model = OnlineHateSpeechModel(model_dir=tmp_path / 'online', preprocess=False)
+        with pytest.raises(KeyError):
+            model.update_from_csv(drop_dir)
+        assert model.n_samples_seen == 0
+        assert (drop_dir / 'batch_001.csv').exists()
+        assert list_snapshots(tmp_path / 'online') == []
+    
+    def test_update_from_feedback_consumes_once(self, tmp_path):
+        """Test que el feedback pendiente se consume una sola vez."""
+        db = DatabaseManager(tmp_path / 'test.db')
+        for text, label in zip(TEXTS, LABELS):
+            db.save_feedback(text, bool(label), source='test')
+        
+        model = OnlineHateSpeechModel(model_dir=tmp_path / 'online', preprocess=False)
+        assert model.update_from_feedback(db, batch_size=6) == len(TEXTS)
+        assert db.get_pending_feedback() == []
+        assert model.update_from_feedback(db) == 0
+    
+    def test_feedback_is_marked_with_written_version(self, tmp_path):
+        """Test que las filas llevan la versión del snapshot que las incluye."""
+        other = OnlineHateSpeechModel(model_dir=tmp_path / 'online', preprocess=False)
+        other.partial_fit(TEXTS, LABELS)
+        other.save_snapshot()
+        other.save_snapshot()
+        
+        db = DatabaseManager(tmp_path / 'test.db')
+        db.save_feedback(TEXTS[0], True, source='test')
+        model = OnlineHateSpeechModel(model_dir=tmp_path / 'online', preprocess=False)
+        model.update_from_feedback(db)
+        
+        assert model.version == 3
+        session = db.get_session()
+        try:
+            versions = [f.model_version for f in session.query(Feedback).all()]
+        finally:
+            session.close()
+        assert versions == ['v0003']
+
+    
+    def test_online_predictor_serves_sparse(self, tmp_path, monkeypatch):
+        """Test que el predictor online no densifica las 2^18 columnas hashing."""
+        monkeypatch.setattr(predict_module, 'TextPreprocessor', _IdentityPreprocessor)
+        model = OnlineHateSpeechModel(model_dir=tmp_path, preprocess=False)
+        model.partial_fit(TEXTS, LABELS)
+        model.save_snapshot()
+        
+        predictor = predict_module.load_online_predictor(tmp_path)
+        shapes = []
+        original = predictor.model.predict_proba
+        predictor.model.predict_proba = lambda X: shapes.append(X.format) or original(X)
+        results = predictor.predict_batch(["you are stupid", "love this video"])
+        
+        assert shapes == ['csr']
+        expected = model.predict_proba(["you are stupid", "love this video"])[:, 1]
+        assert [r['probability_toxic'] for r in results] == pytest.approx(expected)
+    
+    def test_online_predictor_follows_snapshot_preprocessing(self, tmp_path, monkeypatch):
+        """Test que el predictor preprocesa (o no) como se entrenó el snapshot."""
+        import src.data.preprocessing as preprocessing_module
+        monkeypatch.setattr(preprocessing_module, 'TextPreprocessor', _MaskingPreprocessor)
+        monkeypatch.setattr(predict_module, 'TextPreprocessor', _MaskingPreprocessor)
+        texts = ["you are stupid", "love this video"]
+        
+        for preprocess in (True, False):
+            model_dir = tmp_path / str(preprocess)
+            model = OnlineHateSpeechModel(model_dir=model_dir, preprocess=preprocess)
+            model.partial_fit(TEXTS, LABELS)
+            model.save_snapshot()
+            
+            _MaskingPreprocessor.calls = []
+            predictor = predict_module.load_online_predictor(model_dir)
+            results = predictor.predict_batch(texts)
+            assert _MaskingPreprocessor.calls == ([(True, True)] * 2 if preprocess else [])
+            
+            expected = model.predict_proba(texts)[:, 1]
+            assert [r['probability_toxic'] for r in results] == pytest.approx(expected)
+
+
+
+def test_to_binary_labels():
+    """Test conversión de etiquetas del dataset."""
+    np.testing.assert_array_equal(to_binary_labels(['TRUE', 'FALSE', True, 0]), [1, 0, 1, 0])
+    np.testing.assert_array_equal(to_binary_labels([True, False]), [1, 0])
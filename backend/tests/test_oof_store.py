@@ -0,0 +1,114 @@
+"""
+Tests para el almacén de predicciones out-of-fold.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from src.models.oof_store import OOFStore
+from src.models.evaluate import cross_validate_model, cv_fold_indices
+from src.models.ensemble import evaluate_combiners, create_stacking_classifier
+
+
+CONFIGS = [
+    {'name': 'nb', 'type': 'naive_bayes', 'params': {'alpha': 1.0}},
+    {'name': 'lr', 'type': 'logistic', 'params': {'C': 1.0}}
+]
+
+
+@pytest.fixture
+def stacking_data():
+    """Datos con señal para los modelos base."""
+    rng = np.random.default_rng(0)
+    X = rng.random((150, 12))
+    y = pd.Series((X[:, :3].sum(axis=1) + rng.normal(0, 0.3, 150) > 1.5).astype(int))
+    return X, y
+
+
+class TestOOFStore:
+    """Tests para OOFStore."""
+    
+    def test_scores_are_reused_from_disk(self, stacking_data, tmp_path):
+        """Test que una instancia nueva lee los scores sin reentrenar."""
+        X, y = stacking_data
+        store = OOFStore(tmp_path)
+        scores = store.get_or_compute('naive_bayes', {'alpha': 1.0}, X, y, cv=3)
+        expected = cross_validate_model('naive_bayes', X, y, folds=cv_fold_indices(y, 3),
+                                        verbose=False, alpha=1.0)['oof_scores']
+        np.testing.assert_array_equal(scores, expected)
+        
+        other = OOFStore(tmp_path)
+        np.testing.assert_array_equal(other.get_or_compute('naive_bayes', {'alpha': 1.0}, X, y, cv=3), scores)
+        assert other.stats == {'memory_hits': 0, 'disk_hits': 1, 'misses': 0}
+    
+    def test_key_depends_on_config_data_and_folds(self, stacking_data, tmp_path):
+        """Test que cambiar parámetros, datos o semilla recalcula."""
+        X, y = stacking_data
+        store = OOFStore(tmp_path)
+        store.get_or_compute('naive_bayes', {'alpha': 1.0}, X, y, cv=3)
+        store.get_or_compute('naive_bayes', {'alpha': 2.0}, X, y, cv=3)
+        store.get_or_compute('naive_bayes', {'alpha': 1.0}, X * 2, y, cv=3)
+        store.get_or_compute('naive_bayes', {'alpha': 1.0}, X, y, cv=3, random_state=7)
+        store.get_or_compute('naive_bayes', {'alpha': 1.0}, X, y, cv=3)
+        assert store.stats['misses'] == 4
+        assert store.stats['memory_hits'] == 1
+        
+        store.clear(disk=True)
+        assert not list(tmp_path.glob('*.joblib'))
+
+
+class TestCombinerExperiments:
+    """Tests para comparar combinadores sobre el almacén."""
+    
+    def test_evaluate_combiners_and_materialize(self, stacking_data, tmp_path):
+        """Test que se comparan combinadores y se materializa sin recalcular OOF."""
+        X, y = stacking_data
+        store = OOFStore(tmp_path)
+        oof = store.oof_matrix(CONFIGS, X, y, cv=3)
+        assert list(oof.columns) == ['nb', 'lr']
+        
+        results = evaluate_combiners(
+            oof, y, combiners={'logistic': LogisticRegression(), 'media': [1, 1], 'pesos': [1, 3]}, cv=3
+        )
+        assert len(results) == 3
+        assert results['F1'].is_monotonic_decreasing
+        
+        subsets = evaluate_combiners(oof, y, {'logistic': LogisticRegression()},
+                                     model_subsets={'todos': ['nb', 'lr'], 'solo_lr': ['lr']}, cv=3)
+        assert set(subsets['Modelos']) == {'todos', 'solo_lr'}
+        
+        with pytest.raises(ValueError):
+            evaluate_combiners(oof, y, {'pesos': [1, 2, 3]})
+        
+        stacking = create_stacking_classifier(CONFIGS, X, y, cv=3, prefit=True, n_jobs=1,
+                                              use_optimized_params=False, oof_store=store)
+        assert store.stats['misses'] == 2
+        assert store.stats['memory_hits'] == 2
+        assert stacking.predict(X).shape == (len(y),)
+    
+    def test_weights_reject_decision_scores(self, stacking_data, tmp_path):
+        """Test que los pesos no promedian scores de decision_function."""
+        from sklearn.model_selection import cross_val_predict
+        from sklearn.svm import LinearSVC
+        X, y = stacking_data
+        oof = OOFStore(tmp_path).oof_matrix(CONFIGS, X, y, cv=3)
+        # Sin predict_proba, `positive_scores` guarda decision_function
+        oof['svm'] = cross_val_predict(LinearSVC(), X, y, cv=3, method='decision_function')
+        assert oof['svm'].min() < 0
+        
+        with pytest.raises(ValueError, match='svm'):
+            evaluate_combiners(oof, y, {'media': [1, 1, 1]}, cv=3)
+        results = evaluate_combiners(oof, y, {'logistic': LogisticRegression()}, cv=3)
+        assert len(results) == 1
+    
+    def test_stacking_hashes_data_once(self, stacking_data, tmp_path, monkeypatch):
+        """Test que el stacking pasa la huella de los datos al almacén."""
+        import src.models.oof_store as oof_store_module
+        X, y = stacking_data
+        
+        def fail(*args):
+            raise AssertionError("data_fingerprint recalculado por el almacén")
+        
+        monkeypatch.setattr(oof_store_module, 'data_fingerprint', fail)
+        create_stacking_classifier(CONFIGS, X, y, cv=3, prefit=True, n_jobs=1,
+                                   use_optimized_params=False, oof_store=OOFStore(tmp_path))
@@ -0,0 +1,499 @@
+"""
+Tests para el módulo de optimización de hiperparámetros.
+"""
+import tempfile
+import time
+import pytest
+import numpy as np
+import pandas as pd
+import optuna
+from src.features import cache as cache_module
+from src.features.cache import FeatureCache
+from src.models import optimization as optimization_module
+from src.models.trial_store import TrialModelStore
+from src.models.optimization import (
+    optimize_model,
+    optimize_with_vectorizer,
+    optimize_models_within_budget,
+    optimize_multi_objective,
+    select_model_under_latency_budget,
+    measure_serving_cost,
+    summarize_trial_costs,
+    TIMEOUT_PENALTY,
+    get_study_history,
+    historical_configurations,
+    list_studies,
+    _evaluate_params,
+    _make_pruner,
+    _nested_stratified_subsamples,
+    fidelity_fractions,
+    _split_trials
+)
+
+optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+
+@pytest.fixture
+def separable_data():
+    """Datos con señal suficiente para que los objetivos no penalicen todo."""
+    rng = np.random.default_rng(0)
+    X = rng.random((240, 20))
+    y = (X[:, :3].sum(axis=1) + rng.normal(0, 0.3, 240) > 1.5).astype(int)
+    return X[:180], X[180:], pd.Series(y[:180]), pd.Series(y[180:])
+
+
+class TestOptimizeModel:
+    """Tests para optimize_model."""
+    
+    def test_optimize_serial(self, separable_data):
+        """Test optimización secuencial en memoria."""
+        X_train, X_test, y_train, y_test = separable_data
+        model, params, study = optimize_model(
+            'naive_bayes', X_train, X_test, y_train, y_test, n_trials=4, persist=False
+        )
+        assert len(study.trials) == 4
+        assert set(params) == {'alpha', 'fit_prior'}
+        assert model.predict(X_test).shape == (len(X_test),)
+    
+    def test_optimize_parallel_shared_sqlite(self, separable_data, tmp_path):
+        """Test que varios procesos comparten un estudio SQLite."""
+        X_train, X_test, y_train, y_test = separable_data
+        storage = f"sqlite:///{tmp_path / 'optuna.db'}"
+        _, params, study = optimize_model(
+            'logistic', X_train, X_test, y_train, y_test,
+            n_trials=6, n_jobs=2, storage=storage, pruner=None
+        )
+        assert (tmp_path / 'optuna.db').exists()
+        assert len(study.trials) == 6
+        assert all(t.state == optuna.trial.TrialState.COMPLETE for t in study.trials)
+        assert set(params) == {'C', 'penalty'}
+    
+    def test_parallel_without_storage_removes_temporary_sqlite(self, separable_data, tmp_path, monkeypatch):
+        """Test que el SQLite temporal de los workers se borra y el estudio sigue usable."""
+        X_train, X_test, y_train, y_test = separable_data
+        temp_root = tmp_path / 'tmp'
+        temp_root.mkdir()
+        monkeypatch.setattr(tempfile, 'tempdir', str(temp_root))
+        _, _, study = optimize_model(
+            'naive_bayes', X_train, X_test, y_train, y_test,
+            n_trials=4, n_jobs=2, persist=False, pruner=None
+        )
+        assert not list(temp_root.glob('optuna_*'))
+        assert len(study.trials) == 4
+        assert study.best_trial.user_attrs['fit_time'] > 0
+    
+    def test_invalid_model_type(self, separable_data):
+        """Test que un modelo desconocido lanza error."""
+        X_train, X_test, y_train, y_test = separable_data
+        with pytest.raises(ValueError):
+            optimize_model('invalid', X_train, X_test, y_train, y_test, n_trials=1, persist=False)
+
+
+class TestCrossValidatedObjectives:
+    """Tests para objetivos con validación cruzada y pruning."""
+    
+    def test_cv_reports_each_fold(self, separable_data):
+        """Test que cada fold se reporta como valor intermedio."""
+        X_train, X_test, y_train, y_test = separable_data
+        _, _, study = optimize_model(
+            'naive_bayes', X_train, X_test, y_train, y_test,
+            n_trials=3, persist=False, cv=3, pruner=None
+        )
+        for trial in study.trials:
+            assert sorted(trial.intermediate_values) == [0, 1, 2]
+            assert trial.user_attrs['folds_evaluated'] == 3
+            assert 0.0 <= trial.user_attrs['cv_f1_mean'] <= 1.0
+    
+    def test_holdout_mode_has_no_intermediate_values(self, separable_data):
+        """Test que cv=None mantiene la evaluación sobre test."""
+        X_train, X_test, y_train, y_test = separable_data
+        _, _, study = optimize_model(
+            'naive_bayes', X_train, X_test, y_train, y_test,
+            n_trials=2, persist=False, cv=None
+        )
+        assert all(not t.intermediate_values for t in study.trials)
+    
+    def test_bad_configuration_is_pruned(self, separable_data):
+        """Test que un trial peor que la mediana se poda en el primer fold."""
+        X_train, X_test, y_train, y_test = separable_data
+        study = optuna.create_study(direction='maximize', pruner=_make_pruner('median', 3))
+        for _ in range(5):
+            study.add_trial(optuna.trial.create_trial(
+                params={}, distributions={}, value=0.9, intermediate_values={0: 0.9, 1: 0.9, 2: 0.9}
+            ))
+        
+        trial = study.ask()
+        with pytest.raises(optuna.TrialPruned):
+            # Regularización extrema: predice siempre la clase mayoritaria
+            _evaluate_params(trial, 'logistic', {'C': 1e-6}, X_train, X_test,
+                             y_train, y_test, cv=3)
+        assert trial.user_attrs['folds_evaluated'] == 1
+    
+    def test_invalid_pruner(self):
+        """Test que un pruner desconocido lanza error."""
+        with pytest.raises(ValueError):
+            _make_pruner('invalid', 5)
+        assert isinstance(_make_pruner('median', None), optuna.pruners.NopPruner)
+
+
+class TestTrialModelReuse:
+    """Tests para reutilizar el modelo del mejor trial."""
+    
+    def test_best_model_is_not_retrained(self, separable_data, tmp_path, monkeypatch):
+        """Test que sin cv el mejor modelo sale del almacén y no se reentrena."""
+        X_train, X_test, y_train, y_test = separable_data
+        calls = []
+        original_train_model = optimization_module.train_model
+        
+        def counting_train_model(*args, **kwargs):
+            calls.append(args[0])
+            return original_train_model(*args, **kwargs)
+        
+        monkeypatch.setattr(optimization_module, 'train_model', counting_train_model)
+        store = TrialModelStore(tmp_path, top_k=2)
+        model, params, study = optimize_model(
+            'logistic', X_train, X_test, y_train, y_test,
+            n_trials=4, persist=False, cv=None, model_store=store
+        )
+        
+        assert len(calls) == 4
+        assert store.ranking()[0][0] == study.best_trial.number
+        assert model.C == pytest.approx(params['C'])
+        assert all(t.user_attrs['fit_time'] > 0 for t in study.trials)
+    
+    def test_same_name_on_other_data_does_not_reuse_models(self, tmp_path, monkeypatch):
+        """Test que un estudio nuevo con el mismo nombre no carga modelos de otros datos."""
+        monkeypatch.setattr(optimization_module, 'default_trial_store_dir',
+                            lambda name, uid: tmp_path / 'trials' / name / uid)
+        rng = np.random.default_rng(1)
+        for i, n_features in enumerate((20, 30)):
+            X = rng.random((120, n_features))
+            y = pd.Series((X[:, :3].sum(axis=1) > 1.5).astype(int))
+            model, _, _ = optimize_model(
+                'logistic', X[:90], X[90:], y[:90], y[90:], n_trials=2, cv=None,
+                study_name='same_name', persist=True, storage=f"sqlite:///{tmp_path / f'study_{i}.db'}"
+            )
+            assert model.predict(X[90:]).shape == (30,)
+    
+    def test_cv_final_model_is_reused_on_resume(self, separable_data, tmp_path, monkeypatch):
+        """Test que con cv el modelo final se guarda y reanudar no lo reentrena."""
+        X_train, X_test, y_train, y_test = separable_data
+        monkeypatch.setattr(optimization_module, 'default_trial_store_dir',
+                            lambda name, uid: tmp_path / 'trials' / name / uid)
+        storage = f"sqlite:///{tmp_path / 'studies.db'}"
+        kwargs = dict(n_trials=2, cv=3, pruner=None, persist=True, storage=storage, study_name='nb_cv')
+        first, _, _ = optimize_model('naive_bayes', X_train, X_test, y_train, y_test, **kwargs)
+        
+        calls = []
+        monkeypatch.setattr(optimization_module, 'train_model', lambda *a, **k: calls.append(a))
+        second, _, _ = optimize_model('naive_bayes', X_train, X_test, y_train, y_test, **kwargs)
+        assert calls == []
+        assert second.alpha == first.alpha
+    
+    def test_temporary_store_is_removed(self, separable_data, tmp_path, monkeypatch):
+        """Test que sin persist el almacén de modelos temporal se borra."""
+        X_train, X_test, y_train, y_test = separable_data
+        temp_root = tmp_path / 'tmp'
+        temp_root.mkdir()
+        monkeypatch.setattr(tempfile, 'tempdir', str(temp_root))
+        optimize_model('naive_bayes', X_train, X_test, y_train, y_test, n_trials=2)
+        assert not list(temp_root.glob('trial_models_*'))
+    
+    def test_cv_logs_fit_time(self, separable_data):
+        """Test que con cv también se registra el tiempo de ajuste."""
+        X_train, X_test, y_train, y_test = separable_data
+        _, _, study = optimize_model(
+            'naive_bayes', X_train, X_test, y_train, y_test,
+            n_trials=2, persist=False, cv=3, pruner=None
+        )
+        assert all(t.user_attrs['fit_time'] > 0 for t in study.trials)
+
+
+class TestTimeBudget:
+    """Tests para la optimización con presupuesto de tiempo."""
+    
+    def test_runaway_fit_is_killed(self, separable_data, monkeypatch):
+        """Test que un entrenamiento que supera trial_timeout se cancela."""
+        X_train, X_test, y_train, y_test = separable_data
+        
+        def slow_train_model(*args, **kwargs):
+            time.sleep(30)
+        
+        monkeypatch.setattr(optimization_module, 'train_model', slow_train_model)
+        study = optuna.create_study(direction='maximize')
+        trial = study.ask()
+        
+        start = time.perf_counter()
+        score = _evaluate_params(trial, 'svm', {'C': 1.0}, X_train, X_test, y_train, y_test,
+                                 trial_timeout=0.5)
+        assert time.perf_counter() - start < 10
+        assert score == TIMEOUT_PENALTY
+        assert trial.user_attrs['timed_out'] is True
+    
+    def test_global_timeout_without_n_trials(self, separable_data):
+        """Test que con n_trials=None se ejecutan trials hasta el timeout."""
+        X_train, X_test, y_train, y_test = separable_data
+        start = time.perf_counter()
+        _, _, study = optimize_model(
+            'naive_bayes', X_train, X_test, y_train, y_test,
+            n_trials=None, timeout=1.0, persist=False, cv=None
+        )
+        assert time.perf_counter() - start < 10
+        assert len(study.trials) >= 1
+        assert all('predict_time' in t.user_attrs for t in study.trials)
+        
+        with pytest.raises(ValueError):
+            optimize_model('naive_bayes', X_train, X_test, y_train, y_test,
+                           n_trials=None, persist=False)
+    
+    def test_cost_aware_penalizes_slow_trials(self, separable_data):
+        """Test que cost_aware resta una penalización por tiempo."""
+        X_train, X_test, y_train, y_test = separable_data
+        _, _, study = optimize_model(
+            'logistic', X_train, X_test, y_train, y_test,
+            n_trials=3, persist=False, cv=None, cost_aware=True
+        )
+        for trial in study.trials:
+            assert trial.value < trial.user_attrs['raw_score']
+    
+    def test_budget_summary_per_family(self, separable_data):
+        """Test que el resumen agrupa el tiempo por familia de modelo."""
+        X_train, X_test, y_train, y_test = separable_data
+        results, summary = optimize_models_within_budget(
+            ['naive_bayes', 'logistic'], X_train, X_test, y_train, y_test,
+            timeout=2.0, persist=False, cv=None
+        )
+        assert set(results) == {'naive_bayes', 'logistic'}
+        assert summary['Familia'].tolist() == ['naive_bayes', 'logistic']
+        assert (summary['Ajuste (s)'] > 0).all()
+        
+        combined = summarize_trial_costs([r['study'] for r in results.values()])
+        assert combined['Trials'].sum() == sum(len(r['study'].trials) for r in results.values())
+
+
+class TestMultiObjective:
+    """Tests para la búsqueda multi-objetivo (score, latencia, tamaño)."""
+    
+    def test_measure_serving_cost(self, separable_data):
+        """Test que se mide latencia por texto y tamaño serializado."""
+        X_train, X_test, y_train, y_test = separable_data
+        from sklearn.linear_model import LogisticRegression
+        model = LogisticRegression().fit(X_train, y_train)
+        cost = measure_serving_cost(model, X_test, n_samples=5)
+        assert cost['latency_ms'] > 0
+        assert cost['model_size_kb'] > 0
+    
+    def test_pareto_front_and_latency_budget(self, separable_data):
+        """Test del frente de Pareto y la selección bajo presupuesto."""
+        X_train, X_test, y_train, y_test = separable_data
+        front, study = optimize_multi_objective(
+            'random_forest', X_train, X_test, y_train, y_test,
+            n_trials=4, persist=False, cv=None
+        )
+        assert len(study.directions) == 3
+        assert len(front) >= 1
+        assert set(front['Trial']) <= {t.number for t in study.trials}
+        assert front['Score'].is_monotonic_decreasing
+        
+        budget = front['Latencia (ms)'].max()
+        model, params, trial = select_model_under_latency_budget(
+            study, X_train, y_train, max_latency_ms=budget
+        )
+        # Con el presupuesto más holgado del frente gana el mejor score
+        assert trial.values[1] <= budget
+        assert trial.values[0] == front['Score'].max()
+        assert model.predict(X_test).shape == (len(X_test),)
+        
+        with pytest.raises(ValueError):
+            select_model_under_latency_budget(study, X_train, y_train, max_latency_ms=0.0)
+
+
+class TestMultiFidelity:
+    """Tests para la búsqueda multi-fidelidad (successive halving)."""
+    
+    def test_fidelity_fractions(self):
+        """Test de los escalones de fracciones."""
+        assert fidelity_fractions(0.1, 3) == pytest.approx([1 / 9, 1 / 3, 1.0])
+        assert fidelity_fractions(0.25, 2) == pytest.approx([0.25, 0.5, 1.0])
+        with pytest.raises(ValueError):
+            fidelity_fractions(0.0)
+    
+    def test_subsamples_are_nested_and_stratified(self):
+        """Test que cada submuestra contiene a la anterior y mantiene la proporción."""
+        y = np.array([0] * 90 + [1] * 30)
+        subsamples = _nested_stratified_subsamples(y, [1 / 9, 1 / 3, 1.0])
+        
+        for small, large in zip(subsamples, subsamples[1:]):
+            assert set(small) <= set(large)
+        assert len(subsamples[-1]) == len(y)
+        assert y[subsamples[1]].mean() == pytest.approx(0.25, abs=0.02)
+    
+    def test_completed_trials_reach_full_fidelity(self, separable_data):
+        """Test que el ranking final se hace a fidelidad completa."""
+        X_train, X_test, y_train, y_test = separable_data
+        _, params, study = optimize_model(
+            'logistic', X_train, X_test, y_train, y_test,
+            n_trials=10, persist=False, fidelity_min_fraction=0.1
+        )
+        assert isinstance(study.pruner, optuna.pruners.SuccessiveHalvingPruner)
+        completed = study.get_trials(states=(optuna.trial.TrialState.COMPLETE,))
+        assert completed
+        assert all(t.user_attrs['fidelity_reached'] == 1.0 for t in completed)
+        assert study.best_trial.user_attrs['fidelity_reached'] == 1.0
+        for trial in study.get_trials(states=(optuna.trial.TrialState.PRUNED,)):
+            assert trial.user_attrs['fidelity_reached'] < 1.0
+            assert set(trial.intermediate_values) <= {1, 3}
+
+
+class TestJointVectorizerSearch:
+    """Tests para la búsqueda conjunta de vectorizador y modelo."""
+    
+    def test_vectorizer_configs_are_cached(self, tmp_path, monkeypatch):
+        """Test que cada configuración de vectorizador se ajusta una sola vez."""
+        rng = np.random.default_rng(0)
+        toxic = ['idiot', 'stupid', 'hate', 'trash']
+        clean = ['thanks', 'nice', 'great', 'love']
+        texts, labels = [], []
+        for i in range(120):
+            label = i % 2
+            words = rng.choice(toxic if label else clean, size=3).tolist() + ['video', 'song']
+            texts.append(' '.join(words))
+            labels.append(label)
+        texts, labels = pd.Series(texts), pd.Series(labels)
+        
+        cache = FeatureCache(cache_dir=tmp_path)
+        calls = []
+        original_get_or_compute = cache.get_or_compute
+        
+        def recording_get_or_compute(texts_fit, texts_val, *args, **kwargs):
+            calls.append((set(texts_fit.index), set(texts_val.index)))
+            return original_get_or_compute(texts_fit, texts_val, *args, **kwargs)
+        
+        cache.get_or_compute = recording_get_or_compute
+        hashed = []
+        monkeypatch.setattr(cache_module, 'data_fingerprint', lambda *a: hashed.append(a))
+        model, vectorizer, params, study = optimize_with_vectorizer(
+            'naive_bayes', texts[:100], texts[100:], labels[:100], labels[100:],
+            n_trials=8, persist=False, cv=3, pruner=None, feature_cache=cache
+        )
+        
+        n_configs = len({
+            tuple(sorted((k, v) for k, v in t.params.items() if k.startswith('vec_')))
+            for t in study.trials
+        })
+        # Un ajuste por fold y configuración, más el modelo final con todo train
+        assert cache.stats['misses'] == 3 * n_configs + 1
+        assert hashed == []
+        
+        # En la búsqueda, el vectorizador nunca ve el fold de validación ni test
+        search_calls = calls[:-1]
+        assert all(fit.isdisjoint(val) and fit | val == set(range(100)) for fit, val in search_calls)
+        assert set(params) == {'vectorizer', 'model'}
+        assert isinstance(params['vectorizer']['ngram_range'], tuple)
+        X_test = vectorizer.transform(texts[100:], sparse=True)
+        assert model.predict(X_test).shape == (20,)
+
+
+class TestPersistentStudies:
+    """Tests para estudios persistentes y reanudables."""
+    
+    def test_resume_only_runs_missing_trials(self, separable_data, tmp_path):
+        """Test que reanudar completa hasta n_trials sin repetir trials."""
+        X_train, X_test, y_train, y_test = separable_data
+        storage = f"sqlite:///{tmp_path / 'studies.db'}"
+        optimize_model('naive_bayes', X_train, X_test, y_train, y_test,
+                       n_trials=3, storage=storage, study_name='nb')
+        _, _, study = optimize_model('naive_bayes', X_train, X_test, y_train, y_test,
+                                     n_trials=5, storage=storage, study_name='nb')
+        assert len(study.trials) == 5
+        
+        # Con el objetivo ya alcanzado no se ejecuta nada nuevo
+        _, _, study = optimize_model('naive_bayes', X_train, X_test, y_train, y_test,
+                                     n_trials=5, storage=storage, study_name='nb')
+        assert len(study.trials) == 5
+        
+        history = get_study_history('nb', storage=storage)
+        assert len(history) == 5
+        assert list_studies(storage=storage)['Estudio'].tolist() == ['nb']
+    
+    def test_resume_with_other_data_fails(self, separable_data, tmp_path):
+        """Test que no se mezclan trials de datos distintos."""
+        X_train, X_test, y_train, y_test = separable_data
+        storage = f"sqlite:///{tmp_path / 'studies.db'}"
+        optimize_model('naive_bayes', X_train, X_test, y_train, y_test,
+                       n_trials=1, storage=storage, study_name='nb')
+        with pytest.raises(ValueError):
+            optimize_model('naive_bayes', X_train * 2, X_test, y_train, y_test,
+                           n_trials=2, storage=storage, study_name='nb')
+    
+    def test_default_name_starts_new_study_on_other_data(self, separable_data, tmp_path):
+        """Test que el nombre por defecto no choca con un estudio de otros datos."""
+        X_train, X_test, y_train, y_test = separable_data
+        storage = f"sqlite:///{tmp_path / 'studies.db'}"
+        _, _, first = optimize_model('naive_bayes', X_train, X_test, y_train, y_test,
+                                     n_trials=1, storage=storage)
+        _, _, second = optimize_model('naive_bayes', X_train * 2, X_test, y_train, y_test,
+                                      n_trials=1, storage=storage)
+        assert first.study_name != second.study_name
+        assert first.study_name.startswith('naive_bayes_tfidf_optimization_')
+        assert len(second.trials) == 1
+    
+    def test_duplicate_configuration_is_not_retrained(self, separable_data, tmp_path):
+        """Test que una configuración repetida reutiliza el valor previo."""
+        X_train, X_test, y_train, y_test = separable_data
+        storage = f"sqlite:///{tmp_path / 'studies.db'}"
+        _, _, study = optimize_model('naive_bayes', X_train, X_test, y_train, y_test,
+                                     n_trials=1, storage=storage, study_name='nb')
+        study.enqueue_trial(study.trials[0].params)
+        _, _, study = optimize_model('naive_bayes', X_train, X_test, y_train, y_test,
+                                     n_trials=2, storage=storage, study_name='nb')
+        assert study.trials[1].user_attrs['duplicate_of'] == 0
+        assert study.trials[1].value == study.trials[0].value
+
+
+def test_split_trials():
+    """Test reparto equilibrado de trials entre workers."""
+    assert _split_trials(10, 3) == [4, 3, 3]
+    assert sum(_split_trials(100, 8)) == 100
+
+
+class TestWarmStart:
+    """Tests para el arranque en caliente desde runs de MLFlow."""
+    
+    def test_historical_configurations(self, fake_mlruns):
+        """Test que solo se usan runs del mismo modelo y vectorizador."""
+        history = historical_configurations('naive_bayes', 'tfidf', mlruns_dir=fake_mlruns)
+        assert history['run_id'].tolist() == ['good', 'optuna', 'worse']
+        assert history.loc[0, 'params'] == {'alpha': 0.5, 'fit_prior': False}
+    
+    def test_enqueued_configurations_run_first(self, separable_data, fake_mlruns):
+        """Test que las mejores configuraciones se evalúan primero."""
+        X_train, X_test, y_train, y_test = separable_data
+        _, _, study = optimize_model(
+            'naive_bayes', X_train, X_test, y_train, y_test, n_trials=3, persist=False,
+            warm_start_top_n=2, mlruns_dir=fake_mlruns
+        )
+        assert len(study.trials) == 3
+        assert study.trials[0].params == {'alpha': 0.5, 'fit_prior': False}
+        assert study.trials[1].params == {'alpha': 1.5, 'fit_prior': True}
+    
+    def test_historical_trials_do_not_count(self, separable_data, fake_mlruns, tmp_path):
+        """Test que los runs añadidos no cuentan para n_trials ni para el mejor."""
+        X_train, X_test, y_train, y_test = separable_data
+        storage = f"sqlite:///{tmp_path / 'studies.db'}"
+        _, params, study = optimize_model(
+            'naive_bayes', X_train, X_test, y_train, y_test, n_trials=2,
+            storage=storage, study_name='nb', warm_start_add_trials=True, mlruns_dir=fake_mlruns
+        )
+        historical = [t for t in study.trials if t.user_attrs.get('source') == 'mlflow']
+        assert len(historical) == 3
+        assert len(study.trials) == 5
+        evaluated = [t for t in study.trials if t not in historical]
+        assert params == max(evaluated, key=lambda t: t.value).params
+        
+        # Al reanudar no se vuelven a añadir
+        _, _, study = optimize_model(
+            'naive_bayes', X_train, X_test, y_train, y_test, n_trials=2,
+            storage=storage, study_name='nb', warm_start_add_trials=True, mlruns_dir=fake_mlruns
+        )
+        assert len(study.trials) == 5
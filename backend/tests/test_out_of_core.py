@@ -0,0 +1,149 @@
+"""
+Tests para el entrenamiento out-of-core.
+"""
+import tempfile
+import pytest
+import numpy as np
+import pandas as pd
+from src.models.out_of_core import (
+    create_incremental_model,
+    iter_csv_chunks,
+    stratified_holdout_mask,
+    train_out_of_core,
+    evaluate_stream
+)
+from src.models.evaluate import evaluate_model
+from src.features.vectorization import TextVectorizer
+from sklearn.svm import SVC
+
+
+@pytest.fixture
+def labeled_csv(tmp_path):
+    """CSV etiquetado de ejemplo con formato YouToxic."""
+    rng = np.random.default_rng(0)
+    toxic_words = ['stupid', 'idiot', 'hate', 'die', 'loser']
+    clean_words = ['great', 'video', 'thanks', 'love', 'informative']
+    rows = []
+    for i in range(400):
+        is_toxic = i % 3 == 0
+        words = rng.choice(toxic_words if is_toxic else clean_words, size=6)
+        rows.append({'Text': ' '.join(words), 'IsToxic': 'TRUE' if is_toxic else 'FALSE'})
+    path = tmp_path / 'comments.csv'
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path
+
+
+class TestOutOfCore:
+    """Tests para train_out_of_core y utilidades."""
+    
+    @pytest.mark.parametrize('model_type', ['naive_bayes', 'sgd', 'logistic'])
+    def test_train_out_of_core(self, labeled_csv, tmp_path, model_type):
+        """Test que cada modelo incremental aprende por bloques."""
+        model, vectorizer, results = train_out_of_core(
+            labeled_csv,
+            model_type=model_type,
+            chunksize=50,
+            n_epochs=2,
+            holdout_path=tmp_path / 'holdout.csv',
+            vectorizer_params={'n_features': 2 ** 12}
+        )
+        assert results['n_train'] + results['n_holdout'] == 400
+        assert results['confusion_matrix'].sum() == results['n_holdout']
+        assert results['test_f1'] > 0.9
+        X = vectorizer.transform(pd.Series(['you stupid idiot']), sparse=True)
+        assert model.predict(X)[0] == 1
+    
+    def test_temporary_holdout_is_removed(self, labeled_csv, tmp_path, monkeypatch):
+        """Test que sin holdout_path no quedan directorios temporales."""
+        temp_root = tmp_path / 'tmp'
+        temp_root.mkdir()
+        monkeypatch.setattr(tempfile, 'tempdir', str(temp_root))
+        _, _, results = train_out_of_core(labeled_csv, model_type='sgd', chunksize=100)
+        assert results['n_holdout'] > 0 and results['holdout_path'] is None
+        assert list(temp_root.iterdir()) == []
+    
+    def test_empty_preprocessed_texts_are_evaluated(self, labeled_csv, tmp_path, monkeypatch):
+        """Test que los held-out vacíos tras preprocesar cuentan en la evaluación."""
+        import src.data.preprocessing as preprocessing_module
+        
+        class DropCleanPreprocessor:
+            def __init__(self, use_spacy=True):
+                pass
+            
+            def preprocess_text(self, text, remove_stopwords=True):
+                return '' if 'video' in text else text
+        
+        monkeypatch.setattr(preprocessing_module, 'TextPreprocessor', DropCleanPreprocessor)
+        _, _, results = train_out_of_core(
+            labeled_csv, model_type='sgd', chunksize=100, preprocess=True,
+            holdout_path=tmp_path / 'holdout.csv'
+        )
+        holdout = pd.read_csv(tmp_path / 'holdout.csv', keep_default_na=False)
+        assert (holdout['text'] == '').any()
+        assert results['n_train'] + results['n_holdout'] == 400
+        assert results['confusion_matrix'].sum() == results['n_holdout']
+    
+    def test_holdout_is_stratified(self):
+        """Test que el held-out mantiene la proporción de clases."""
+        labels = np.array([1] * 30 + [0] * 70)
+        mask = stratified_holdout_mask(labels, 0.2, np.random.default_rng(0))
+        assert mask.sum() == 20
+        assert labels[mask].sum() == 6
+    
+    def test_iter_csv_chunks(self, labeled_csv):
+        """Test que los bloques respetan el tamaño y convierten etiquetas."""
+        chunks = list(iter_csv_chunks(labeled_csv, chunksize=150))
+        assert [len(texts) for texts, _ in chunks] == [150, 150, 100]
+        assert set(np.concatenate([labels for _, labels in chunks])) == {0, 1}
+    
+    def test_invalid_model_type(self):
+        """Test que un modelo sin partial_fit lanza error."""
+        with pytest.raises(ValueError):
+            create_incremental_model('random_forest')
+
+
+class TestEvaluateStream:
+    """Tests para la evaluación en streaming."""
+    
+    @pytest.mark.parametrize('n_jobs', [1, 2])
+    def test_matches_in_memory_evaluation(self, labeled_csv, tmp_path, n_jobs):
+        """Test que las métricas son idénticas a evaluate_model en memoria."""
+        model, vectorizer, _ = train_out_of_core(
+            labeled_csv, model_type='naive_bayes', chunksize=50,
+            holdout_path=tmp_path / 'holdout.csv', vectorizer_params={'n_features': 2 ** 12}
+        )
+        results = evaluate_stream(model, vectorizer, labeled_csv, 'Text', 'IsToxic',
+                                  chunksize=70, n_jobs=n_jobs, verbose=False, sparse=True)
+        
+        texts, labels = next(iter_csv_chunks(labeled_csv, chunksize=10 ** 6))
+        X = vectorizer.transform(texts, sparse=True)
+        expected = evaluate_model(model, X, X, pd.Series(labels), pd.Series(labels), verbose=False)
+        for metric in ('test_accuracy', 'test_precision', 'test_recall', 'test_f1'):
+            assert results[metric] == expected[metric]
+        np.testing.assert_array_equal(results['confusion_matrix'], expected['confusion_matrix'])
+        
+        histogram = results['probability_histogram']
+        assert histogram['toxic'].sum() == labels.sum()
+        assert histogram['not_toxic'].sum() == len(labels) - labels.sum()
+    
+    def test_model_without_probabilities(self, labeled_csv, tmp_path):
+        """Test que sin predict_proba no hay histograma."""
+        model, vectorizer, _ = train_out_of_core(
+            labeled_csv, model_type='sgd', chunksize=100, holdout_path=tmp_path / 'holdout.csv'
+        )
+        results = evaluate_stream(model, vectorizer, labeled_csv, 'Text', 'IsToxic',
+                                  verbose=False, sparse=True)
+        assert results['n_examples'] == 400
+        assert results['probability_histogram'] is None
+    
+    def test_dense_trained_svc(self, labeled_csv):
+        """Test que por defecto los bloques se densifican, como al servir."""
+        texts, labels = next(iter_csv_chunks(labeled_csv, chunksize=10 ** 6))
+        vectorizer = TextVectorizer(method='tfidf', max_features=100)
+        X = vectorizer.fit_transform(texts)
+        model = SVC(probability=True, random_state=42).fit(X, labels)
+        
+        results = evaluate_stream(model, vectorizer, labeled_csv, 'Text', 'IsToxic',
+                                  chunksize=70, verbose=False)
+        expected = evaluate_model(model, X, X, pd.Series(labels), pd.Series(labels), verbose=False)
+        np.testing.assert_array_equal(results['confusion_matrix'], expected['confusion_matrix'])
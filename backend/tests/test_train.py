@@ -11,8 +11,11 @@ from src.models.train import (
     train_naive_bayes,
     train_logistic_regression,
     train_svm,
+    train_linear_svm,
     train_random_forest,
     train_model,
+    train_many,
+    warm_start_retrain,
     save_model,
     load_model
 )
@@ -129,3 +132,136 @@ class TestTrainFunctions:
             if tmp_path.exists():
                 os.unlink(tmp_path)
 
+
+
+class TestLinearSVM:
+    """Tests para el SVM lineal calibrado."""
+    
+    def test_train_linear_svm_liblinear(self, sample_vectorized_data):
+        """Test SVM lineal con liblinear y probabilidades calibradas."""
+        X_train, _, y_train, _ = sample_vectorized_data
+        model = train_linear_svm(X_train, y_train, C=1.0, solver='liblinear')
+        probabilities = model.predict_proba(X_train[:5])
+        assert probabilities.shape == (5, 2)
+        np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+        # Un único SVM y un único calibrador
+        assert len(model.calibrated_classifiers_) == 1
+    
+    def test_train_linear_svm_sgd_sparse_isotonic(self, sample_vectorized_data):
+        """Test SVM lineal con SGD sobre entrada sparse e isotonic."""
+        from scipy import sparse
+        X_train, _, y_train, _ = sample_vectorized_data
+        X_sparse = sparse.csr_matrix(X_train)
+        model = train_model(
+            'linear_svm', X_sparse, y_train, solver='sgd', calibration='isotonic'
+        )
+        probabilities = model.predict_proba(X_sparse[:5])
+        assert probabilities.shape == (5, 2)
+        assert np.all((probabilities >= 0) & (probabilities <= 1))
+    
+    def test_train_linear_svm_invalid_options(self, sample_vectorized_data):
+        """Test que solver o calibración inválidos lanzan error."""
+        X_train, _, y_train, _ = sample_vectorized_data
+        with pytest.raises(ValueError):
+            train_linear_svm(X_train, y_train, solver='invalid')
+        with pytest.raises(ValueError):
+            train_linear_svm(X_train, y_train, calibration='invalid')
+
+
+class TestTrainMany:
+    """Tests para el entrenamiento paralelo de varias configuraciones."""
+    
+    CONFIGS = [
+        {'name': 'nb', 'type': 'naive_bayes', 'params': {'alpha': 1.0}},
+        {'name': 'lr', 'type': 'logistic', 'params': {'C': 0.5}},
+        {'name': 'rf', 'type': 'random_forest', 'params': {'n_estimators': 5}}
+    ]
+    
+    def test_train_many_parallel(self, sample_vectorized_data):
+        """Test que entrena todas las configuraciones en workers."""
+        X_train, _, y_train, _ = sample_vectorized_data
+        results = train_many(self.CONFIGS, X_train, y_train, n_jobs=2, verbose=False)
+        assert set(results) == {'nb', 'lr', 'rf'}
+        for result in results.values():
+            assert result['model'].predict(X_train[:5]).shape == (5,)
+            assert result['fit_time'] >= 0
+            assert result['peak_memory_mb'] >= 0
+    
+    def test_train_many_matches_sequential(self, sample_vectorized_data):
+        """Test que el modo paralelo da los mismos modelos que el secuencial."""
+        X_train, _, y_train, _ = sample_vectorized_data
+        parallel = train_many(self.CONFIGS[:2], X_train, y_train, n_jobs=2, verbose=False)
+        sequential = train_many(self.CONFIGS[:2], X_train, y_train, n_jobs=1, verbose=False)
+        for name in ('nb', 'lr'):
+            np.testing.assert_allclose(
+                parallel[name]['model'].predict_proba(X_train),
+                sequential[name]['model'].predict_proba(X_train)
+            )
+    
+    def test_train_many_duplicate_names(self, sample_vectorized_data):
+        """Test que nombres duplicados lanzan error."""
+        X_train, _, y_train, _ = sample_vectorized_data
+        with pytest.raises(ValueError):
+            train_many([self.CONFIGS[0], self.CONFIGS[0]], X_train, y_train)
+
+
+class TestWarmStartRetrain:
+    """Tests para el reentrenamiento con warm start."""
+    
+    @pytest.fixture
+    def growing_corpus(self):
+        """Corpus con ruido y una ampliación pequeña (5%)."""
+        rng = np.random.default_rng(0)
+        X = rng.random((400, 30))
+        w = rng.normal(size=30)
+        y = ((X - 0.5) @ w + rng.normal(size=400) > 0).astype(int)
+        return X[:380], y[:380], X, y
+    
+    def test_warm_start_logistic_converges_faster(self, growing_corpus):
+        """Test que warm start necesita menos iteraciones y llega al mismo óptimo."""
+        X_old, y_old, X_new, y_new = growing_corpus
+        served = train_logistic_regression(X_old, y_old, C=1.0)
+        
+        model, report = warm_start_retrain(served, X_new, y_new, verbose=False)
+        assert report['warm_n_iter'] <= report['cold_n_iter']
+        assert {'warm_fit_time', 'cold_fit_time', 'speedup'} <= set(report)
+        
+        cold = train_logistic_regression(X_new, y_new, C=1.0)
+        np.testing.assert_allclose(model.coef_, cold.coef_, atol=1e-2)
+        assert model.warm_start is False
+    
+    def test_warm_start_liblinear_warns(self, growing_corpus):
+        """Test que el cambio de liblinear a saga no es silencioso."""
+        X_old, y_old, X_new, y_new = growing_corpus
+        served = train_logistic_regression(X_old, y_old, penalty='l1')
+        assert served.solver == 'liblinear'
+        
+        with pytest.warns(UserWarning, match='saga'):
+            model, _ = warm_start_retrain(served, X_new, y_new, compare_cold=False, verbose=False)
+        assert model.solver == 'saga'
+        assert model.warm_start is False
+    
+    def test_warm_start_from_path_and_sgd(self, growing_corpus, tmp_path):
+        """Test warm start cargando un SGDClassifier desde disco."""
+        from sklearn.linear_model import SGDClassifier
+        X_old, y_old, X_new, y_new = growing_corpus
+        served = SGDClassifier(loss='log_loss', random_state=42).fit(X_old, y_old)
+        save_model(served, tmp_path / 'served.pkl')
+        
+        model, report = warm_start_retrain(tmp_path / 'served.pkl', X_new, y_new, compare_cold=False, verbose=False)
+        assert model.predict(X_new[:5]).shape == (5,)
+        assert 'cold_n_iter' not in report
+    
+    def test_warm_start_rejects_changed_feature_space(self, growing_corpus):
+        """Test que un vocabulario distinto exige reentrenamiento completo."""
+        X_old, y_old, X_new, y_new = growing_corpus
+        served = train_logistic_regression(X_old, y_old)
+        with pytest.raises(ValueError):
+            warm_start_retrain(served, X_new[:, :20], y_new, verbose=False)
+    
+    def test_warm_start_rejects_non_linear(self, sample_vectorized_data):
+        """Test que modelos no lineales lanzan error."""
+        X_train, _, y_train, _ = sample_vectorized_data
+        served = train_random_forest(X_train, y_train, n_estimators=5)
+        with pytest.raises(ValueError):
+            warm_start_retrain(served, X_train, y_train, verbose=False)
@@ -0,0 +1,47 @@
+"""
+Tests para el almacén de modelos de trials.
+"""
+import pytest
+from sklearn.naive_bayes import MultinomialNB
+from src.models.trial_store import TrialModelStore
+
+
+class TestTrialModelStore:
+    """Tests para TrialModelStore."""
+    
+    def test_keeps_only_top_k(self, tmp_path):
+        """Test que solo se conservan los k mejores trials."""
+        store = TrialModelStore(tmp_path, top_k=2)
+        assert store.offer(0, 0.5, MultinomialNB(alpha=0.5))
+        assert store.offer(1, 0.7, MultinomialNB(alpha=0.7))
+        assert store.offer(2, 0.6, MultinomialNB(alpha=0.6))
+        assert not store.offer(3, 0.4, MultinomialNB(alpha=0.4))
+        
+        assert [trial for trial, _ in store.ranking()] == [1, 2]
+        assert not store.has(0) and not store.has(3)
+        assert len(list(tmp_path.glob('trial_*'))) == 4
+    
+    def test_load_model(self, tmp_path):
+        """Test que el modelo cargado es el guardado."""
+        store = TrialModelStore(tmp_path)
+        store.offer(5, 0.8, MultinomialNB(alpha=0.3), fit_time=1.5)
+        assert store.load(5).alpha == 0.3
+        
+        # Una instancia nueva ve los mismos modelos (reanudar estudios)
+        assert TrialModelStore(tmp_path).ranking() == [(5, 0.8)]
+        with pytest.raises(FileNotFoundError):
+            store.load(6)
+    
+    def test_invalid_top_k(self, tmp_path):
+        """Test que top_k debe ser positivo."""
+        with pytest.raises(ValueError):
+            TrialModelStore(tmp_path, top_k=0)
+    
+    def test_other_fingerprint_is_ignored(self, tmp_path):
+        """Test que no se devuelven modelos entrenados con otros datos."""
+        TrialModelStore(tmp_path, fingerprint='a').offer(0, 0.9, MultinomialNB())
+        store = TrialModelStore(tmp_path, fingerprint='b')
+        
+        assert store.ranking() == [] and not store.has(0)
+        with pytest.raises(FileNotFoundError):
+            store.load(0)
@@ -7,7 +7,9 @@ import numpy as np
 from pathlib import Path
 import tempfile
 import os
+import time
 from src.features.vectorization import TextVectorizer, vectorize_data, split_train_test
+from src.features.cache import FeatureCache
 
 
 class TestTextVectorizer:
@@ -166,3 +168,107 @@ class TestVectorizationFunctions:
             assert X_test_vec.shape[0] == len(X_test)
             assert save_path.exists()
 
+
+
+class TestHashingVectorizer:
+    """Tests para el método hashing (sin vocabulario)."""
+    
+    def test_hashing_is_stateless(self, sample_texts):
+        """Test que hashing transforma sin necesidad de ajuste."""
+        vectorizer = TextVectorizer(method='hashing', n_features=2 ** 10)
+        X = vectorizer.transform(pd.Series(sample_texts), sparse=True)
+        assert X.shape == (len(sample_texts), 2 ** 10)
+        assert X.min() >= 0
+    
+    def test_hashing_save_and_load(self, sample_texts, tmp_path):
+        """Test que el método se detecta al cargar."""
+        vectorizer = TextVectorizer(method='hashing', n_features=2 ** 10)
+        vectorizer.save(tmp_path / 'hashing.pkl')
+        loaded = TextVectorizer.load(tmp_path / 'hashing.pkl')
+        assert loaded.method == 'hashing'
+        np.testing.assert_array_equal(
+            loaded.transform(pd.Series(sample_texts)),
+            vectorizer.transform(pd.Series(sample_texts))
+        )
+
+
+class TestFeatureCache:
+    """Tests para la caché de matrices de características."""
+    
+    @pytest.fixture
+    def texts(self):
+        train = pd.Series(["good video thanks", "you are an idiot", "nice song",
+                           "stupid idiot comment", "thanks for sharing"] * 4)
+        test = pd.Series(["idiot video", "nice sharing"])
+        return train, test
+    
+    def test_same_config_is_vectorized_once(self, texts, tmp_path):
+        """Test que una configuración repetida sale de memoria."""
+        cache = FeatureCache(cache_dir=tmp_path)
+        X1, _, _ = cache.get_or_compute(*texts, method='tfidf', min_df=1)
+        X2, _, _ = cache.get_or_compute(*texts, method='tfidf', min_df=1)
+        cache.get_or_compute(*texts, method='tfidf', min_df=1, sublinear_tf=True)
+        
+        assert X1 is X2
+        assert cache.stats == {'memory_hits': 1, 'disk_hits': 0, 'misses': 2}
+    
+    def test_disk_cache_survives_new_instance(self, texts, tmp_path):
+        """Test que otra instancia reutiliza las matrices del disco."""
+        X1, X1_test, _ = FeatureCache(cache_dir=tmp_path).get_or_compute(*texts, min_df=1)
+        cache = FeatureCache(cache_dir=tmp_path)
+        X2, X2_test, vectorizer = cache.get_or_compute(*texts, min_df=1)
+        
+        assert cache.stats['disk_hits'] == 1
+        assert (X1 != X2).nnz == 0 and (X1_test != X2_test).nnz == 0
+        assert vectorizer.transform(texts[1], sparse=True).shape == X2_test.shape
+    
+    def test_memory_is_sized_per_fold(self, texts, tmp_path):
+        """Test que con folds caben todos los de varias configuraciones."""
+        cache = FeatureCache(cache_dir=tmp_path, use_disk=False, folds=5)
+        assert cache.max_memory_items == 40
+        
+        train, test = texts
+        for _ in range(2):
+            for min_df in (1, 2):
+                for fold in range(5):
+                    cache.get_or_compute(train.iloc[fold:], test, min_df=min_df)
+        assert cache.stats == {'memory_hits': 10, 'disk_hits': 0, 'misses': 10}
+    
+    def test_disk_evicts_least_recently_used(self, texts, tmp_path):
+        """Test que el disco respeta el límite y descarta la entrada menos usada."""
+        cache = FeatureCache(cache_dir=tmp_path, max_memory_items=1, max_disk_items=2)
+        cache.get_or_compute(*texts, min_df=1)
+        cache.get_or_compute(*texts, min_df=2)
+        # Leer min_df=1 desde disco la marca como usada
+        old = time.time() - 60
+        for path in tmp_path.glob('*.joblib'):
+            os.utime(path, (old, old))
+        cache.get_or_compute(*texts, min_df=1)
+        cache.get_or_compute(*texts, min_df=3)
+        assert len(list(tmp_path.glob('*.joblib'))) == 2
+        
+        cache = FeatureCache(cache_dir=tmp_path)
+        cache.get_or_compute(*texts, min_df=1)
+        cache.get_or_compute(*texts, min_df=3)
+        cache.get_or_compute(*texts, min_df=2)
+        assert cache.stats == {'memory_hits': 0, 'disk_hits': 2, 'misses': 1}
+    
+    def test_disk_size_limit(self, texts, tmp_path):
+        """Test que con un tamaño máximo diminuto solo queda la última entrada."""
+        cache = FeatureCache(cache_dir=tmp_path, max_disk_mb=1e-6)
+        cache.get_or_compute(*texts, min_df=1)
+        cache.get_or_compute(*texts, min_df=2)
+        paths = list(tmp_path.glob('*.joblib'))
+        assert len(paths) == 1
+        
+        cache = FeatureCache(cache_dir=tmp_path)
+        cache.get_or_compute(*texts, min_df=2)
+        assert cache.stats['disk_hits'] == 1
+    
+    def test_different_texts_are_not_reused(self, texts, tmp_path):
+        """Test que cambiar los textos invalida la entrada."""
+        cache = FeatureCache(cache_dir=tmp_path)
+        train, test = texts
+        cache.get_or_compute(train, test, min_df=1)
+        cache.get_or_compute(train.str.upper(), test, min_df=1)
+        assert cache.stats['misses'] == 2